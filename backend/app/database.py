@@ -1,11 +1,99 @@
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
+from app.services.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_IDLE,
+    DB_POOL_OVERFLOW,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "databases" / "alembic"
+
+
+class _TimedCheckout:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    # The gauges are pushed on every checkout and return rather than read at scrape time, so
+    # they survive into the merged metrics of a multi-worker server.
+    def _do_get(self):
+        try:
+            return super()._do_get()
+        finally:
+            _record_pool_state(self)
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        _record_pool_state(self)
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
 
-engine = create_async_engine(settings.database_url, echo=False)
+
+def engine_options() -> dict[str, Any]:
+    if settings.db_pgbouncer:
+        # Transaction-mode PgBouncer hands each transaction to any server connection, so cached
+        # or sequentially named prepared statements collide. Let PgBouncer own the pooling.
+        return {
+            "poolclass": InstrumentedNullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": {"prepared_statement_cache_size": settings.db_statement_cache_size},
+    }
+
+
+engine = create_async_engine(settings.database_url, echo=False, **engine_options())
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = (
+    create_async_engine(settings.database_replica_url, echo=False, **engine_options())
+    if settings.database_replica_url
+    else None
+)
+replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False) if replica_engine else None
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -14,3 +102,119 @@ class Base(DeclarativeBase):
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+def expected_schema_revision() -> str | None:
+    """Head revision of the Alembic scripts, or None when they are not shipped with this build."""
+    location = Path(settings.alembic_script_location or _DEFAULT_ALEMBIC_DIR)
+    if not location.is_dir():
+        return None
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory(str(location)).get_current_head()
+
+
+async def check_schema_revision() -> None:
+    """Fail fast when the database is not migrated to the head revision this code expects.
+
+    A single read of ``alembic_version`` instead of reflecting every table with ``create_all``.
+    Missing scripts only downgrade the check to a warning in debug mode.
+    """
+    head = await asyncio.to_thread(expected_schema_revision)
+    if head is None and not settings.debug:
+        raise RuntimeError(
+            "Alembic scripts not found; build the image from the repository root so databases/ ships "
+            "with it, or set ALEMBIC_SCRIPT_LOCATION"
+        )
+    async with engine.connect() as conn:
+        try:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+        except ProgrammingError:
+            current = None
+    if head is None:
+        logger.warning("Alembic scripts not found; skipping schema check (database at %s)", current)
+        return
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'} but the code expects {head}; "
+            "run `alembic upgrade head` from databases/"
+        )
+
+
+def _record_pool_state(pool: AsyncAdaptedQueuePool) -> None:
+    if pool is not engine.pool:
+        return  # the gauges describe the primary's pool
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_IDLE.set(pool.checkedin())
+    DB_POOL_OVERFLOW.set(max(0, pool.overflow()))
+
+
+async def warm_pool(connections: int) -> None:
+    """Open pooled connections up front, so a new worker's first requests don't wait on connecting."""
+    if not isinstance(engine.pool, AsyncAdaptedQueuePool) or connections <= 0:
+        return
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(min(connections, settings.db_pool_size))), return_exceptions=True
+    )
+    for conn in opened:
+        if isinstance(conn, BaseException):
+            logger.warning("Connection pool warmup failed: %s", conn)
+        else:
+            await conn.close()
+
+
+class QueryStats:
+    """Statements executed on behalf of one request, filled in by the engine hooks below."""
+
+    def __init__(self, keep_slowest: int = 5):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        self._keep_slowest = keep_slowest
+        self._slowest: list[tuple[float, str]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+        if len(self._slowest) < self._keep_slowest:
+            heapq.heappush(self._slowest, (seconds, statement))
+        else:
+            heapq.heappushpop(self._slowest, (seconds, statement))
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        return sorted(self._slowest, reverse=True)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, the usual signature of an N+1 loop."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# Set per request by QueryStatsMiddleware; the async engine runs these sync hooks in a greenlet
+# that shares the calling task's context, so they see the request's stats.
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+for _engine in (engine, replica_engine):
+    if _engine is not None:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(_engine.sync_engine, "handle_error", _handle_error)
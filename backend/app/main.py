@@ -1,18 +1,52 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.models import User, Recipe, ChatSession, ChatMessage, HouseholdIngredient, ShoppingList  # noqa: F401
-from app.routers import auth, chat, recipes, ingredients, profile, shopping_list
+from app.config import settings
+from app.database import check_schema_revision, replica_engine, warm_pool
+from app.models import User, Recipe, ChatSession, ChatMessage, ChatSessionArchive, HouseholdIngredient, ShoppingList, LLMUsage, CollectionVersion, SyncCursor, SyncChange, Job, AIQuotaBucket  # noqa: F401
+from app.routers import auth, chat, recipes, ingredients, jobs, profile, shopping_list, sync
+from app.services.ai_loader import warm_ai
+from app.services.compression import CompressionMiddleware
+from app.services.jobs import job_worker
+from app.services.chat_archive import run_periodic_maintenance
+from app.services.metrics import render_metrics
+from app.services.query_stats import QueryStatsMiddleware
+from app.services.quotas import quotas, usage_ledger
+from app.services.replicas import read_router
+from app.services.shopping_list_events import shopping_list_hub
+from app.services.shutdown import shutdown_drain
+from app.services.sync import run_periodic_tombstone_prune
 
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await check_schema_revision()
+    await warm_pool(settings.db_warm_connections)
+    if settings.ai_warmup_on_startup:
+        warm_ai()
+    shutdown_drain.on_drain(shopping_list_hub.close_streams)
+    shutdown_drain.install_signal_handlers()
+    background = [
+        asyncio.create_task(usage_ledger.run_periodic_flush()),
+        asyncio.create_task(quotas.run_periodic_sync()),
+        asyncio.create_task(run_periodic_maintenance()),
+        asyncio.create_task(run_periodic_tombstone_prune()),
+        asyncio.create_task(shopping_list_hub.run_listener()),
+    ]
+    if replica_engine is not None:
+        background.append(asyncio.create_task(read_router.run_lag_monitor()))
+    if settings.job_worker_concurrency > 0:
+        background.append(asyncio.create_task(job_worker.run()))
     yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await usage_ledger.flush()
+    await quotas.sync()
 
 
 app = FastAPI(title="Grocery Agent API", lifespan=lifespan)
@@ -23,16 +57,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-RateLimit-Limit",
+        "X-RateLimit-Remaining",
+        "X-RateLimit-Reset",
+        "Retry-After",
+        "X-DB-Query-Count",
+        "X-DB-Time-Ms",
+        "ETag",
+        "Location",
+    ],
 )
+app.add_middleware(QueryStatsMiddleware)
+if settings.response_gzip_min_bytes > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.response_gzip_min_bytes,
+        level=settings.response_gzip_level,
+    )
 
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(recipes.router)
 app.include_router(ingredients.router)
+app.include_router(jobs.router)
 app.include_router(profile.router)
 app.include_router(shopping_list.router)
+app.include_router(sync.router)
 
 
 @app.get("/health")
-async def health():
+async def health(response: Response):
+    # Load balancers stop routing to a worker once it starts shutting down.
+    if shutdown_drain.draining:
+        response.status_code = 503
+        return {"status": "draining"}
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,7 +1,12 @@
 from app.models.user import User
 from app.models.recipe import Recipe
-from app.models.chat import ChatSession, ChatMessage
+from app.models.chat import ChatSession, ChatMessage, ChatSessionArchive
 from app.models.ingredient import HouseholdIngredient
 from app.models.shopping_list import ShoppingList
+from app.models.llm_usage import LLMUsage
+from app.models.collection_version import CollectionVersion
+from app.models.sync_change import SyncCursor, SyncChange
+from app.models.job import Job
+from app.models.ai_quota_bucket import AIQuotaBucket
 
-__all__ = ["User", "Recipe", "ChatSession", "ChatMessage", "HouseholdIngredient", "ShoppingList"]
+__all__ = ["User", "Recipe", "ChatSession", "ChatMessage", "ChatSessionArchive", "HouseholdIngredient", "ShoppingList", "LLMUsage", "CollectionVersion", "SyncCursor", "SyncChange", "Job", "AIQuotaBucket"]
@@ -0,0 +1,20 @@
+import uuid
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CollectionVersion(Base):
+    """Per-user change counter for a list endpoint's collection, bumped by database triggers.
+
+    No foreign key to users: the triggers also fire for rows removed by a user's cascade delete.
+    """
+
+    __tablename__ = "collection_versions"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    collection: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
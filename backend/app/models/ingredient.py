@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy import String, DateTime, ForeignKey, func, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,9 +10,14 @@ from app.database import Base
 
 class HouseholdIngredient(Base):
     __tablename__ = "household_ingredients"
+    __table_args__ = (
+        Index("ix_household_ingredients_user_id_name", "user_id", "name"),
+        # Fuzzy name matching for the agent's pantry tools (pg_trgm, migration 0005).
+        Index("ix_household_ingredients_name_trgm", text("lower(name) gin_trgm_ops"), postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(150), nullable=False, index=True)
     quantity: Mapped[str | None] = mapped_column(String(50))
     unit: Mapped[str | None] = mapped_column(String(30))
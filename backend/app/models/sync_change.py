@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, String, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SyncCursor(Base):
+    """Per-user change counter for ``/sync``, advanced by database triggers (migration 0007).
+
+    ``pruned_through`` is the highest cursor whose tombstones have been dropped; clients behind it
+    must resync from scratch.
+    """
+
+    __tablename__ = "sync_cursors"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    cursor: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    pruned_through: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+
+class SyncChange(Base):
+    """Latest change per synced entity; deletes stay behind as tombstones."""
+
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        Index("ix_sync_changes_user_id_cursor", "user_id", "cursor"),
+        # Tombstone pruning (services/sync.py).
+        Index("ix_sync_changes_tombstones", "changed_at", postgresql_where=text("deleted")),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    collection: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # Text, not uuid: shopping-list item ids come out of JSONB and a bad one must not block writes.
+    entity_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    cursor: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
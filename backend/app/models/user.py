@@ -20,7 +20,7 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    recipes = relationship("Recipe", back_populates="user", cascade="all, delete-orphan")
-    chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan")
-    household_ingredients = relationship("HouseholdIngredient", back_populates="user", cascade="all, delete-orphan")
-    shopping_list = relationship("ShoppingList", back_populates="user", cascade="all, delete-orphan", uselist=False)
+    recipes = relationship("Recipe", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    household_ingredients = relationship("HouseholdIngredient", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    shopping_list = relationship("ShoppingList", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, uselist=False)
@@ -1,108 +1,149 @@
+import asyncio
 import json
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.models.chat import ChatSession, ChatMessage
 from app.models.user import User
 from app.schemas.chat import ChatSendRequest, ChatSessionOut, ChatMessageOut
 from app.services.auth import get_current_user
-from app.services.ai import stream_agent_response, db_messages_to_langchain, _build_user_context
+from app.services.etags import conditional_get
+from app.services.chat_archive import rehydrate_session, session_messages
+from app.services.kitchen_snapshot import load_kitchen_snapshot
+from app.services.replicas import get_read_db
+from app.services.serialization import as_rows, trusted_json
+from app.services.ai_loader import load_ai
+from app.services.llm_scheduler import require_llm_capacity
+from app.services.quotas import enforce_ai_quota
+from app.services.shutdown import StreamInterrupted, shutdown_drain
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-@router.get("/sessions", response_model=list[ChatSessionOut])
+@router.get(
+    "/sessions",
+    response_model=list[ChatSessionOut],
+    dependencies=[Depends(conditional_get("chat_sessions"))],
+)
 async def list_sessions(
+    response: Response,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(ChatSession)
         .where(ChatSession.user_id == user.id)
         .order_by(ChatSession.updated_at.desc())
     )
-    return result.scalars().all()
+    return trusted_json(as_rows(ChatSessionOut, result.scalars()), response)
 
 
 @router.get("/sessions/{session_id}/messages", response_model=list[ChatMessageOut])
 async def get_messages(
     session_id: uuid.UUID,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(ChatSession)
         .where(ChatSession.id == session_id, ChatSession.user_id == user.id)
-        .options(selectinload(ChatSession.messages))
     )
     session = result.scalar_one_or_none()
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    return session.messages
+    return trusted_json(as_rows(ChatMessageOut, await session_messages(db, session)))
 
 
-@router.post("/send")
+@router.post("/send", dependencies=[Depends(shutdown_drain.refuse_when_draining), Depends(require_llm_capacity)])
 async def send_message(
     body: ChatSendRequest,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    quota_headers: dict[str, str] = Depends(enforce_ai_quota),
 ):
+    ai = await load_ai()
     if body.session_id:
+        # The row lock covers rehydration and the updated_at bump, and ends with the commit before the
+        # stream starts. What keeps the archiver away during the turn is the bump: it only takes
+        # sessions idle for CHAT_ARCHIVE_AFTER_DAYS.
         result = await db.execute(
             select(ChatSession)
             .where(ChatSession.id == body.session_id, ChatSession.user_id == user.id)
-            .options(selectinload(ChatSession.messages))
+            .with_for_update()
         )
         session = result.scalar_one_or_none()
         if not session:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        if session.archived_at is not None:
+            await rehydrate_session(db, session)
+        # The snapshot uses its own session, so it loads while the history query runs.
+        history, kitchen = await asyncio.gather(session_messages(db, session), load_kitchen_snapshot(user.id))
+        session.updated_at = func.now()
     else:
-        session = ChatSession(user_id=user.id, title=body.message[:60])
+        session = ChatSession(id=uuid.uuid4(), user_id=user.id, title=body.message[:60])
         db.add(session)
-        await db.commit()
-        await db.refresh(session)
-        result = await db.execute(
-            select(ChatSession)
-            .where(ChatSession.id == session.id)
-            .options(selectinload(ChatSession.messages))
-        )
-        session = result.scalar_one()
+        history, kitchen = [], await load_kitchen_snapshot(user.id)
 
     user_msg = ChatMessage(session_id=session.id, role="user", content=body.message)
     db.add(user_msg)
     await db.commit()
 
-    chat_history = db_messages_to_langchain(session.messages)
-    user_context = _build_user_context(user.display_name, user.dietary_preferences)
+    chat_history = ai.db_messages_to_langchain(history)
+    user_context = ai._build_user_context(user.display_name, user.dietary_preferences)
 
+    session_id = session.id
     collected_tokens: list[str] = []
 
     async def event_stream():
-        async for chunk in stream_agent_response(db, user.id, chat_history, body.message, user_context=user_context):
-            yield chunk
-
-            try:
-                data = json.loads(chunk.replace("data: ", "").strip())
+        # get_db has already closed ``db`` by the time the body runs, so the turn's writes start a
+        # transaction nobody else ends. Whatever stops the stream (the done commit, a model error,
+        # the client going away, the drain deadline), give the connection back without it.
+        chunks = ai.stream_agent_response(
+            db, user.id, chat_history, body.message, user_context=user_context, kitchen_snapshot=kitchen
+        )
+        try:
+            async for chunk in shutdown_drain.guard(chunks):
+                try:
+                    data = json.loads(chunk.replace("data: ", "").strip())
+                except (json.JSONDecodeError, ValueError):
+                    data = {}
                 if "token" in data:
                     collected_tokens.append(data["token"])
                 if data.get("done"):
-                    assistant_content = "".join(collected_tokens)
-                    ai_msg = ChatMessage(
-                        session_id=session.id, role="assistant", content=assistant_content
-                    )
+                    # The turn's single commit: the tools' staged writes and the reply land together,
+                    # before the client is told the turn is done.
+                    ai_msg = ChatMessage(session_id=session_id, role="assistant", content="".join(collected_tokens))
                     db.add(ai_msg)
                     await db.commit()
-                    yield f"data: {json.dumps({'session_id': str(session.id)})}\n\n"
-            except (json.JSONDecodeError, ValueError):
-                pass
-
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+                    yield chunk
+                    yield f"data: {json.dumps({'session_id': str(session_id)})}\n\n"
+                else:
+                    yield chunk
+        except StreamInterrupted:
+            # The worker is shutting down and the turn ran past the drain deadline. The user's
+            # message is saved; nothing from the reply is.
+            await db.rollback()
+            error = "The server restarted before the reply finished; nothing from it was kept. Please send it again."
+            yield f"data: {json.dumps({'error': error, 'retry_after': 1, 'session_id': str(session_id)})}\n\n"
+        finally:
+            # Shielded: on a disconnect the server cancels the response task, and the rollback must
+            # still reach the database.
+            await asyncio.shield(_release(db))
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=quota_headers)
+
+
+async def _release(db: AsyncSession) -> None:
+    """Roll back anything a chat turn left uncommitted and return its connection to the pool."""
+    try:
+        await db.rollback()
+    finally:
+        await db.close()
 
 
 @router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -111,11 +152,12 @@ async def delete_session(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    # One statement: the messages go with it through ON DELETE CASCADE.
     result = await db.execute(
-        select(ChatSession).where(ChatSession.id == session_id, ChatSession.user_id == user.id)
+        delete(ChatSession)
+        .where(ChatSession.id == session_id, ChatSession.user_id == user.id)
+        .returning(ChatSession.id)
     )
-    session = result.scalar_one_or_none()
-    if not session:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    await db.delete(session)
     await db.commit()
@@ -1,6 +1,6 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Response, status, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,25 +11,32 @@ from app.schemas.ingredient import (
     IngredientCreate,
     IngredientUpdate,
     IngredientOut,
-    IngredientPhotoScanResponse,
 )
+from app.schemas.job import JobOut
 from app.services.auth import get_current_user
-from app.services.ai import extract_ingredients_from_photo, _build_user_context
+from app.services.etags import conditional_get
+from app.services.replicas import get_read_db
+from app.services.jobs import submit_job
+from app.services.serialization import as_rows, trusted_json
+from app.services.llm_scheduler import require_llm_capacity
+from app.services.quotas import enforce_ai_quota
+from app.services.scans import INGREDIENT_PHOTO_SCAN
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
 
 
-@router.get("", response_model=list[IngredientOut])
+@router.get("", response_model=list[IngredientOut], dependencies=[Depends(conditional_get("ingredients"))])
 async def list_ingredients(
+    response: Response,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(HouseholdIngredient)
         .where(HouseholdIngredient.user_id == user.id)
         .order_by(HouseholdIngredient.name)
     )
-    return result.scalars().all()
+    return trusted_json(as_rows(IngredientOut, result.scalars()), response)
 
 
 @router.post("", response_model=IngredientOut, status_code=status.HTTP_201_CREATED)
@@ -51,12 +58,20 @@ async def create_ingredient(
     return item
 
 
-@router.post("/scan-photo", response_model=IngredientPhotoScanResponse)
+@router.post(
+    "/scan-photo",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_llm_capacity)],
+)
 async def scan_photo_for_ingredients(
     photo: UploadFile = File(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=100),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    quota_headers: dict[str, str] = Depends(enforce_ai_quota),
 ):
+    """Queue the scan; the job's result is an ``IngredientPhotoScanResponse``."""
     content_type = (photo.content_type or "").lower()
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file must be an image")
@@ -65,40 +80,15 @@ async def scan_photo_for_ingredients(
     if not image_bytes:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded image is empty")
 
-    category_rows = await db.execute(
-        select(HouseholdIngredient.category)
-        .where(HouseholdIngredient.user_id == user.id, HouseholdIngredient.category.is_not(None))
-        .distinct()
+    return await submit_job(
+        db,
+        user.id,
+        INGREDIENT_PHOTO_SCAN,
+        {"content_type": content_type},
+        blob=image_bytes,
+        idempotency_key=idempotency_key,
+        headers=quota_headers,
     )
-    user_categories = [
-        category.strip()
-        for category in category_rows.scalars().all()
-        if isinstance(category, str) and category.strip()
-    ]
-
-    user_context = _build_user_context(user.display_name, user.dietary_preferences)
-
-    try:
-        parsed = await extract_ingredients_from_photo(
-            image_bytes=image_bytes,
-            image_mime_type=content_type,
-            user_categories=user_categories,
-            user_context=user_context,
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Ingredient extraction from image failed: {exc}",
-        ) from exc
-
-    ingredients: list[IngredientCreate] = []
-    for candidate in parsed:
-        try:
-            ingredients.append(IngredientCreate.model_validate(candidate))
-        except Exception:
-            continue
-
-    return IngredientPhotoScanResponse(ingredients=ingredients)
 
 
 @router.put("/{item_id}", response_model=IngredientOut)
@@ -0,0 +1,46 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.job import JobOut
+from app.services.auth import get_current_user
+from app.services.jobs import TERMINAL_STATUSES, get_job, job_event_stream
+from app.services.serialization import trusted_json
+from app.services.shutdown import shutdown_drain
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_status(
+    job_id: uuid.UUID,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await get_job(db, user.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job["status"] not in TERMINAL_STATUSES:
+        response.headers["Retry-After"] = "1"
+    return trusted_json(job, response)
+
+
+@router.get("/{job_id}/events", dependencies=[Depends(shutdown_drain.refuse_when_draining)])
+async def job_events(
+    job_id: uuid.UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """SSE: the job whenever its status changes; the stream ends once it has finished."""
+    if await get_job(db, user.id, job_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return StreamingResponse(
+        job_event_stream(user.id, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
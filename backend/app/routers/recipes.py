@@ -1,37 +1,43 @@
 import uuid
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, status, UploadFile
 from sqlalchemy import select, asc, desc, cast, String
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.models.chat import ChatSession
 from app.models.recipe import Recipe
 from app.models.user import User
+from app.schemas.job import JobOut
 from app.schemas.recipe import (
     RecipeCreate,
     RecipeUpdate,
     RecipeOut,
     RecipeConversationScanRequest,
-    RecipeConversationScanResponse,
 )
 from app.services.auth import get_current_user
-from app.services.ai import extract_recipes_from_transcript, extract_recipes_from_photo, _build_user_context
+from app.services.etags import conditional_get
+from app.services.replicas import get_read_db
+from app.services.jobs import submit_job
+from app.services.serialization import as_row, as_rows, trusted_json
+from app.services.llm_scheduler import require_llm_capacity
+from app.services.quotas import enforce_ai_quota
+from app.services.scans import RECIPE_CONVERSATION_SCAN, RECIPE_PHOTO_SCAN
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
 SORTABLE_FIELDS = {"name", "prep_time_minutes", "created_at", "source", "category", "favourite"}
 
 
-@router.get("", response_model=list[RecipeOut])
+@router.get("", response_model=list[RecipeOut], dependencies=[Depends(conditional_get("recipes"))])
 async def list_recipes(
+    response: Response,
     sort_by: str = Query("created_at", description="Field to sort by"),
     order: Literal["asc", "desc"] = Query("desc"),
     ingredient: str | None = Query(None, description="Filter by ingredient name"),
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     query = select(Recipe).where(Recipe.user_id == user.id)
 
@@ -47,14 +53,14 @@ async def list_recipes(
     query = query.order_by(desc(col) if order == "desc" else asc(col))
 
     result = await db.execute(query)
-    return result.scalars().all()
+    return trusted_json(as_rows(RecipeOut, result.scalars()), response)
 
 
 @router.get("/{recipe_id}", response_model=RecipeOut)
 async def get_recipe(
     recipe_id: uuid.UUID,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(Recipe).where(Recipe.id == recipe_id, Recipe.user_id == user.id)
@@ -62,7 +68,7 @@ async def get_recipe(
     recipe = result.scalar_one_or_none()
     if not recipe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
-    return recipe
+    return trusted_json(as_row(RecipeOut, recipe))
 
 
 @router.post("", response_model=RecipeOut, status_code=status.HTTP_201_CREATED)
@@ -88,69 +94,50 @@ async def create_recipe(
     return recipe
 
 
-@router.post("/scan-conversation", response_model=RecipeConversationScanResponse)
+@router.post(
+    "/scan-conversation",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_llm_capacity)],
+)
 async def scan_conversation_for_recipes(
     body: RecipeConversationScanRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=100),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    quota_headers: dict[str, str] = Depends(enforce_ai_quota),
 ):
+    """Queue the scan; the job's result is a ``RecipeConversationScanResponse``."""
     result = await db.execute(
-        select(ChatSession)
+        select(ChatSession.id)
         .where(ChatSession.id == body.session_id, ChatSession.user_id == user.id)
-        .options(selectinload(ChatSession.messages))
     )
-    session = result.scalar_one_or_none()
-    if not session:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    if not session.messages:
-        return RecipeConversationScanResponse(recipes=[])
-
-    transcript_lines = [
-        f"{msg.role.upper()}: {msg.content.strip()}"
-        for msg in session.messages
-        if msg.content and msg.content.strip()
-    ]
-    transcript = "\n\n".join(transcript_lines)
-    if not transcript:
-        return RecipeConversationScanResponse(recipes=[])
-
-    category_rows = await db.execute(
-        select(Recipe.category)
-        .where(Recipe.user_id == user.id, Recipe.category.is_not(None))
-        .distinct()
+    return await submit_job(
+        db,
+        user.id,
+        RECIPE_CONVERSATION_SCAN,
+        {"session_id": str(body.session_id)},
+        idempotency_key=idempotency_key,
+        headers=quota_headers,
     )
-    user_categories = [
-        category.strip()
-        for category in category_rows.scalars().all()
-        if isinstance(category, str) and category.strip()
-    ]
-
-    user_context = _build_user_context(user.display_name, user.dietary_preferences)
 
-    try:
-        parsed = await extract_recipes_from_transcript(transcript, user_categories=user_categories, user_context=user_context)
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Recipe extraction failed: {exc}",
-        ) from exc
 
-    recipes: list[RecipeCreate] = []
-    for candidate in parsed:
-        try:
-            recipes.append(RecipeCreate.model_validate(candidate))
-        except Exception:
-            continue
-
-    return RecipeConversationScanResponse(recipes=recipes)
-
-
-@router.post("/scan-photo", response_model=RecipeConversationScanResponse)
+@router.post(
+    "/scan-photo",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_llm_capacity)],
+)
 async def scan_photo_for_recipes(
     photo: UploadFile = File(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=100),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    quota_headers: dict[str, str] = Depends(enforce_ai_quota),
 ):
+    """Queue the scan; the job's result is a ``RecipeConversationScanResponse``."""
     content_type = (photo.content_type or "").lower()
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file must be an image")
@@ -159,40 +146,15 @@ async def scan_photo_for_recipes(
     if not image_bytes:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded image is empty")
 
-    category_rows = await db.execute(
-        select(Recipe.category)
-        .where(Recipe.user_id == user.id, Recipe.category.is_not(None))
-        .distinct()
+    return await submit_job(
+        db,
+        user.id,
+        RECIPE_PHOTO_SCAN,
+        {"content_type": content_type},
+        blob=image_bytes,
+        idempotency_key=idempotency_key,
+        headers=quota_headers,
     )
-    user_categories = [
-        category.strip()
-        for category in category_rows.scalars().all()
-        if isinstance(category, str) and category.strip()
-    ]
-
-    user_context = _build_user_context(user.display_name, user.dietary_preferences)
-
-    try:
-        parsed = await extract_recipes_from_photo(
-            image_bytes=image_bytes,
-            image_mime_type=content_type,
-            user_categories=user_categories,
-            user_context=user_context,
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Recipe extraction from image failed: {exc}",
-        ) from exc
-
-    recipes: list[RecipeCreate] = []
-    for candidate in parsed:
-        try:
-            recipes.append(RecipeCreate.model_validate(candidate))
-        except Exception:
-            continue
-
-    return RecipeConversationScanResponse(recipes=recipes)
 
 
 @router.put("/{recipe_id}", response_model=RecipeOut)
@@ -1,6 +1,7 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -18,18 +19,33 @@ from app.schemas.shopping_list import (
     ShoppingListOut,
 )
 from app.services.auth import get_current_user
+from app.services.etags import conditional_get
+from app.services.serialization import trusted_json
+from app.services.shopping_list_events import shopping_list_hub
 from app.services.shopping_list import finalize_shopping_items
+from app.services.shutdown import shutdown_drain
 
 router = APIRouter(prefix="/shopping-list", tags=["shopping-list"])
 
 
-@router.get("", response_model=ShoppingListOut)
+@router.get("", response_model=ShoppingListOut, dependencies=[Depends(conditional_get("shopping_list", get_db))])
 async def get_shopping_list(
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     shopping_list = await _get_or_create_shopping_list(db, user.id)
-    return _to_out(shopping_list)
+    return _to_out(shopping_list, response)
+
+
+@router.get("/events", dependencies=[Depends(shutdown_drain.refuse_when_draining)])
+async def shopping_list_events(user: User = Depends(get_current_user)):
+    """SSE: a ``snapshot`` of the items, then a ``diff`` (upserted items, deleted ids) per change."""
+    return StreamingResponse(
+        shopping_list_hub.stream(user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/items", response_model=ShoppingListOut)
@@ -60,11 +76,13 @@ async def update_shopping_list_item(
     db: AsyncSession = Depends(get_db),
 ):
     shopping_list = await _get_or_create_shopping_list(db, user.id)
-    items = [ShoppingListItem.model_validate(item) for item in shopping_list.items]
+    items = list(shopping_list.items)
 
-    target = next((item for item in items if item.id == item_id), None)
-    if not target:
+    index = next((i for i, item in enumerate(items) if str(item.get("id")) == str(item_id)), None)
+    if index is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shopping list item not found")
+    # Only the edited item goes through the model; the rest are stored as dumped already.
+    target = ShoppingListItem.model_validate(items[index])
 
     updates = body.model_dump(exclude_unset=True)
     for key, value in updates.items():
@@ -75,7 +93,8 @@ async def update_shopping_list_item(
     if not target.name or not target.name.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item name cannot be empty")
 
-    shopping_list.items = [item.model_dump(mode="json") for item in items]
+    items[index] = target.model_dump(mode="json")
+    shopping_list.items = items
     await db.commit()
     await db.refresh(shopping_list)
     return _to_out(shopping_list)
@@ -121,10 +140,8 @@ async def finalize_shopping_list(
     shopping_list.items = finalized
     await db.commit()
 
-    return ShoppingListFinalizeResponse(
-        shopping_list=[ShoppingListItem.model_validate(item) for item in finalized],
-        excluded_as_in_pantry=excluded,
-    )
+    # finalize_shopping_items already returns items in the ShoppingListItem shape.
+    return trusted_json({"shopping_list": finalized, "excluded_as_in_pantry": excluded})
 
 
 @router.post("/finish", response_model=FinishAndAddResponse)
@@ -133,8 +150,8 @@ async def finish_and_add_to_pantry(
     db: AsyncSession = Depends(get_db),
 ):
     shopping_list = await _get_or_create_shopping_list(db, user.id)
-    items = [ShoppingListItem.model_validate(item) for item in shopping_list.items]
-    checked_items = [item for item in items if item.checked]
+    items = shopping_list.items
+    checked_items = [ShoppingListItem.model_validate(item) for item in items if item.get("checked")]
 
     for item in checked_items:
         db.add(
@@ -171,10 +188,13 @@ async def _get_or_create_shopping_list(db: AsyncSession, user_id: uuid.UUID) ->
     return shopping_list
 
 
-def _to_out(shopping_list: ShoppingList) -> ShoppingListOut:
-    return ShoppingListOut(
-        id=shopping_list.id,
-        items=[ShoppingListItem.model_validate(item) for item in shopping_list.items],
-        created_at=shopping_list.created_at,
-        updated_at=shopping_list.updated_at,
-    )
+def _to_out(shopping_list: ShoppingList, response: Response | None = None) -> Response:
+    # Items are only ever stored via ShoppingListItem.model_dump or finalize_shopping_items, so
+    # the JSONB is already in the ShoppingListOut shape and is encoded as-is.
+    content = {
+        "id": shopping_list.id,
+        "items": shopping_list.items,
+        "created_at": shopping_list.created_at,
+        "updated_at": shopping_list.updated_at,
+    }
+    return trusted_json(content, response)
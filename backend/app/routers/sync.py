@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models.user import User
+from app.schemas.sync import SyncPushRequest, SyncPushResponse, SyncResponse
+from app.services.auth import get_current_user
+from app.services.replicas import get_read_db
+from app.services.serialization import trusted_json
+from app.services.sync import apply_operations, read_changes
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def pull_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous sync; 0 for a full sync"),
+    limit: int | None = Query(None, ge=1, description="Maximum changes per page"),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    page_size = min(limit or settings.sync_page_size, settings.sync_page_size)
+    return trusted_json(await read_changes(db, user.id, since, page_size))
+
+
+@router.post("/push", response_model=SyncPushResponse)
+async def push_changes(
+    body: SyncPushRequest,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if len(body.operations) > settings.sync_push_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.sync_push_max_operations} operations per push",
+        )
+    results = await apply_operations(db, user.id, body.operations)
+    await db.commit()
+    return SyncPushResponse(results=results)
@@ -25,3 +25,7 @@ class ChatSessionOut(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ChatSessionUpdate(BaseModel):
+    title: str
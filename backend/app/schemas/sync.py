@@ -0,0 +1,48 @@
+import uuid
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+SyncCollection = Literal["recipes", "ingredients", "shopping_list_items", "chat_sessions"]
+
+
+class SyncChangeOut(BaseModel):
+    collection: SyncCollection
+    id: str
+    cursor: int
+    deleted: bool
+    # RecipeOut, IngredientOut, ShoppingListItem or ChatSessionOut; null for tombstones
+    data: dict[str, Any] | None = None
+
+
+class SyncResponse(BaseModel):
+    cursor: int
+    has_more: bool
+    # The requested cursor predates pruned tombstones: drop local state and apply these changes.
+    reset: bool
+    changes: list[SyncChangeOut]
+
+
+class SyncOperation(BaseModel):
+    collection: SyncCollection
+    op: Literal["upsert", "delete"]
+    id: uuid.UUID
+    # Create or update fields (e.g. RecipeCreate / RecipeUpdate); ignored for deletes
+    data: dict[str, Any] = {}
+    # Cursor of the entity the edit was based on; a newer server change turns the edit into a conflict
+    base_cursor: int | None = None
+
+
+class SyncPushRequest(BaseModel):
+    operations: list[SyncOperation]
+
+
+class SyncOperationResult(BaseModel):
+    collection: SyncCollection
+    id: uuid.UUID
+    status: Literal["applied", "conflict", "rejected"]
+    detail: str | None = None
+
+
+class SyncPushResponse(BaseModel):
+    results: list[SyncOperationResult]
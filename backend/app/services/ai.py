@@ -1,21 +1,41 @@
+import asyncio
 import base64
 import json
+import logging
 import uuid
 from typing import Any, AsyncGenerator
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.recipe import Recipe
 from app.models.ingredient import HouseholdIngredient
 from app.models.shopping_list import ShoppingList
+from app.services.image_tiles import merge_ingredient_results, merge_recipe_results, split_image
+from app.services.llm_metrics import OperationMetrics, llm_metrics_callback, track_operation
+from app.services.llm_providers import (
+    ROUTE_CHAT_AGENT,
+    ROUTE_INGREDIENT_PHOTO,
+    ROUTE_RECIPE_PHOTO,
+    ROUTE_TRANSCRIPT_EXTRACTION,
+    get_chat_model,
+)
+from app.services.llm_scheduler import LLMCapacityError, Priority, scheduler_callback
+from app.services.metrics import LLM_PARSE_FAILURES, LLM_TILE_FAILURES
+from app.services.quotas import usage_callback
+from app.services.pantry import find_matching_items, remove_matching_statement
 from app.services.shopping_list import finalize_shopping_items
+from app.services.tool_batch import ToolBatcher
+from app.services.turn_writes import TurnWrites
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """You are a friendly grocery and meal-planning assistant. You help users:
 - Plan meals for the week before they go grocery shopping
@@ -30,8 +50,7 @@ When a user asks to create or update a shopping list, use the create_shopping_li
 
 Be concise and practical. Format recipes clearly with ingredients, prep time, and step-by-step instructions.
 When suggesting a meal plan, organize it by day and include a consolidated shopping list at the end.
-
-{user_context}"""
+"""
 
 
 def _build_user_context(
@@ -127,81 +146,156 @@ Rules:
 - If the image has no usable ingredient content, return {"ingredients": []}.
 """
 
-RECIPE_EXTRACTION_PROMPT = """Extract recipes from this conversation transcript.
 
-Return JSON only in this shape:
-{
-  "recipes": [
-    {
-      "name": "string",
-      "description": "string or null",
-      "ingredients": [{"name": "string", "quantity": "string", "unit": "string"}],
-      "prep_time_minutes": "integer or null",
-      "instructions": "string or null",
-      "source": "string or null",
-      "favourite": "boolean",
-      "category": "string or null"
-    }
-  ]
-}
+def _parse_shopping_items(ingredients: str) -> list[Any]:
+    parsed: Any = []
+    try:
+        parsed = json.loads(ingredients)
+    except json.JSONDecodeError:
+        parsed = [{"name": ingredients}]
+
+    if isinstance(parsed, dict):
+        parsed = parsed.get("ingredients", [])
+    if not isinstance(parsed, list):
+        parsed = []
+    return parsed
+
+
+def build_tools(db: AsyncSession, user_id: uuid.UUID, writes: TurnWrites, batcher: ToolBatcher):
+    # Each tool hands its arguments to the batcher; the bulk handlers below serve every call of
+    # that tool in the current agent step at once.
+
+    async def save_recipes(calls: list[dict[str, Any]]) -> list[str]:
+        for call in calls:
+            try:
+                parsed = json.loads(call["ingredients"])
+            except json.JSONDecodeError:
+                parsed = [{"name": call["ingredients"], "quantity": "", "unit": ""}]
+            recipe = Recipe(
+                user_id=user_id,
+                name=call["name"],
+                description=call["description"],
+                ingredients=parsed,
+                prep_time_minutes=call["prep_time_minutes"],
+                instructions=call["instructions"],
+                source=call["source"],
+                favourite=call["favourite"],
+                category=call["category"] or None,
+            )
+            await writes.add(recipe)
+        return [f"Recipe '{call['name']}' saved successfully." for call in calls]
+
+    async def add_pantry_items(calls: list[dict[str, Any]]) -> list[str]:
+        for call in calls:
+            await writes.add(HouseholdIngredient(user_id=user_id, **call))
+        return [f"Added '{call['name']}' to pantry." for call in calls]
+
+    # Pantry items this turn's removals will delete when the turn's writes are flushed.
+    removed: list[HouseholdIngredient] = []
+
+    async def remove_pantry_items(calls: list[dict[str, Any]]) -> list[str]:
+        names = [call["name"] for call in calls]
+        queries = [name.strip().lower() for name in names]
+        # The DELETE runs at flush, after the adds staged before it; preview what it will take so
+        # the model is told now. Staged adds only take part by exact name.
+        found = await find_matching_items(db, user_id, names, [item.id for item in removed if item.id])
+        staged = [item for item in writes.staged(HouseholdIngredient) if not any(item is r for r in removed)]
+        for query, items in zip(queries, found):
+            exact = [item for item in staged if item.name.lower() == query]
+            if exact:
+                items[:] = [item for item in items if item.name.lower() == query] + exact
+            removed.extend(items)
+        if any(queries):
+            writes.defer(remove_matching_statement(user_id, queries))
+        return [
+            f"Removed {', '.join(repr(item.name) for item in items)} from pantry."
+            if items
+            else f"No pantry item matching '{name}' found."
+            for name, items in zip(names, found)
+        ]
 
-Rules:
-- Include only actual recipes present in the conversation.
-- Do not invent missing details. Use null or empty strings where needed.
-- Ensure each recipe has at least a non-empty name and one ingredient.
-- The "ingredients" field must always be an array.
-"""
+    async def current_pantry(stmt, keep_staged=lambda item: True) -> list[HouseholdIngredient]:
+        """Pantry rows from ``stmt`` plus the items this turn has added, less those it has removed."""
+        removed_ids = [item.id for item in removed if item.id]
+        if removed_ids:
+            stmt = stmt.where(HouseholdIngredient.id.not_in(removed_ids))
+        rows = (await db.execute(stmt)).scalars().all()
+        staged = writes.staged(HouseholdIngredient)
+        return [
+            *rows,
+            *(item for item in staged if keep_staged(item) and not any(item is r for r in removed)),
+        ]
 
-RECIPE_IMAGE_EXTRACTION_PROMPT = """Extract recipe text from this photo and return structured JSON.
+    async def pantry_lines(category: str, name_prefix: str, limit: int) -> str:
+        stmt = (
+            select(HouseholdIngredient)
+            .where(HouseholdIngredient.user_id == user_id)
+            .order_by(HouseholdIngredient.name)
+            .limit(limit + 1)
+        )
+        if category:
+            stmt = stmt.where(func.lower(HouseholdIngredient.category) == category)
+        if name_prefix:
+            stmt = stmt.where(HouseholdIngredient.name.istartswith(name_prefix, autoescape=True))
+        items = sorted(
+            await current_pantry(
+                stmt,
+                lambda item: (not category or (item.category or "").lower() == category)
+                and item.name.lower().startswith(name_prefix.lower()),
+            ),
+            key=lambda item: item.name,
+        )
+        if not items:
+            return "No matching pantry items." if category or name_prefix else "Pantry is empty."
+        lines = [f"- {i.name}: {i.quantity} {i.unit} ({i.category})" for i in items[:limit]]
+        if len(items) > limit:
+            lines.append(f"(more than {limit} items; narrow with category or name_prefix)")
+        return "Current pantry:\n" + "\n".join(lines)
 
-Return JSON only in this shape:
-{
-  "recipes": [
-    {
-      "name": "string",
-      "description": "string or null",
-      "ingredients": [{"name": "string", "quantity": "string", "unit": "string"}],
-      "prep_time_minutes": "integer or null",
-      "instructions": "string or null",
-      "source": "string or null",
-      "favourite": "boolean",
-      "category": "string or null"
-    }
-  ]
-}
+    async def read_pantry(calls: list[dict[str, Any]]) -> list[str]:
+        # Identical lookups in one step share a query.
+        keys = [
+            (call["category"].strip().lower(), call["name_prefix"].strip(), max(1, min(call["limit"], 200)))
+            for call in calls
+        ]
+        results: dict[tuple[str, str, int], str] = {}
+        for key in keys:
+            if key not in results:
+                results[key] = await pantry_lines(*key)
+        return [results[key] for key in keys]
 
-Rules:
-- Parse only recipes visible/readable in the image.
-- Do not invent missing details. Use null or empty strings where needed.
-- Ensure each recipe has at least a non-empty name and one ingredient.
-- If the image has no usable recipe content, return {"recipes": []}.
-- The "ingredients" field must always be an array.
-"""
+    async def update_shopping_list(calls: list[dict[str, Any]]) -> list[str]:
+        # Same-step calls are merged into one update; each caller sees the combined list.
+        candidates = [item for call in calls for item in _parse_shopping_items(call["ingredients"])]
 
-INGREDIENT_IMAGE_EXTRACTION_PROMPT = """Extract pantry ingredients from this photo and return structured JSON.
+        pantry_items = await current_pantry(select(HouseholdIngredient).where(HouseholdIngredient.user_id == user_id))
 
-Return JSON only in this shape:
-{
-  "ingredients": [
-    {
-      "name": "string",
-      "quantity": "string or empty string",
-      "unit": "string or empty string",
-      "category": "string or null"
-    }
-  ]
-}
+        shopping_list = next(iter(writes.staged(ShoppingList)), None)
+        if not shopping_list:
+            list_result = await db.execute(
+                select(ShoppingList).where(ShoppingList.user_id == user_id)
+            )
+            shopping_list = list_result.scalar_one_or_none()
+        if not shopping_list:
+            shopping_list = ShoppingList(user_id=user_id, items=[])
+            await writes.add(shopping_list)
 
-Rules:
-- Parse only ingredient items visible/readable in the image (labels, lists, grocery receipts, pantry shelves).
-- Do not invent missing details. Use empty strings for unknown quantity/unit and null for unknown category.
-- Skip entries with empty names.
-- Normalize obvious OCR noise where possible (for example, fix common misspellings if confidence is high).
-- If the image has no usable ingredient content, return {"ingredients": []}.
-"""
+        finalized, excluded = finalize_shopping_items(
+            existing_items=shopping_list.items,
+            pantry_items=[{"name": item.name} for item in pantry_items],
+            candidate_items=candidates,
+        )
+        shopping_list.items = finalized
 
+        return [
+            json.dumps(
+                {
+                    "shopping_list": finalized,
+                    "excluded_as_in_pantry": excluded,
+                }
+            )
+        ] * len(calls)
 
-def build_tools(db: AsyncSession, user_id: uuid.UUID):
     @tool
     async def save_recipe(
         name: str,
@@ -225,25 +319,17 @@ def build_tools(db: AsyncSession, user_id: uuid.UUID):
             favourite: Whether recipe should be starred as favorite
             category: Recipe category like dinner, breakfast, dessert
         """
-        try:
-            parsed = json.loads(ingredients)
-        except json.JSONDecodeError:
-            parsed = [{"name": ingredients, "quantity": "", "unit": ""}]
-
-        recipe = Recipe(
-            user_id=user_id,
-            name=name,
-            description=description,
-            ingredients=parsed,
-            prep_time_minutes=prep_time_minutes,
-            instructions=instructions,
-            source=source,
-            favourite=favourite,
-            category=category or None,
-        )
-        db.add(recipe)
-        await db.commit()
-        return f"Recipe '{name}' saved successfully."
+        call = {
+            "name": name,
+            "description": description,
+            "ingredients": ingredients,
+            "prep_time_minutes": prep_time_minutes,
+            "instructions": instructions,
+            "source": source,
+            "favourite": favourite,
+            "category": category,
+        }
+        return await batcher.run("save_recipe", call, save_recipes)
 
     @tool
     async def add_pantry_item(name: str, quantity: str = "", unit: str = "", category: str = "") -> str:
@@ -255,45 +341,34 @@ def build_tools(db: AsyncSession, user_id: uuid.UUID):
             unit: Unit of measure (e.g. "lbs", "g", "cups")
             category: Category like produce, dairy, meat, etc.
         """
-        item = HouseholdIngredient(
-            user_id=user_id, name=name, quantity=quantity, unit=unit, category=category
-        )
-        db.add(item)
-        await db.commit()
-        return f"Added '{name}' to pantry."
+        call = {"name": name, "quantity": quantity, "unit": unit, "category": category}
+        return await batcher.run("add_pantry_item", call, add_pantry_items)
 
     @tool
     async def remove_pantry_item(name: str) -> str:
         """Remove an ingredient from the user's household pantry.
 
+        Removes every item with exactly this name, or else the single closest match.
+
         Args:
             name: Ingredient name to remove
         """
-        result = await db.execute(
-            select(HouseholdIngredient).where(
-                HouseholdIngredient.user_id == user_id,
-                HouseholdIngredient.name.ilike(f"%{name}%"),
-            )
-        )
-        items = result.scalars().all()
-        if not items:
-            return f"No pantry item matching '{name}' found."
-        for item in items:
-            await db.delete(item)
-        await db.commit()
-        return f"Removed {len(items)} item(s) matching '{name}' from pantry."
+        return await batcher.run("remove_pantry_item", {"name": name}, remove_pantry_items)
 
     @tool
-    async def get_pantry() -> str:
-        """Get all ingredients currently in the user's household pantry."""
-        result = await db.execute(
-            select(HouseholdIngredient).where(HouseholdIngredient.user_id == user_id)
-        )
-        items = result.scalars().all()
-        if not items:
-            return "Pantry is empty."
-        lines = [f"- {i.name}: {i.quantity} {i.unit} ({i.category})" for i in items]
-        return "Current pantry:\n" + "\n".join(lines)
+    async def get_pantry(category: str = "", name_prefix: str = "", limit: int = 50) -> str:
+        """Look up ingredients in the user's household pantry.
+
+        The kitchen snapshot in the context already summarizes the pantry; use this for items it
+        leaves out.
+
+        Args:
+            category: Only items in this category, e.g. produce, dairy
+            name_prefix: Only items whose name starts with this text
+            limit: Maximum number of items to return (up to 200)
+        """
+        call = {"category": category, "name_prefix": name_prefix, "limit": limit}
+        return await batcher.run("get_pantry", call, read_pantry)
 
     @tool
     async def create_shopping_list(ingredients: str) -> str:
@@ -303,66 +378,62 @@ def build_tools(db: AsyncSession, user_id: uuid.UUID):
             ingredients: JSON list of ingredient items. Each item should include at least "name",
                 and can also include quantity, unit, and category.
         """
-        parsed: Any = []
-        try:
-            parsed = json.loads(ingredients)
-        except json.JSONDecodeError:
-            parsed = [{"name": ingredients}]
-
-        if isinstance(parsed, dict):
-            parsed = parsed.get("ingredients", [])
-        if not isinstance(parsed, list):
-            parsed = []
-
-        pantry_result = await db.execute(
-            select(HouseholdIngredient).where(HouseholdIngredient.user_id == user_id)
-        )
-        pantry_items = pantry_result.scalars().all()
-
-        list_result = await db.execute(
-            select(ShoppingList).where(ShoppingList.user_id == user_id)
-        )
-        shopping_list = list_result.scalar_one_or_none()
-        if not shopping_list:
-            shopping_list = ShoppingList(user_id=user_id, items=[])
-            db.add(shopping_list)
-            await db.flush()
-
-        finalized, excluded = finalize_shopping_items(
-            existing_items=shopping_list.items,
-            pantry_items=[{"name": item.name} for item in pantry_items],
-            candidate_items=parsed,
-        )
-        shopping_list.items = finalized
-        await db.commit()
-
-        return json.dumps(
-            {
-                "shopping_list": finalized,
-                "excluded_as_in_pantry": excluded,
-            }
-        )
+        return await batcher.run("create_shopping_list", {"ingredients": ingredients}, update_shopping_list)
 
     return [save_recipe, add_pantry_item, remove_pantry_item, get_pantry, create_shopping_list]
 
 
-def build_agent(db: AsyncSession, user_id: uuid.UUID, user_context: str = ""):
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        api_key=settings.openai_api_key,
-        temperature=0.7,
-        streaming=True,
+def build_agent(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    writes: TurnWrites,
+    batcher: ToolBatcher,
+    user_context: str = "",
+    kitchen_snapshot: str = "",
+):
+    # AgentExecutor does not forward run metadata to its model calls, so bind the config here.
+    llm = get_chat_model(ROUTE_CHAT_AGENT, temperature=0.7, streaming=True).with_config(
+        _llm_config(ROUTE_CHAT_AGENT, Priority.INTERACTIVE, user_id)
     )
-    tools = build_tools(db, user_id)
-    system_prompt = SYSTEM_PROMPT.format(user_context=user_context)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        MessagesPlaceholder(variable_name="chat_history"),
+    tools = build_tools(db, user_id, writes, batcher)
+    agent = create_openai_tools_agent(llm, tools, agent_prompt(user_context, kitchen_snapshot))
+    return AgentExecutor(agent=agent, tools=tools, verbose=False)
+
+
+def agent_prompt(user_context: str = "", kitchen_snapshot: str = "") -> ChatPromptTemplate:
+    """Chat agent prompt, ordered from least to most volatile for provider-side prompt caching.
+
+    The instructions, the profile and the session's history stay a byte-identical prefix from one
+    turn to the next. The kitchen snapshot changes whenever the pantry or list does, so it goes
+    after the history, just before the new message.
+    """
+    messages = [SystemMessage(content=SYSTEM_PROMPT)]
+    if user_context:
+        messages.append(SystemMessage(content=user_context))
+    messages.append(MessagesPlaceholder(variable_name="chat_history"))
+    if kitchen_snapshot:
+        messages.append(SystemMessage(content=kitchen_snapshot))
+    return ChatPromptTemplate.from_messages([
+        *messages,
         ("human", "{input}"),
         MessagesPlaceholder(variable_name="agent_scratchpad"),
     ])
-    agent = create_openai_tools_agent(llm, tools, prompt)
-    return AgentExecutor(agent=agent, tools=tools, verbose=False)
+
+
+def _llm_config(
+    route: str,
+    priority: Priority,
+    user_id: uuid.UUID | None = None,
+    operation: OperationMetrics | None = None,
+) -> dict[str, Any]:
+    """Run config shared by every model call: scheduler admission, per-user usage and route metrics."""
+    callbacks = [scheduler_callback, usage_callback, llm_metrics_callback]
+    if operation is not None:
+        callbacks.append(operation)
+    return {
+        "callbacks": callbacks,
+        "metadata": {"llm_route": route, "llm_priority": int(priority), "llm_user_id": user_id},
+    }
 
 
 def db_messages_to_langchain(messages) -> list:
@@ -381,19 +452,45 @@ async def stream_agent_response(
     chat_history: list,
     user_input: str,
     user_context: str = "",
+    kitchen_snapshot: str = "",
 ) -> AsyncGenerator[str, None]:
-    """Stream the agent response token by token via SSE."""
-    executor = build_agent(db, user_id, user_context=user_context)
-
-    async for event in executor.astream_events(
-        {"input": user_input, "chat_history": chat_history},
-        version="v2",
-    ):
-        kind = event["event"]
-        if kind == "on_chat_model_stream":
-            chunk = event["data"]["chunk"]
-            if hasattr(chunk, "content") and chunk.content:
-                yield f"data: {json.dumps({'token': chunk.content})}\n\n"
+    """Stream the agent response token by token via SSE.
+
+    Tool writes are staged on ``db`` and left uncommitted: the caller commits them with the
+    assistant's reply when it sees the ``done`` event. Any other outcome leaves them to be
+    rolled back.
+    """
+    writes = TurnWrites(db)
+    batcher = ToolBatcher(settings.ai_tool_batch_wait_ms / 1000)
+    executor = build_agent(db, user_id, writes, batcher, user_context=user_context, kitchen_snapshot=kitchen_snapshot)
+
+    async with track_operation(ROUTE_CHAT_AGENT) as turn:
+        try:
+            # The turn's handlers are inherited by every model and tool call the executor makes;
+            # the batcher learns each step's tool calls from the model's output.
+            async for event in executor.astream_events(
+                {"input": user_input, "chat_history": chat_history},
+                config={"callbacks": [turn, batcher]},
+                version="v2",
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"]
+                    if hasattr(chunk, "content") and chunk.content:
+                        yield f"data: {json.dumps({'token': chunk.content})}\n\n"
+            # The turn's only flush: constraint errors surface here, before announcing success.
+            await writes.flush()
+        except LLMCapacityError as exc:
+            # Headers are already sent, so report the rejection in-band and skip the done event.
+            turn.status = "rejected"
+            await writes.rollback()
+            yield f"data: {json.dumps({'error': str(exc), 'retry_after': exc.retry_after})}\n\n"
+            return
+        except SQLAlchemyError:
+            turn.status = "error"
+            await writes.rollback()
+            yield f"data: {json.dumps({'error': 'Your changes could not be saved; nothing from this reply was kept.'})}\n\n"
+            return
 
     yield f"data: {json.dumps({'done': True})}\n\n"
 
@@ -402,129 +499,174 @@ async def extract_recipes_from_transcript(
     transcript: str,
     user_categories: list[str] | None = None,
     user_context: str = "",
+    user_id: uuid.UUID | None = None,
 ) -> list[dict[str, Any]]:
     """Parse recipe objects from a chat transcript using the LLM."""
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        api_key=settings.openai_api_key,
-        temperature=0,
-        streaming=False,
-    )
-    categories = sorted(
-        {
-            category.strip()
-            for category in (user_categories or [])
-            if isinstance(category, str) and category.strip()
-        }
-    )
-    category_block = (
-        "User categories:\n"
-        + "\n".join(f"- {category}" for category in categories)
-        + "\nUse one of these categories when it fits. If none fit, return null for category."
-        if categories
-        else "User categories:\n- (none)\nIf no category is clear, return null for category."
-    )
-    user_block = f"\n\n{user_context}" if user_context else ""
-    prompt = (
-        f"{RECIPE_EXTRACTION_PROMPT}\n\n"
-        f"{category_block}{user_block}\n\n"
-        f"Conversation transcript:\n{transcript}"
-    )
-    response = await llm.ainvoke([SystemMessage(content=prompt)])
-    content = (response.content or "").strip()
-
-    # Models sometimes wrap JSON in code fences; strip those safely.
-    if content.startswith("```"):
-        lines = content.splitlines()
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        content = "\n".join(lines).strip()
-        if content.lower().startswith("json"):
-            content = content[4:].strip()
-
-    data = json.loads(content)
+    llm = get_chat_model(ROUTE_TRANSCRIPT_EXTRACTION)
+    request_context = _request_context(user_categories, user_context)
+    async with track_operation(ROUTE_TRANSCRIPT_EXTRACTION) as operation:
+        response = await llm.ainvoke(
+            [
+                SystemMessage(content=RECIPE_EXTRACTION_PROMPT),
+                HumanMessage(content=f"{request_context}\n\nConversation transcript:\n{transcript}"),
+            ],
+            config=_llm_config(ROUTE_TRANSCRIPT_EXTRACTION, Priority.SCAN, user_id, operation),
+        )
+        data = _parse_json_reply(response.content, ROUTE_TRANSCRIPT_EXTRACTION)
     recipes = data.get("recipes", [])
     if not isinstance(recipes, list):
         return []
     return recipes
 
 
+TILE_PROMPT_NOTE = (
+    "This image is one section of a larger photo that was split into overlapping tiles. "
+    "Skip lines that are cut off at the top or bottom edge; they appear in full in a neighbouring tile."
+)
+
+
 async def extract_recipes_from_photo(
     image_bytes: bytes,
     image_mime_type: str,
     user_categories: list[str] | None = None,
     user_context: str = "",
+    user_id: uuid.UUID | None = None,
 ) -> list[dict[str, Any]]:
     """Parse recipe objects from a recipe photo using the multimodal model."""
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        api_key=settings.openai_api_key,
-        temperature=0,
-        streaming=False,
-    )
-    categories = sorted(
-        {
-            category.strip()
-            for category in (user_categories or [])
-            if isinstance(category, str) and category.strip()
-        }
-    )
-    category_block = (
-        "User categories:\n"
-        + "\n".join(f"- {category}" for category in categories)
-        + "\nUse one of these categories when it fits. If none fit, return null for category."
-        if categories
-        else "User categories:\n- (none)\nIf no category is clear, return null for category."
-    )
-    user_block = f"\n\n{user_context}" if user_context else ""
+    llm = get_chat_model(ROUTE_RECIPE_PHOTO)
+    request_context = _request_context(user_categories, user_context)
+
+    async with track_operation(ROUTE_RECIPE_PHOTO) as operation:
+        results = await _extract_from_image_tiles(
+            llm,
+            RECIPE_IMAGE_EXTRACTION_PROMPT,
+            request_context,
+            image_bytes,
+            image_mime_type,
+            "recipes",
+            _llm_config(ROUTE_RECIPE_PHOTO, Priority.SCAN, user_id, operation),
+        )
+    return merge_recipe_results(results)
+
+
+async def extract_ingredients_from_photo(
+    image_bytes: bytes,
+    image_mime_type: str,
+    user_categories: list[str] | None = None,
+    user_context: str = "",
+    user_id: uuid.UUID | None = None,
+) -> list[dict[str, Any]]:
+    """Parse pantry ingredient objects from a photo using the multimodal model."""
+    llm = get_chat_model(ROUTE_INGREDIENT_PHOTO)
+    request_context = _request_context(user_categories, user_context)
+
+    async with track_operation(ROUTE_INGREDIENT_PHOTO) as operation:
+        results = await _extract_from_image_tiles(
+            llm,
+            INGREDIENT_IMAGE_EXTRACTION_PROMPT,
+            request_context,
+            image_bytes,
+            image_mime_type,
+            "ingredients",
+            _llm_config(ROUTE_INGREDIENT_PHOTO, Priority.SCAN, user_id, operation),
+        )
+    return merge_ingredient_results(results)
+
+
+async def _extract_from_image_tiles(
+    llm: Runnable,
+    system_prompt: str,
+    request_context: str,
+    image_bytes: bytes,
+    image_mime_type: str,
+    key: str,
+    config: dict[str, Any],
+) -> list[list[dict[str, Any]]]:
+    """Run an image extraction prompt over each tile of the photo concurrently.
+
+    Tall receipts and dense pages are split into overlapping tiles so small print survives the
+    provider's downscaling; small photos go through as a single image.
+    """
+    if settings.photo_tiling_enabled:
+        tiles = await asyncio.to_thread(
+            split_image,
+            image_bytes,
+            image_mime_type,
+            max_side=settings.photo_tile_max_side,
+            overlap=settings.photo_tile_overlap,
+            max_tiles=settings.photo_tile_max_tiles,
+            aspect_threshold=settings.photo_tile_aspect_threshold,
+        )
+    else:
+        tiles = [(image_bytes, image_mime_type)]
+
+    if len(tiles) > 1:
+        request_context = f"{request_context}\n\n{TILE_PROMPT_NOTE}"
+
+    async def extract_tile(tile_bytes: bytes, tile_mime: str) -> list[dict[str, Any]] | Exception:
+        try:
+            return await _extract_from_image(llm, system_prompt, request_context, tile_bytes, tile_mime, key, config)
+        except LLMCapacityError:
+            # The whole scan is retried later; a partial result would be kept instead.
+            raise
+        except Exception as exc:
+            # A provider error or unparseable reply only loses this tile.
+            return exc
+
+    tasks = [asyncio.ensure_future(extract_tile(tile_bytes, tile_mime)) for tile_bytes, tile_mime in tiles]
+    try:
+        outcomes = await asyncio.gather(*tasks)
+    finally:
+        # After a capacity error, the other tiles would only spend budget on a scan that is retried.
+        for task in tasks:
+            task.cancel()
+    results = [outcome for outcome in outcomes if not isinstance(outcome, Exception)]
+    if not results:
+        # Every tile failed; surface the first error to the router.
+        raise outcomes[0]
+    route = config["metadata"]["llm_route"]
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            # The scan still succeeds, but without whatever was on this part of the photo.
+            LLM_TILE_FAILURES.labels(route=route).inc()
+            logger.warning("Tile %d of %d failed for %s", index + 1, len(tiles), route, exc_info=outcome)
+    return results
+
+
+async def _extract_from_image(
+    llm: Runnable,
+    system_prompt: str,
+    request_context: str,
+    image_bytes: bytes,
+    image_mime_type: str,
+    key: str,
+    config: dict[str, Any],
+) -> list[dict[str, Any]]:
     image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-    prompt = f"{RECIPE_IMAGE_EXTRACTION_PROMPT}\n\n{category_block}{user_block}"
     response = await llm.ainvoke(
         [
+            SystemMessage(content=system_prompt),
             HumanMessage(
                 content=[
-                    {"type": "text", "text": prompt},
+                    {"type": "text", "text": request_context},
                     {
                         "type": "image_url",
                         "image_url": {"url": f"data:{image_mime_type};base64,{image_base64}"},
                     },
                 ]
             )
-        ]
+        ],
+        config=config,
     )
-    content = (response.content or "").strip()
-    if content.startswith("```"):
-        lines = content.splitlines()
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        content = "\n".join(lines).strip()
-        if content.lower().startswith("json"):
-            content = content[4:].strip()
-
-    data = json.loads(content)
-    recipes = data.get("recipes", [])
-    if not isinstance(recipes, list):
+    data = _parse_json_reply(response.content, config["metadata"]["llm_route"])
+    items = data.get(key, [])
+    if not isinstance(items, list):
         return []
-    return recipes
+    return items
 
 
-async def extract_ingredients_from_photo(
-    image_bytes: bytes,
-    image_mime_type: str,
-    user_categories: list[str] | None = None,
-    user_context: str = "",
-) -> list[dict[str, Any]]:
-    """Parse pantry ingredient objects from a photo using the multimodal model."""
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        api_key=settings.openai_api_key,
-        temperature=0,
-        streaming=False,
-    )
+def _request_context(user_categories: list[str] | None, user_context: str) -> str:
+    """Per-request prompt material, sent after the static extraction prompt so its prefix caches."""
     categories = sorted(
         {
             category.strip()
@@ -540,22 +682,13 @@ async def extract_ingredients_from_photo(
         else "User categories:\n- (none)\nIf no category is clear, return null for category."
     )
     user_block = f"\n\n{user_context}" if user_context else ""
-    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-    prompt = f"{INGREDIENT_IMAGE_EXTRACTION_PROMPT}\n\n{category_block}{user_block}"
-    response = await llm.ainvoke(
-        [
-            HumanMessage(
-                content=[
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{image_mime_type};base64,{image_base64}"},
-                    },
-                ]
-            )
-        ]
-    )
-    content = (response.content or "").strip()
+    return f"{category_block}{user_block}"
+
+
+def _parse_json_reply(content: str | None, route: str) -> dict[str, Any]:
+    content = (content or "").strip()
+
+    # Models sometimes wrap JSON in code fences; strip those safely.
     if content.startswith("```"):
         lines = content.splitlines()
         if lines and lines[0].startswith("```"):
@@ -566,8 +699,12 @@ async def extract_ingredients_from_photo(
         if content.lower().startswith("json"):
             content = content[4:].strip()
 
-    data = json.loads(content)
-    ingredients = data.get("ingredients", [])
-    if not isinstance(ingredients, list):
-        return []
-    return ingredients
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        LLM_PARSE_FAILURES.labels(route=route).inc()
+        raise
+    if not isinstance(data, dict):
+        LLM_PARSE_FAILURES.labels(route=route).inc()
+        return {}
+    return data
@@ -0,0 +1,58 @@
+"""Deferred loading of the AI stack.
+
+``app.services.ai`` pulls in LangChain, the agents module and the OpenAI client, which together
+take over a second to import. The app starts without them and warms the module in a worker thread
+once the server is accepting connections; request handlers get it through ``load_ai()``. Under
+gunicorn the master imports it before forking (``preload_ai()``), so workers start with it loaded.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+_MODULE = "app.services.ai"
+_ai: ModuleType | None = None
+_loading: asyncio.Task | None = None
+
+
+async def load_ai() -> ModuleType:
+    """Return ``app.services.ai``, importing it off the event loop on first use."""
+    global _loading
+    if _ai is not None:
+        return _ai
+    if _loading is None:
+        _loading = asyncio.create_task(_import())
+    return await asyncio.shield(_loading)
+
+
+def preload_ai() -> None:
+    """Import the AI stack synchronously, e.g. in the gunicorn master so forked workers share it."""
+    global _ai
+    if _ai is None:
+        started = time.perf_counter()
+        _ai = importlib.import_module(_MODULE)
+        logger.info("AI stack preloaded in %.2fs", time.perf_counter() - started)
+
+
+def warm_ai() -> None:
+    """Start importing the AI stack in the background without waiting for it."""
+    global _loading
+    if _ai is None and _loading is None:
+        _loading = asyncio.create_task(_import())
+
+
+async def _import() -> ModuleType:
+    global _ai, _loading
+    started = time.perf_counter()
+    try:
+        module = await asyncio.to_thread(importlib.import_module, _MODULE)
+    except Exception:
+        _loading = None  # let the next request retry
+        raise
+    logger.info("AI stack loaded in %.2fs", time.perf_counter() - started)
+    _ai = module
+    return module
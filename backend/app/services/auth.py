@@ -50,4 +50,6 @@ async def get_current_user(
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    # The request shares this session; tagging it lets commits pin the user's reads to the primary.
+    db.info["user_id"] = user.id
     return user
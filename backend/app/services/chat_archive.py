@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.chat import ChatMessage, ChatSession, ChatSessionArchive
+from app.services.metrics import CHAT_ARCHIVE_SESSIONS
+
+logger = logging.getLogger(__name__)
+
+# Any constant works; it only has to be the same in every worker.
+_PARTITION_LOCK_ID = 0x63686174
+
+_EXISTING_PARTITIONS_SQL = text(
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = 'chat_messages'::regclass"
+)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"chat_messages_y{month:%Y}m{month:%m}"
+
+
+def partition_ddl(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF chat_messages "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def pack_messages(messages: Iterable[Any]) -> bytes:
+    rows = [
+        {"id": str(m.id), "role": m.role, "content": m.content, "created_at": m.created_at.isoformat()}
+        for m in messages
+    ]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode(), 6)
+
+
+def unpack_messages(session_id: uuid.UUID, payload: bytes) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": uuid.UUID(row["id"]),
+            "session_id": session_id,
+            "role": row["role"],
+            "content": row["content"],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+        }
+        for row in json.loads(zlib.decompress(payload))
+    ]
+
+
+async def session_messages(db: AsyncSession, session: ChatSession) -> list[ChatMessage]:
+    """Return a session's messages in order, decoding the archive when the session is cold.
+
+    Archived messages come back as transient ``ChatMessage`` objects, so read-only callers
+    (including replica reads) never have to write anything back.
+    """
+    if session.archived_at is not None:
+        archive = await db.get(ChatSessionArchive, session.id)
+        if archive is not None:
+            return [ChatMessage(**row) for row in unpack_messages(session.id, archive.payload)]
+    result = await db.execute(
+        select(ChatMessage).where(ChatMessage.session_id == session.id).order_by(ChatMessage.created_at)
+    )
+    return list(result.scalars().all())
+
+
+async def rehydrate_session(db: AsyncSession, session: ChatSession) -> None:
+    """Move an archived session's messages back into ``chat_messages`` before it is written to.
+
+    The caller should hold the session row lock (``SELECT ... FOR UPDATE``) so the archiver can't
+    pick the session up again halfway through; the caller commits.
+    """
+    archive = (
+        await db.execute(
+            select(ChatSessionArchive).where(ChatSessionArchive.session_id == session.id).with_for_update()
+        )
+    ).scalar_one_or_none()
+    if archive is not None:
+        rows = unpack_messages(session.id, archive.payload)
+        if rows:
+            await db.execute(insert(ChatMessage), rows)
+        await db.delete(archive)
+        CHAT_ARCHIVE_SESSIONS.labels(action="rehydrated").inc()
+    session.archived_at = None
+    await db.flush()
+
+
+async def archive_idle_sessions(db: AsyncSession, idle_days: int, batch_size: int) -> int:
+    """Compress up to ``batch_size`` sessions idle for ``idle_days`` into the archive table.
+
+    Sessions that are locked (e.g. mid-turn) are skipped. Returns the number archived; the
+    caller commits.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=idle_days)
+    session_ids = (
+        await db.execute(
+            select(ChatSession.id)
+            .where(ChatSession.archived_at.is_(None), ChatSession.updated_at < cutoff)
+            .order_by(ChatSession.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    ).scalars().all()
+    if not session_ids:
+        return 0
+
+    removed = await db.execute(
+        delete(ChatMessage)
+        .where(ChatMessage.session_id.in_(session_ids))
+        .returning(ChatMessage.id, ChatMessage.session_id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+    )
+    by_session: dict[uuid.UUID, list[Any]] = {session_id: [] for session_id in session_ids}
+    for row in removed:
+        by_session[row.session_id].append(row)
+
+    await db.execute(
+        insert(ChatSessionArchive),
+        [
+            {
+                "session_id": session_id,
+                "message_count": len(rows),
+                "payload": pack_messages(sorted(rows, key=lambda row: row.created_at)),
+            }
+            for session_id, rows in by_session.items()
+        ],
+    )
+    # Pass updated_at through so the column's onupdate doesn't make the session look active.
+    await db.execute(
+        update(ChatSession)
+        .where(ChatSession.id.in_(session_ids))
+        .values(archived_at=datetime.now(timezone.utc), updated_at=ChatSession.updated_at)
+    )
+    CHAT_ARCHIVE_SESSIONS.labels(action="archived").inc(len(session_ids))
+    return len(session_ids)
+
+
+async def ensure_message_partitions(db: AsyncSession, months_ahead: int) -> list[str]:
+    """Create the monthly partitions from this month through ``months_ahead`` months out.
+
+    Only missing partitions are created, since each CREATE briefly locks the parent table.
+    Returns the names created.
+    """
+    existing = set((await db.execute(_EXISTING_PARTITIONS_SQL)).scalars().all())
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            await db.execute(text(partition_ddl(month)))
+            created.append(partition_name(month))
+    return created
+
+
+async def run_maintenance() -> None:
+    async with async_session() as db:
+        # One worker creates partitions at a time; the lock is released at commit.
+        if (await db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _PARTITION_LOCK_ID})).scalar():
+            created = await ensure_message_partitions(db, settings.chat_partition_months_ahead)
+            if created:
+                logger.info("Created chat_messages partitions: %s", ", ".join(created))
+        await db.commit()
+
+        if settings.chat_archive_after_days <= 0:
+            return
+        while True:
+            archived = await archive_idle_sessions(db, settings.chat_archive_after_days, settings.chat_archive_batch_size)
+            await db.commit()
+            if archived < settings.chat_archive_batch_size:
+                break
+
+
+async def run_periodic_maintenance() -> None:
+    while True:
+        try:
+            await run_maintenance()
+        except Exception:
+            logger.exception("Chat partition maintenance failed")
+        await asyncio.sleep(settings.chat_maintenance_interval_seconds)
@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Compressing bodies beyond this size would hold up the event loop; do it on a thread instead.
+_THREAD_THRESHOLD = 1 << 20
+
+
+class CompressionMiddleware:
+    """Gzip complete responses of at least ``minimum_size`` bytes for clients that accept it.
+
+    Streamed responses, i.e. the chat SSE feed, pass through untouched: Starlette's
+    ``GZipMiddleware`` would hold their chunks in the compressor and stall tokens.
+
+    A strong ``ETag`` promises byte-identical bodies, which the gzip encoding is not, so it is
+    weakened on compressed responses. A ``304`` only knows the tag, not whether the body would
+    have been compressed, so it repeats the weak form when the client sent that one back.
+    ``etag_matches`` compares weakly, so either form of the tag still matches.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        if "gzip" not in request_headers.get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    headers = MutableHeaders(raw=message["headers"])
+                    if _client_has_weak_etag(request_headers.get("if-none-match", ""), headers.get("etag")):
+                        _weaken_etag(headers)
+                start = message
+                return
+            if start is not None and message["type"] == "http.response.body":
+                initial, start = start, None
+                body = message.get("body", b"")
+                headers = MutableHeaders(raw=initial["headers"])
+                if (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                ):
+                    if len(body) >= _THREAD_THRESHOLD:
+                        body = await asyncio.to_thread(gzip.compress, body, self.level)
+                    else:
+                        body = gzip.compress(body, self.level)
+                    headers["Content-Encoding"] = "gzip"
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    _weaken_etag(headers)
+                    message = {**message, "body": body}
+                await send(initial)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _client_has_weak_etag(if_none_match: str, etag: str | None) -> bool:
+    return bool(etag) and f"W/{etag}" in (candidate.strip() for candidate in if_none_match.split(","))
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
@@ -0,0 +1,62 @@
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.collection_version import CollectionVersion
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.replicas import get_read_db
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(collection: str, user_id: object, version: int, query: str) -> str:
+    """Strong ETag for one user's view of a collection at ``version`` with these query params."""
+    params = "&".join(sorted(query.split("&"))) if query else ""
+    digest = hashlib.sha256(f"{user_id}|{params}".encode()).hexdigest()[:16]
+    return f'"{collection}.{version}.{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches.
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+async def collection_version(db: AsyncSession, user_id: object, collection: str) -> int:
+    result = await db.execute(
+        select(CollectionVersion.version).where(
+            CollectionVersion.user_id == user_id, CollectionVersion.collection == collection
+        )
+    )
+    return result.scalar_one_or_none() or 0
+
+
+def conditional_get(collection: str, database=get_read_db):
+    """Dependency answering ``If-None-Match`` for a list route with a ``304``.
+
+    ``database`` must be the session dependency the route itself reads through.
+    """
+
+    async def check(
+        request: Request,
+        response: Response,
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(database),
+    ) -> str:
+        # Read the version before the route reads the rows, on the same session: a write landing
+        # in between leaves the ETag behind the payload, which only costs a later 200.
+        version = await collection_version(db, user.id, collection)
+        etag = make_etag(collection, user.id, version, request.url.query)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return check
@@ -0,0 +1,145 @@
+import io
+import math
+from typing import Any, Iterable
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.services.shopping_list import normalize_ingredient_name
+
+# Formats we can re-encode tiles into without changing the upload's mime type.
+_PASSTHROUGH_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+def should_tile(width: int, height: int, max_side: int, aspect_threshold: float) -> bool:
+    long_side, short_side = max(width, height), min(width, height)
+    if short_side <= 0:
+        return False
+    if long_side / short_side >= aspect_threshold:
+        return True
+    # Dense pages: both sides are large enough that the provider downscale loses small print.
+    return short_side > max_side
+
+
+def plan_tiles(
+    width: int,
+    height: int,
+    max_side: int,
+    overlap: float,
+    max_tiles: int,
+    max_aspect: float = 1.5,
+) -> list[tuple[int, int, int, int]]:
+    """Return overlapping (left, top, right, bottom) crop boxes covering the image."""
+    tile_w = min(width, max_side)
+    tile_h = min(height, max_side)
+    # Keep tiles close to square so the provider does not shrink them again.
+    tile_h = min(tile_h, max(1, round(tile_w * max_aspect)))
+    tile_w = min(tile_w, max(1, round(tile_h * max_aspect)))
+
+    while True:
+        xs = _axis_spans(width, tile_w, overlap)
+        ys = _axis_spans(height, tile_h, overlap)
+        if len(xs) * len(ys) <= max_tiles or (tile_w >= width and tile_h >= height):
+            break
+        tile_w = min(width, math.ceil(tile_w * 1.25))
+        tile_h = min(height, math.ceil(tile_h * 1.25))
+
+    return [(left, top, right, bottom) for top, bottom in ys for left, right in xs]
+
+
+def split_image(
+    image_bytes: bytes,
+    image_mime_type: str,
+    max_side: int,
+    overlap: float,
+    max_tiles: int,
+    aspect_threshold: float,
+) -> list[tuple[bytes, str]]:
+    """Split tall or dense images into overlapping tiles.
+
+    Returns the original image unchanged when it is small enough or cannot be decoded.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError):
+        return [(image_bytes, image_mime_type)]
+
+    width, height = image.size
+    if not should_tile(width, height, max_side, aspect_threshold):
+        return [(image_bytes, image_mime_type)]
+
+    boxes = plan_tiles(width, height, max_side=max_side, overlap=overlap, max_tiles=max_tiles)
+    if len(boxes) <= 1:
+        return [(image_bytes, image_mime_type)]
+
+    source_format = (image.format or "").upper()
+    out_format = source_format if source_format in _PASSTHROUGH_FORMATS else "JPEG"
+    if out_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    tiles: list[tuple[bytes, str]] = []
+    for box in boxes:
+        buffer = io.BytesIO()
+        save_kwargs = {"quality": 90} if out_format in ("JPEG", "WEBP") else {}
+        image.crop(box).save(buffer, format=out_format, **save_kwargs)
+        tiles.append((buffer.getvalue(), _PASSTHROUGH_FORMATS[out_format]))
+    return tiles
+
+
+def merge_ingredient_results(results: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Stitch per-tile ingredient lists, dropping duplicates from overlapping regions."""
+    merged: dict[str, dict[str, Any]] = {}
+    for items in results:
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            key = normalize_ingredient_name(str(item.get("name", "")))
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = dict(item)
+                continue
+            _fill_missing(merged[key], item, ("quantity", "unit", "category"))
+    return list(merged.values())
+
+
+def merge_recipe_results(results: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Stitch per-tile recipe lists; a recipe split across tiles is combined into one."""
+    merged: dict[str, dict[str, Any]] = {}
+    for recipes in results:
+        for recipe in recipes:
+            if not isinstance(recipe, dict):
+                continue
+            # Titles are matched as written; ingredient normalization would fold "Tomato Soup"
+            # into "Tomatoes Soup" and merge different recipes.
+            key = " ".join(str(recipe.get("name", "")).split()).casefold()
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = dict(recipe)
+                continue
+            current = merged[key]
+            ingredients = current.get("ingredients")
+            extra = recipe.get("ingredients")
+            if isinstance(ingredients, list) and isinstance(extra, list):
+                current["ingredients"] = merge_ingredient_results([ingredients, extra])
+            for field in ("description", "instructions"):
+                if len(str(recipe.get(field) or "")) > len(str(current.get(field) or "")):
+                    current[field] = recipe[field]
+            _fill_missing(current, recipe, ("prep_time_minutes", "source", "category"))
+    return list(merged.values())
+
+
+def _axis_spans(length: int, tile_len: int, overlap: float) -> list[tuple[int, int]]:
+    if length <= tile_len:
+        return [(0, length)]
+    overlap_px = int(tile_len * overlap)
+    count = math.ceil((length - overlap_px) / (tile_len - overlap_px))
+    step = (length - tile_len) / (count - 1)
+    return [(round(i * step), round(i * step) + tile_len) for i in range(count)]
+
+
+def _fill_missing(target: dict[str, Any], source: dict[str, Any], fields: tuple[str, ...]) -> None:
+    for field in fields:
+        if not target.get(field) and source.get(field):
+            target[field] = source[field]
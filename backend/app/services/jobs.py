@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.job import Job
+from app.services.llm_scheduler import LLMCapacityError
+from app.services.serialization import TrustedJSONResponse
+from app.services.shutdown import shutdown_drain
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("succeeded", "failed")
+JOB_OUT_COLUMNS = (
+    Job.id, Job.kind, Job.status, Job.result, Job.error, Job.attempts, Job.created_at, Job.started_at, Job.finished_at
+)
+_CLEANUP_INTERVAL_SECONDS = 60.0
+
+
+class JobFailed(Exception):
+    """A failure retrying will not fix; the message is shown to the user as the job's error."""
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+JobHandler = Callable[[ClaimedJob], Awaitable[dict[str, Any]]]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    kind: str,
+    payload: dict[str, Any],
+    *,
+    blob: bytes | None = None,
+    idempotency_key: str | None = None,
+) -> uuid.UUID:
+    """Queue a job and return its id; the caller commits.
+
+    A repeated ``idempotency_key`` returns the user's existing job instead of queueing the
+    work again.
+    """
+    if idempotency_key:
+        existing = await _job_for_key(db, user_id, idempotency_key)
+        if existing is not None:
+            return existing
+
+    active = (
+        await db.execute(
+            select(func.count()).select_from(Job).where(Job.user_id == user_id, Job.status.in_(ACTIVE_STATUSES))
+        )
+    ).scalar_one()
+    if active >= settings.job_max_active_per_user:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many scans in progress, wait for one to finish",
+        )
+
+    stmt = (
+        insert(Job)
+        .values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            kind=kind,
+            payload=payload,
+            input_blob=blob,
+            idempotency_key=idempotency_key,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[Job.user_id, Job.idempotency_key],
+            index_where=Job.idempotency_key.is_not(None),
+        )
+        .returning(Job.id)
+    )
+    job_id = (await db.execute(stmt)).scalar_one_or_none()
+    if job_id is None:
+        # A concurrent request with the same key won the insert.
+        job_id = await _job_for_key(db, user_id, idempotency_key)
+    return job_id
+
+
+async def submit_job(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    kind: str,
+    payload: dict[str, Any],
+    *,
+    blob: bytes | None = None,
+    idempotency_key: str | None = None,
+    headers: dict[str, str] | None = None,
+) -> TrustedJSONResponse:
+    """Queue a job, commit it and answer ``202 Accepted`` with the job and its ``Location``.
+
+    ``headers``, such as the caller's rate-limit headers, are sent along with ``Location``.
+    """
+    job_id = await enqueue_job(db, user_id, kind, payload, blob=blob, idempotency_key=idempotency_key)
+    await db.commit()
+    job_worker.wake()
+    job = await get_job(db, user_id, job_id)
+    return TrustedJSONResponse(
+        job, status_code=status.HTTP_202_ACCEPTED, headers={**(headers or {}), "Location": f"/jobs/{job_id}"}
+    )
+
+
+async def _job_for_key(db: AsyncSession, user_id: uuid.UUID, idempotency_key: str) -> uuid.UUID | None:
+    return (
+        await db.execute(select(Job.id).where(Job.user_id == user_id, Job.idempotency_key == idempotency_key))
+    ).scalar_one_or_none()
+
+
+async def get_job(db: AsyncSession, user_id: uuid.UUID, job_id: uuid.UUID) -> dict[str, Any] | None:
+    row = (
+        await db.execute(select(*JOB_OUT_COLUMNS).where(Job.id == job_id, Job.user_id == user_id))
+    ).mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+async def load_job_blob(job_id: uuid.UUID) -> bytes | None:
+    async with async_session() as db:
+        return (await db.execute(select(Job.input_blob).where(Job.id == job_id))).scalar_one_or_none()
+
+
+def claim_statement(limit: int, lease_seconds: float, max_attempts: int):
+    """Claim up to ``limit`` due jobs, including running ones whose worker's lease ran out."""
+    now = func.now()
+    claimable = (
+        select(Job.id)
+        .where(
+            or_(
+                and_(Job.status == "queued", Job.run_after <= now),
+                and_(Job.status == "running", Job.locked_until < now),
+            ),
+            Job.attempts < max_attempts,
+        )
+        .order_by(Job.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Job)
+        .where(Job.id.in_(claimable))
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            started_at=now,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(Job.id, Job.user_id, Job.kind, Job.payload, Job.attempts)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class JobWaiters:
+    """In-process wake-ups for requests watching a job that this worker finishes."""
+
+    def __init__(self) -> None:
+        self._events: dict[uuid.UUID, set[asyncio.Event]] = {}
+
+    async def wait(self, job_id: uuid.UUID, timeout: float) -> None:
+        event = asyncio.Event()
+        self._events.setdefault(job_id, set()).add(event)
+        try:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(event.wait(), timeout)
+        finally:
+            waiting = self._events.get(job_id)
+            if waiting is not None:
+                waiting.discard(event)
+                if not waiting:
+                    del self._events[job_id]
+
+    def notify(self, job_id: uuid.UUID) -> None:
+        for event in self._events.get(job_id, ()):
+            event.set()
+
+
+job_waiters = JobWaiters()
+
+
+class JobWorker:
+    """Runs queued jobs in this process with at most ``concurrency`` in flight.
+
+    Jobs are claimed with ``FOR UPDATE SKIP LOCKED``, so every worker process can poll the same
+    table. A running job's lease is renewed while its handler runs. On shutdown, unfinished
+    jobs are handed back to the queue. Each state change is fenced on ``attempts``, so a worker
+    whose lease was taken over cannot overwrite the new owner's result.
+    """
+
+    def __init__(self, concurrency: int, poll_seconds: float, lease_seconds: float, max_attempts: int):
+        self._concurrency = concurrency
+        self._poll_seconds = poll_seconds
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._running: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._last_cleanup = 0.0
+
+    def wake(self) -> None:
+        """Poll now instead of at the next interval, e.g. right after a job was committed."""
+        self._wake.set()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    await self._fill()
+                    if time.monotonic() - self._last_cleanup >= _CLEANUP_INTERVAL_SECONDS:
+                        await self._cleanup()
+                        self._last_cleanup = time.monotonic()
+                except Exception:
+                    logger.exception("Job polling failed")
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self._poll_seconds)
+        finally:
+            for task in self._running:
+                task.cancel()
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _fill(self) -> None:
+        free = self._concurrency - len(self._running)
+        if free <= 0:
+            return
+        async with async_session() as db:
+            rows = (await db.execute(claim_statement(free, self._lease_seconds, self._max_attempts))).all()
+            await db.commit()
+        for row in rows:
+            task = asyncio.create_task(self._execute(ClaimedJob(row.id, row.user_id, row.kind, row.payload, row.attempts)))
+            self._running.add(task)
+            task.add_done_callback(self._job_done)
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self.wake()
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        renewal = asyncio.create_task(self._renew_lease(job))
+        try:
+            handler = JOB_HANDLERS.get(job.kind)
+            if handler is None:
+                raise JobFailed(f"Unknown job kind: {job.kind}")
+            result = await handler(job)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without counting this attempt.
+            await self._update(job, status="queued", attempts=job.attempts - 1, locked_until=None)
+            raise
+        except JobFailed as exc:
+            await self._update(job, status="failed", error=str(exc))
+        except LLMCapacityError as exc:
+            if job.attempts < self._max_attempts:
+                await self._update(
+                    job, status="queued", locked_until=None, run_after=func.now() + timedelta(seconds=exc.retry_after)
+                )
+            else:
+                await self._update(job, status="failed", error=str(exc))
+        except Exception:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            await self._update(job, status="failed", error="The job failed unexpectedly")
+        else:
+            await self._update(job, status="succeeded", result=result)
+        finally:
+            renewal.cancel()
+            job_waiters.notify(job.id)
+
+    async def _renew_lease(self, job: ClaimedJob) -> None:
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            try:
+                await self._update(job, locked_until=func.now() + timedelta(seconds=self._lease_seconds))
+            except Exception:
+                logger.exception("Lease renewal failed for job %s", job.id)
+
+    @staticmethod
+    async def _update(job: ClaimedJob, **values: Any) -> None:
+        if values.get("status") in TERMINAL_STATUSES:
+            values.update(finished_at=func.now(), locked_until=None, input_blob=None)
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.status == "running", Job.attempts == job.attempts)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _cleanup(self) -> None:
+        async with async_session() as db:
+            # Leases that ran out on the last allowed attempt: the job keeps killing its worker.
+            await db.execute(
+                update(Job)
+                .where(Job.status == "running", Job.locked_until < func.now(), Job.attempts >= self._max_attempts)
+                .values(
+                    status="failed",
+                    error="The job was interrupted too many times",
+                    finished_at=func.now(),
+                    locked_until=None,
+                    input_blob=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                delete(Job).where(
+                    Job.status.in_(TERMINAL_STATUSES),
+                    Job.finished_at < func.now() - timedelta(hours=settings.job_retention_hours),
+                )
+            )
+            await db.commit()
+
+
+async def job_event_stream(user_id: uuid.UUID, job_id: uuid.UUID) -> AsyncIterator[str]:
+    """SSE: the job as JSON whenever its status changes, ending once it has finished."""
+    last_status = None
+    while True:
+        async with async_session() as db:
+            job = await get_job(db, user_id, job_id)
+        if job is None:
+            return
+        if job["status"] != last_status:
+            last_status = job["status"]
+            yield f"data: {orjson.dumps(job, option=orjson.OPT_UTC_Z).decode()}\n\n"
+        if last_status in TERMINAL_STATUSES or shutdown_drain.draining:
+            # On shutdown the client reconnects to another worker (or polls /jobs/{id}).
+            return
+        # Woken at once when this worker finishes the job; jobs run elsewhere are polled.
+        await job_waiters.wait(job_id, settings.job_status_poll_seconds)
+
+
+job_worker = JobWorker(
+    settings.job_worker_concurrency,
+    settings.job_poll_interval_seconds,
+    settings.job_lease_seconds,
+    settings.job_max_attempts,
+)
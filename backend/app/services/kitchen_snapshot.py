@@ -0,0 +1,113 @@
+import logging
+import uuid
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import async_session
+from app.models.ingredient import HouseholdIngredient
+from app.models.shopping_list import ShoppingList
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_HEADER = (
+    "Kitchen snapshot (current as of this message; call get_pantry only for items it leaves out):"
+)
+
+
+def _item_text(name: str, quantity: str | None, unit: str | None) -> str:
+    return " ".join(part for part in (name, quantity, unit) if part)
+
+
+def _fit(entries: list[str], char_budget: int) -> list[str]:
+    kept: list[str] = []
+    used = 0
+    for entry in entries:
+        used += len(entry) + 2
+        if used > char_budget:
+            break
+        kept.append(entry)
+    return kept
+
+
+def format_snapshot(
+    pantry: Iterable[Any],
+    pantry_total: int,
+    shopping_items: Iterable[dict[str, Any]],
+    token_budget: int,
+) -> str:
+    """Render pantry rows and shopping-list items into roughly ``token_budget`` tokens.
+
+    ``pantry`` rows have ``name``, ``quantity``, ``unit`` and ``category`` and should be ordered by
+    category. The shopping list gets up to a quarter of the budget and the pantry the rest; items
+    that don't fit are counted rather than listed.
+    """
+    char_budget = token_budget * 4  # same chars-per-token estimate as the LLM scheduler
+    to_buy = [
+        _item_text(item.get("name", ""), item.get("quantity"), item.get("unit"))
+        for item in shopping_items
+        if item.get("name") and not item.get("checked")
+    ]
+    shopping_kept = _fit(to_buy, char_budget // 4)
+    shopping_chars = sum(len(entry) + 2 for entry in shopping_kept)
+
+    pantry_rows = list(pantry)
+    pantry_kept = _fit(
+        [_item_text(row.name, row.quantity, row.unit) for row in pantry_rows],
+        char_budget - shopping_chars - len(SNAPSHOT_HEADER),
+    )
+    by_category: dict[str, list[str]] = {}
+    for row, entry in zip(pantry_rows, pantry_kept):
+        by_category.setdefault(row.category or "other", []).append(entry)
+
+    lines = [SNAPSHOT_HEADER, f"Pantry ({pantry_total} items):" if pantry_total else "Pantry: empty."]
+    lines += [f"- {category}: {', '.join(entries)}" for category, entries in by_category.items()]
+    if pantry_total > len(pantry_kept):
+        lines.append(f"- (+{pantry_total - len(pantry_kept)} more not shown)")
+    if to_buy:
+        lines.append(f"Shopping list ({len(to_buy)} to buy): {', '.join(shopping_kept)}")
+        if len(to_buy) > len(shopping_kept):
+            lines[-1] += f" (+{len(to_buy) - len(shopping_kept)} more)"
+    else:
+        lines.append("Shopping list: nothing to buy.")
+    return "\n".join(lines)
+
+
+async def load_kitchen_snapshot(user_id: uuid.UUID) -> str:
+    """Fetch and format the user's kitchen snapshot on its own short-lived session.
+
+    Runs alongside the request's own queries, so it must not share the request session. The
+    snapshot is an optimisation, so failures are logged and yield an empty string.
+    """
+    if settings.ai_kitchen_snapshot_tokens <= 0:
+        return ""
+    try:
+        async with async_session() as db:
+            pantry = (
+                await db.execute(
+                    select(
+                        HouseholdIngredient.name,
+                        HouseholdIngredient.quantity,
+                        HouseholdIngredient.unit,
+                        HouseholdIngredient.category,
+                        func.count().over().label("total"),
+                    )
+                    .where(HouseholdIngredient.user_id == user_id)
+                    .order_by(HouseholdIngredient.category, HouseholdIngredient.name)
+                    # Every listed item costs at least a token, so more rows could never fit.
+                    .limit(settings.ai_kitchen_snapshot_tokens)
+                )
+            ).all()
+            shopping_items = (
+                await db.execute(select(ShoppingList.items).where(ShoppingList.user_id == user_id))
+            ).scalar_one_or_none()
+    except Exception:
+        logger.exception("Failed to load kitchen snapshot")
+        return ""
+    return format_snapshot(
+        pantry,
+        pantry[0].total if pantry else 0,
+        shopping_items or [],
+        settings.ai_kitchen_snapshot_tokens,
+    )
@@ -0,0 +1,174 @@
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from app.services.llm_providers import estimate_cost, route_config
+from app.services.llm_scheduler import LLMCapacityError, token_usage
+from app.services.metrics import (
+    AI_OPERATION_SECONDS,
+    AI_OPERATION_TIME_TO_FIRST_TOKEN_SECONDS,
+    AI_OPERATION_TOKENS,
+    AI_OPERATION_TOOL_CALLS,
+    AI_TOOL_SECONDS,
+    LLM_COST_USD,
+    LLM_ERRORS,
+    LLM_FALLBACKS,
+    LLM_OUTPUT_TOKENS_PER_SECOND,
+    LLM_REQUEST_SECONDS,
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+    LLM_TOKENS,
+)
+
+
+class _Run:
+    __slots__ = ("route", "model", "started", "first_token")
+
+    def __init__(self, route: str, model: str):
+        self.route = route
+        self.model = model
+        self.started = time.perf_counter()
+        self.first_token: float | None = None
+
+
+class LLMMetricsCallback(AsyncCallbackHandler):
+    """Records per-route latency, throughput, token, cost, error and fallback metrics for each model call."""
+
+    def __init__(self):
+        self._runs: dict[uuid.UUID, _Run] = {}
+
+    async def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: uuid.UUID,
+        metadata: dict[str, Any] | None = None,
+        invocation_params: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        route = (metadata or {}).get("llm_route", "unknown")
+        params = invocation_params or {}
+        model = params.get("model") or params.get("model_name") or "unknown"
+        if model != route_config(route).primary:
+            LLM_FALLBACKS.labels(route=route).inc()
+        self._runs[run_id] = _Run(route, model)
+
+    async def on_llm_new_token(self, token: str, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run.first_token is None:
+            run.first_token = time.perf_counter()
+            LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(route=run.route, model=run.model).observe(
+                run.first_token - run.started
+            )
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        route, model = run.route, run.model
+        ended = time.perf_counter()
+        LLM_REQUEST_SECONDS.labels(route=route, model=model).observe(ended - run.started)
+        usage = token_usage(response)
+        cached = usage["cached_input_tokens"]
+        LLM_TOKENS.labels(route=route, model=model, kind="input").inc(usage["input_tokens"] - cached)
+        LLM_TOKENS.labels(route=route, model=model, kind="cached_input").inc(cached)
+        LLM_TOKENS.labels(route=route, model=model, kind="output").inc(usage["output_tokens"])
+        LLM_COST_USD.labels(route=route, model=model).inc(
+            estimate_cost(model, usage["input_tokens"], usage["output_tokens"], cached)
+        )
+        # Streaming calls are measured from the first token so prompt processing doesn't skew throughput.
+        generating = ended - (run.first_token or run.started)
+        if usage["output_tokens"] and generating > 0:
+            LLM_OUTPUT_TOKENS_PER_SECOND.labels(route=route, model=model).observe(usage["output_tokens"] / generating)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        LLM_ERRORS.labels(route=run.route, model=run.model, error=type(error).__name__).inc()
+
+
+llm_metrics_callback = LLMMetricsCallback()
+
+
+class OperationMetrics(AsyncCallbackHandler):
+    """Rolls up one chat turn or extraction across every model and tool call it makes.
+
+    Created per request by ``track_operation`` and passed in the run's callbacks.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self.status = "ok"
+        self.started = time.perf_counter()
+        self.first_token: float | None = None
+        self.total_tokens = 0
+        self.tool_calls = 0
+        self._tools: dict[uuid.UUID, tuple[str, float]] = {}
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # Tool-call chunks stream with empty content; only answer text reaches the client.
+        if token and self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.total_tokens += token_usage(response)["total_tokens"]
+
+    async def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: uuid.UUID,
+        **kwargs: Any,
+    ) -> None:
+        self._tools[run_id] = ((serialized or {}).get("name", "unknown"), time.perf_counter())
+
+    async def on_tool_end(self, output: Any, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id, "ok")
+
+    async def on_tool_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id, "error")
+
+    def _finish_tool(self, run_id: uuid.UUID, status: str) -> None:
+        tool = self._tools.pop(run_id, None)
+        if tool is None:
+            return
+        name, started = tool
+        self.tool_calls += 1
+        AI_TOOL_SECONDS.labels(tool=name, status=status).observe(time.perf_counter() - started)
+
+    def observe(self) -> None:
+        AI_OPERATION_SECONDS.labels(route=self.route, status=self.status).observe(time.perf_counter() - self.started)
+        if self.first_token is not None:
+            AI_OPERATION_TIME_TO_FIRST_TOKEN_SECONDS.labels(route=self.route).observe(self.first_token - self.started)
+        if self.total_tokens:
+            AI_OPERATION_TOKENS.labels(route=self.route).observe(self.total_tokens)
+        if self.status == "ok":
+            AI_OPERATION_TOOL_CALLS.labels(route=self.route).observe(self.tool_calls)
+
+
+@asynccontextmanager
+async def track_operation(route: str) -> AsyncIterator[OperationMetrics]:
+    """Time a chat turn or extraction; status is ok, rejected, cancelled or error."""
+    operation = OperationMetrics(route)
+    try:
+        yield operation
+    except LLMCapacityError:
+        operation.status = "rejected"
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        operation.status = "cancelled"
+        raise
+    except Exception:
+        operation.status = "error"
+        raise
+    finally:
+        operation.observe()
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator
+
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+from app.config import settings
+
+ROUTE_CHAT_AGENT = "chat_agent"
+ROUTE_TRANSCRIPT_EXTRACTION = "transcript_extraction"
+ROUTE_RECIPE_PHOTO = "recipe_photo"
+ROUTE_INGREDIENT_PHOTO = "ingredient_photo"
+ROUTE_SUMMARIZATION = "summarization"
+ROUTE_TITLING = "titling"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    primary: str
+    fallback: str | None = None
+    timeout_seconds: float = 60.0
+
+
+# Extraction and housekeeping calls run on the small model and fall back to the large one;
+# chat keeps the large model. Override per call site with LLM_ROUTES.
+DEFAULT_ROUTES: dict[str, ModelRoute] = {
+    ROUTE_CHAT_AGENT: ModelRoute(primary="gpt-4o", fallback="gpt-4o-mini", timeout_seconds=30),
+    ROUTE_TRANSCRIPT_EXTRACTION: ModelRoute(primary="gpt-4o-mini", fallback="gpt-4o", timeout_seconds=20),
+    ROUTE_RECIPE_PHOTO: ModelRoute(primary="gpt-4o", fallback="gpt-4o-mini", timeout_seconds=45),
+    ROUTE_INGREDIENT_PHOTO: ModelRoute(primary="gpt-4o-mini", fallback="gpt-4o", timeout_seconds=20),
+    ROUTE_SUMMARIZATION: ModelRoute(primary="gpt-4o-mini", fallback="gpt-4o", timeout_seconds=20),
+    ROUTE_TITLING: ModelRoute(primary="gpt-4o-mini", fallback="gpt-4o", timeout_seconds=10),
+}
+
+# USD per million (input, cached input, output) tokens, used for the per-route cost metric.
+MODEL_PRICING: dict[str, tuple[float, float, float]] = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+# Provider failures that should move a call to the fallback model. Scheduler and quota
+# rejections are deliberately not listed so they surface to the caller instead.
+_FALLBACK_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# Replies used by the local backend when no script is configured for a route.
+_DEFAULT_LOCAL_REPLIES: dict[str, list[dict[str, Any]]] = {
+    ROUTE_TRANSCRIPT_EXTRACTION: [{"content": '{"recipes": []}'}],
+    ROUTE_RECIPE_PHOTO: [{"content": '{"recipes": []}'}],
+    ROUTE_INGREDIENT_PHOTO: [{"content": '{"ingredients": []}'}],
+}
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def route_config(route: str) -> ModelRoute:
+    override = settings.llm_routes.get(route)
+    if override:
+        return ModelRoute(**override)
+    return DEFAULT_ROUTES.get(route, ModelRoute(primary=settings.llm_default_model))
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0) -> float:
+    input_price, cached_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0, 0.0))
+    uncached = input_tokens - cached_input_tokens
+    return (uncached * input_price + cached_input_tokens * cached_price + output_tokens * output_price) / 1_000_000
+
+
+def get_chat_model(route: str, temperature: float = 0, streaming: bool = False) -> Runnable:
+    """Return the chat model configured for a call site.
+
+    ``LLM_PROVIDER=local`` swaps every call site to the deterministic scripted backend so chat,
+    tool calling and scans run offline. Otherwise the route's primary OpenAI model is used, and a
+    timeout, rate limit or server error moves the call to the route's fallback model.
+    """
+    config = route_config(route)
+    if settings.llm_provider == "local":
+        return LocalChatModel(
+            route=route,
+            model_name=config.primary,
+            replies=_local_script().get(route) or _DEFAULT_LOCAL_REPLIES.get(route, []),
+            first_token_latency_ms=settings.llm_local_latency_ms,
+            token_latency_ms=settings.llm_local_token_latency_ms,
+        )
+    if settings.llm_provider != "openai":
+        raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
+
+    def build(model: str, max_retries: int) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            temperature=temperature,
+            streaming=streaming,
+            stream_usage=streaming,
+            timeout=config.timeout_seconds,
+            max_retries=max_retries,
+        )
+
+    if not config.fallback:
+        return build(config.primary, max_retries=2)
+    # No retries on the primary: a timeout should reach the fallback, not wait out another attempt.
+    return build(config.primary, max_retries=0).with_fallbacks(
+        [build(config.fallback, max_retries=1)],
+        exceptions_to_handle=_FALLBACK_ERRORS,
+    )
+
+
+@lru_cache
+def _local_script() -> dict[str, list[dict[str, Any]]]:
+    if not settings.llm_local_script_path:
+        return {}
+    with open(settings.llm_local_script_path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class LocalChatModel(BaseChatModel):
+    """Deterministic offline chat model that replays scripted replies.
+
+    Each route has a list of replies of the form ``{"content": "..."}`` or
+    ``{"tool_calls": [{"name": "...", "args": {...}}]}``. The reply is picked by the number of
+    assistant steps already taken since the last user message, so an agent turn walks through
+    the script (tool call, then answer) and every turn replays it identically. With no reply
+    configured the model echoes the last user message.
+    """
+
+    route: str
+    model_name: str = "local"
+    replies: list[dict[str, Any]] = []
+    first_token_latency_ms: int = 0
+    token_latency_ms: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-scripted"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"route": self.route, "model_name": self.model_name}
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        reply = self._reply(messages)
+        time.sleep(self._total_latency(reply))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        reply = self._reply(messages)
+        await asyncio.sleep(self._total_latency(reply))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency_ms / 1000)
+        for chunk in self._chunks(self._reply(messages)):
+            time.sleep(self.token_latency_ms / 1000)
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_latency_ms / 1000)
+        for chunk in self._chunks(self._reply(messages)):
+            await asyncio.sleep(self.token_latency_ms / 1000)
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _reply(self, messages: list[BaseMessage]) -> AIMessage:
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage):
+                step += 1
+
+        if self.replies:
+            reply = self.replies[min(step, len(self.replies) - 1)]
+        else:
+            reply = {"content": f"You said: {_last_human_text(messages)}"}
+
+        content = reply.get("content") or ""
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call_{uuid.uuid4().hex[:24]}"}
+            for call in reply.get("tool_calls", [])
+        ]
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        output_tokens = len(_TOKEN_PATTERN.findall(content)) + 10 * len(tool_calls)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        for token in _TOKEN_PATTERN.findall(message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                    for index, call in enumerate(message.tool_calls)
+                ],
+                usage_metadata=message.usage_metadata,
+                response_metadata=message.response_metadata,
+            )
+        )
+
+    def _total_latency(self, reply: AIMessage) -> float:
+        tokens = len(_TOKEN_PATTERN.findall(str(reply.content)))
+        return (self.first_token_latency_ms + tokens * self.token_latency_ms) / 1000
+
+
+def _last_human_text(messages: list[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            if isinstance(message.content, str):
+                return message.content
+            return " ".join(
+                part.get("text", "") for part in message.content if isinstance(part, dict) and part.get("type") == "text"
+            )
+    return ""
@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+import uuid
+from enum import IntEnum
+from typing import Any
+
+from fastapi import HTTPException
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from app.config import settings
+from app.services.metrics import (
+    LLM_QUEUE_DEPTH,
+    LLM_QUEUE_REJECTIONS,
+    LLM_QUEUE_WAIT_SECONDS,
+)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    SCAN = 1
+    BACKGROUND = 2
+
+
+class LLMCapacityError(Exception):
+    """Raised when a model call cannot be admitted within the provider budget."""
+
+    def __init__(self, detail: str, status_code: int, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Budget:
+    """Token bucket refilled continuously up to a per-minute limit."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        needed = min(amount, self.capacity) - self.available
+        return max(0.0, needed / self.rate) if self.rate > 0 else math.inf
+
+
+class LLMScheduler:
+    """Admits outbound model calls in priority order within RPM/TPM budgets.
+
+    Interactive chat is served ahead of scans and background work. The queue is bounded: when it
+    is full, or a call waits longer than ``max_wait_seconds``, the caller gets ``LLMCapacityError``
+    instead of piling more load onto a rate-limited provider.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_queue_depth: int,
+        max_wait_seconds: float,
+    ):
+        self._requests = _Budget(requests_per_minute)
+        self._tokens = _Budget(tokens_per_minute)
+        self._max_queue_depth = max_queue_depth
+        self._max_wait_seconds = max_wait_seconds
+        self._queue: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, waiter in self._queue if not waiter.done())
+
+    def check_admission(self) -> None:
+        """Fail fast before starting work that will need a model call."""
+        if self.queue_depth >= self._max_queue_depth:
+            LLM_QUEUE_REJECTIONS.labels(reason="queue_full").inc()
+            raise LLMCapacityError("AI service is busy, please retry shortly", 503, 1)
+
+    async def acquire(self, priority: Priority, estimated_tokens: int) -> None:
+        self.check_admission()
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        started = time.monotonic()
+        heapq.heappush(self._queue, (int(priority), next(self._sequence), float(estimated_tokens), waiter))
+        LLM_QUEUE_DEPTH.set(self.queue_depth)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self._max_wait_seconds)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                LLM_QUEUE_REJECTIONS.labels(reason="timeout").inc()
+                raise LLMCapacityError(
+                    "AI rate limit reached, please retry shortly",
+                    429,
+                    max(1, math.ceil(self._seconds_until_head())),
+                )
+        except asyncio.CancelledError:
+            if not waiter.done():
+                waiter.cancel()
+            raise
+        finally:
+            LLM_QUEUE_DEPTH.set(self.queue_depth)
+            self._dispatch()
+
+        LLM_QUEUE_WAIT_SECONDS.labels(priority=priority.name.lower()).observe(time.monotonic() - started)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once the provider reports real usage."""
+        self._tokens.refill(time.monotonic())
+        self._tokens.available += estimated_tokens - actual_tokens
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._requests.refill(now)
+        self._tokens.refill(now)
+
+        while self._queue:
+            _, _, tokens, waiter = self._queue[0]
+            if waiter.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = max(self._requests.seconds_until(1), self._tokens.seconds_until(tokens))
+            if wait > 0:
+                self._schedule_wakeup(wait)
+                return
+            heapq.heappop(self._queue)
+            self._requests.available -= 1
+            self._tokens.available -= tokens
+            waiter.set_result(None)
+
+    def _seconds_until_head(self) -> float:
+        for _, _, tokens, waiter in sorted(self._queue):
+            if not waiter.done():
+                return max(self._requests.seconds_until(1), self._tokens.seconds_until(tokens))
+        return self._tokens.seconds_until(0)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(delay, self._dispatch)
+
+
+def estimate_tokens(messages: list[list[BaseMessage]]) -> int:
+    """Rough prompt size (~4 characters per token) plus the expected completion."""
+    chars = 0
+    for batch in messages:
+        for message in batch:
+            if isinstance(message.content, str):
+                chars += len(message.content)
+            else:
+                for part in message.content:
+                    if isinstance(part, dict) and part.get("type") == "text":
+                        chars += len(part.get("text", ""))
+                    elif isinstance(part, dict) and part.get("type") == "image_url":
+                        chars += 4 * 1000  # high-detail image tiles are ~1k tokens
+    return chars // 4 + settings.llm_completion_token_estimate
+
+
+def token_usage(response: LLMResult) -> dict[str, int]:
+    """Sum provider-reported usage across the generations of one model call.
+
+    ``cached_input_tokens`` is the part of ``input_tokens`` served from the provider's prompt cache.
+    """
+    totals = {"input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            for key in ("input_tokens", "output_tokens", "total_tokens"):
+                totals[key] += int(usage.get(key) or 0)
+            totals["cached_input_tokens"] += int((usage.get("input_token_details") or {}).get("cache_read") or 0)
+    if not totals["total_tokens"]:
+        reported = (response.llm_output or {}).get("token_usage") or {}
+        totals["input_tokens"] = int(reported.get("prompt_tokens") or 0)
+        totals["cached_input_tokens"] = int((reported.get("prompt_tokens_details") or {}).get("cached_tokens") or 0)
+        totals["output_tokens"] = int(reported.get("completion_tokens") or 0)
+        totals["total_tokens"] = int(reported.get("total_tokens") or 0)
+    return totals
+
+
+class SchedulerCallback(AsyncCallbackHandler):
+    """Routes every chat-model call through the shared scheduler.
+
+    The priority is read from the ``llm_priority`` run metadata so it is inherited by every model
+    call an agent makes during a turn. It runs inline, ahead of the other handlers, so their
+    timings start after admission and a rejected call never reaches them.
+    """
+
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, scheduler: LLMScheduler):
+        self._scheduler = scheduler
+        self._reservations: dict[uuid.UUID, int] = {}
+
+    async def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: uuid.UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        priority = Priority((metadata or {}).get("llm_priority", Priority.BACKGROUND))
+        estimated = estimate_tokens(messages)
+        await self._scheduler.acquire(priority, estimated)
+        self._reservations[run_id] = estimated
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        estimated = self._reservations.pop(run_id, None)
+        if estimated is None:
+            return
+        actual = token_usage(response)["total_tokens"]
+        if actual:
+            self._scheduler.settle(estimated, actual)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        self._reservations.pop(run_id, None)
+
+
+# The provider budgets are the account's; each worker process admits within an equal share.
+_workers = max(1, settings.web_concurrency)
+scheduler = LLMScheduler(
+    requests_per_minute=settings.llm_requests_per_minute // _workers,
+    tokens_per_minute=settings.llm_tokens_per_minute // _workers,
+    max_queue_depth=settings.llm_max_queue_depth,
+    max_wait_seconds=settings.llm_max_queue_wait_seconds,
+)
+scheduler_callback = SchedulerCallback(scheduler)
+
+
+def capacity_exception(exc: LLMCapacityError) -> HTTPException:
+    return HTTPException(
+        status_code=exc.status_code,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def require_llm_capacity() -> None:
+    """Dependency that rejects AI requests up front while the model queue is full."""
+    try:
+        scheduler.check_admission()
+    except LLMCapacityError as exc:
+        raise capacity_exception(exc) from exc
@@ -0,0 +1,151 @@
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_queue_wait_seconds",
+    "Time model calls spend waiting for scheduler admission",
+    ["priority"],
+    buckets=(0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30),
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "llm_queue_depth", "Model calls currently waiting for admission", multiprocess_mode="livesum"
+)
+LLM_QUEUE_REJECTIONS = Counter(
+    "llm_queue_rejections_total",
+    "Model calls rejected by the scheduler",
+    ["reason"],
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Model call latency by call site and model",
+    ["route", "model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens consumed by call site and model; kind is input (uncached), cached_input or output",
+    ["route", "model", "kind"],
+)
+LLM_COST_USD = Counter("llm_cost_usd_total", "Estimated model spend in USD", ["route", "model"])
+LLM_ERRORS = Counter("llm_errors_total", "Failed model calls", ["route", "model", "error"])
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "Calls served by a route's fallback model", ["route"])
+LLM_PARSE_FAILURES = Counter(
+    "llm_parse_failures_total",
+    "Extraction replies that were not valid JSON",
+    ["route"],
+)
+LLM_TILE_FAILURES = Counter(
+    "llm_tile_failures_total",
+    "Photo tiles that failed while other tiles of the same scan succeeded",
+    ["route"],
+)
+
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from admission to the first streamed token of a model call",
+    ["route", "model"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 4, 8, 15),
+)
+LLM_OUTPUT_TOKENS_PER_SECOND = Histogram(
+    "llm_output_tokens_per_second",
+    "Completion tokens generated per second of model time",
+    ["route", "model"],
+    buckets=(5, 10, 20, 30, 45, 60, 80, 100, 150, 250),
+)
+
+AI_OPERATION_SECONDS = Histogram(
+    "ai_operation_duration_seconds",
+    "End-to-end duration of a chat turn or extraction, including queueing and tools",
+    ["route", "status"],
+    buckets=(0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+AI_OPERATION_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "ai_operation_time_to_first_token_seconds",
+    "Time from the start of a chat turn to the first answer token streamed to the client",
+    ["route"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+AI_OPERATION_TOKENS = Histogram(
+    "ai_operation_tokens",
+    "Total tokens consumed by one chat turn or extraction across all its model calls",
+    ["route"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000),
+)
+AI_OPERATION_TOOL_CALLS = Histogram(
+    "ai_operation_tool_calls",
+    "Tool calls made during one chat turn",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13),
+)
+AI_TOOL_SECONDS = Histogram(
+    "ai_tool_duration_seconds",
+    "Agent tool execution time",
+    ["tool", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", multiprocess_mode="livesum"
+)
+DB_POOL_IDLE = Gauge("db_pool_idle", "Idle connections held by the pool", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size", multiprocess_mode="livesum")
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time to check a connection out of the pool, including connecting",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up after the pool timeout")
+
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds", "Replay lag of the read replica at the last check", multiprocess_mode="livemax"
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes_total",
+    "Read-only requests by the database they were routed to",
+    ["target", "reason"],
+)
+
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_REQUEST_SECONDS = Histogram(
+    "db_request_seconds",
+    "Time spent in SQL statements per request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total",
+    "Requests that ran more statements than the configured query budget",
+    ["route"],
+)
+DB_REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements_total",
+    "Requests that ran one statement past the repeat threshold (likely N+1)",
+    ["route"],
+)
+
+CHAT_ARCHIVE_SESSIONS = Counter(
+    "chat_archive_sessions_total",
+    "Chat sessions moved to or restored from the compressed archive",
+    ["action"],
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition for ``/metrics``; under gunicorn it merges every worker's samples.
+
+    ``gunicorn.conf.py`` sets ``PROMETHEUS_MULTIPROC_DIR``, where each worker writes its metric
+    values, so a scrape reaching any one worker sees the whole server.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
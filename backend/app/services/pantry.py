@@ -0,0 +1,93 @@
+import uuid
+from collections.abc import Collection
+
+from sqlalchemy import String, delete, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ingredient import HouseholdIngredient
+
+
+def _best_matches(user_id: uuid.UUID, queries: list[str], exclude_ids: Collection[uuid.UUID] = ()):
+    """CTE of the pantry items matched by each query, as ``(id, ord)``.
+
+    Candidates come from the trigram index by word similarity (``query <% lower(name)``), which
+    compares the query with the best-matching run of words in the name, so "oil" finds "extra
+    virgin olive oil". Exact case-insensitive matches win and all of them are kept; otherwise only
+    the single best match is, so "rice" no longer takes "rice vinegar" along with it.
+    """
+    requested = (
+        func.unnest(literal(queries, ARRAY(String)))
+        .table_valued("q", with_ordinality="ord")
+        .render_derived(name="requested")
+    )
+    lowered = func.lower(HouseholdIngredient.name)
+    exact = lowered == requested.c.q
+    candidates = (
+        select(
+            HouseholdIngredient.id,
+            requested.c.ord,
+            exact.label("exact"),
+            func.row_number()
+            .over(
+                partition_by=requested.c.ord,
+                order_by=(
+                    exact.desc(),
+                    func.word_similarity(requested.c.q, lowered).desc(),
+                    # Among names containing the query equally well, the one with least else in it.
+                    func.similarity(requested.c.q, lowered).desc(),
+                    HouseholdIngredient.name,
+                ),
+            )
+            .label("rank"),
+        )
+        .join(requested, requested.c.q.op("<%")(lowered))
+        .where(HouseholdIngredient.user_id == user_id)
+    )
+    if exclude_ids:
+        candidates = candidates.where(HouseholdIngredient.id.not_in(exclude_ids))
+    ranked = candidates.cte("ranked")
+    return select(ranked.c.id, ranked.c.ord).where(or_(ranked.c.exact, ranked.c.rank == 1)).cte("matched")
+
+
+def remove_matching_statement(user_id: uuid.UUID, queries: list[str]):
+    """One ``DELETE ... RETURNING`` removing the best pantry match for each query.
+
+    Returns ``(name, query_index)`` rows with 1-based query indexes.
+    """
+    matched = _best_matches(user_id, queries)
+    return (
+        delete(HouseholdIngredient)
+        .where(HouseholdIngredient.id == matched.c.id)
+        .returning(HouseholdIngredient.name, matched.c.ord)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def matching_statement(user_id: uuid.UUID, queries: list[str], exclude_ids: Collection[uuid.UUID] = ()):
+    """The rows ``remove_matching_statement`` would remove, skipping ``exclude_ids``, as
+    ``(HouseholdIngredient, query_index)``.
+    """
+    matched = _best_matches(user_id, queries, exclude_ids)
+    return (
+        select(HouseholdIngredient, matched.c.ord)
+        .join(matched, HouseholdIngredient.id == matched.c.id)
+        .order_by(matched.c.ord, HouseholdIngredient.name)
+    )
+
+
+async def find_matching_items(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    names: list[str],
+    exclude_ids: Collection[uuid.UUID] = (),
+) -> list[list[HouseholdIngredient]]:
+    """The items ``remove_matching_statement`` would remove for each name; nothing is locked or deleted."""
+    queries = [name.strip().lower() for name in names]
+    found: list[list[HouseholdIngredient]] = [[] for _ in names]
+    if not any(queries):
+        return found
+    result = await db.execute(matching_statement(user_id, queries, exclude_ids))
+    for item, ordinal in result:
+        found[ordinal - 1].append(item)
+    return found
@@ -0,0 +1,86 @@
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import QueryStats, query_stats
+from app.services.metrics import (
+    DB_QUERY_BUDGET_EXCEEDED,
+    DB_REPEATED_STATEMENTS,
+    DB_REQUEST_QUERIES,
+    DB_REQUEST_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Collects per-request SQL statistics and flags query-budget overruns and N+1 patterns.
+
+    Metrics are recorded once the response body has finished, so streamed chat turns are counted
+    in full. In debug mode the counts so far are also returned as ``X-DB-*`` response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(keep_slowest=settings.db_slow_statement_log_count)
+        token = query_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.debug:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            query_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                _report(f"{scope['method']} {route}", stats)
+
+
+def _report(route: str, stats: QueryStats) -> None:
+    DB_REQUEST_QUERIES.labels(route=route).observe(stats.count)
+    DB_REQUEST_SECONDS.labels(route=route).observe(stats.total_seconds)
+
+    flagged = False
+    if stats.count > settings.db_query_budget:
+        DB_QUERY_BUDGET_EXCEEDED.labels(route=route).inc()
+        logger.warning(
+            "%s ran %d queries (budget %d) in %.1f ms",
+            route,
+            stats.count,
+            settings.db_query_budget,
+            stats.total_seconds * 1000,
+        )
+        flagged = True
+    repeated = stats.repeated(settings.db_repeated_statement_threshold)
+    if repeated:
+        DB_REPEATED_STATEMENTS.labels(route=route).inc()
+        statement, count = repeated[0]
+        logger.warning("%s repeated a statement %d times (possible N+1): %s", route, count, _shorten(statement))
+        flagged = True
+    if flagged or settings.debug:
+        for seconds, statement in stats.slowest:
+            logger.log(
+                logging.WARNING if flagged else logging.DEBUG,
+                "%s slow query %.1f ms: %s",
+                route,
+                seconds * 1000,
+                _shorten(statement),
+            )
+
+
+def _shorten(statement: str, limit: int = 300) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else f"{statement[:limit]}..."
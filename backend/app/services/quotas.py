@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import Depends, HTTPException, Response, status
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, get_db
+from app.models.ai_quota_bucket import AIQuotaBucket
+from app.models.llm_usage import LLMUsage
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.llm_scheduler import token_usage
+
+logger = logging.getLogger(__name__)
+
+_USAGE_FIELDS = ("request_count", "input_tokens", "cached_input_tokens", "output_tokens", "total_tokens")
+
+
+class TokenBucket:
+    """Per-user token bucket refilled continuously over an hour.
+
+    Calls are admitted while the balance is positive and debited with the tokens the provider
+    actually reports, so one expensive call can push a user into debt until it refills.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = float(capacity)
+        self.rate = capacity / 3600.0
+        self.balance = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def debit(self, tokens: int) -> None:
+        self.refill()
+        self.balance -= tokens
+
+    @property
+    def seconds_until_available(self) -> int:
+        return 0 if self.balance > 0 else math.ceil((1 - self.balance) / self.rate)
+
+    @property
+    def seconds_until_full(self) -> int:
+        return math.ceil((self.capacity - self.balance) / self.rate)
+
+
+class UsageLedger:
+    """Accumulates per-call usage in memory and rolls it up into ``llm_usage`` periodically."""
+
+    def __init__(self):
+        self._pending: dict[tuple[uuid.UUID, datetime, str], dict[str, int]] = {}
+
+    def record(self, user_id: uuid.UUID, route: str, usage: dict[str, int]) -> None:
+        period_start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        totals = self._pending.setdefault((user_id, period_start, route), dict.fromkeys(_USAGE_FIELDS, 0))
+        totals["request_count"] += 1
+        for key in _USAGE_FIELDS[1:]:
+            totals[key] += usage.get(key, 0)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [
+            {"user_id": user_id, "period_start": period_start, "route": route, **totals}
+            for (user_id, period_start, route), totals in pending.items()
+        ]
+        stmt = insert(LLMUsage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_llm_usage_user_period_route",
+            set_={field: getattr(LLMUsage, field) + getattr(stmt.excluded, field) for field in _USAGE_FIELDS},
+        )
+        try:
+            async with async_session() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception:
+            # Keep the rollup for the next attempt rather than dropping spend.
+            for key, totals in pending.items():
+                merged = self._pending.setdefault(key, dict.fromkeys(_USAGE_FIELDS, 0))
+                for field in _USAGE_FIELDS:
+                    merged[field] += totals[field]
+            raise
+
+    async def run_periodic_flush(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ai_usage_flush_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush LLM usage ledger")
+
+
+class QuotaManager:
+    """Per-user token buckets shared by every worker process through ``ai_quota_buckets``.
+
+    Debits land in this worker's copy at once and are written to the table every
+    ``ai_quota_sync_seconds``. Admission reads the shared balance less this worker's unsynced
+    debits, so spend on other workers counts within one sync interval.
+    """
+
+    def __init__(self, tokens_per_hour: int):
+        self._tokens_per_hour = tokens_per_hour
+        self._buckets: dict[uuid.UUID, TokenBucket] = {}
+        self._unsynced: dict[uuid.UUID, int] = {}
+
+    def bucket(self, user_id: uuid.UUID) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self._tokens_per_hour)
+        bucket.refill()
+        return bucket
+
+    def debit(self, user_id: uuid.UUID, tokens: int) -> None:
+        self.bucket(user_id).debit(tokens)
+        self._unsynced[user_id] = self._unsynced.get(user_id, 0) + tokens
+
+    def _refilled_balance(self):
+        """SQL for a stored bucket's balance now, refilled since ``updated_at``."""
+        elapsed = func.extract("epoch", func.now() - AIQuotaBucket.updated_at)
+        return func.least(self._tokens_per_hour, AIQuotaBucket.balance + elapsed * (self._tokens_per_hour / 3600.0))
+
+    async def load(self, db: AsyncSession, user_id: uuid.UUID) -> TokenBucket:
+        """The user's bucket as spent on every worker."""
+        bucket = self.bucket(user_id)
+        shared = (
+            await db.execute(select(self._refilled_balance()).where(AIQuotaBucket.user_id == user_id))
+        ).scalar_one_or_none()
+        # No row yet: nothing has been synced for this user, so this worker's copy is complete.
+        if shared is not None:
+            bucket.balance = float(shared) - self._unsynced.get(user_id, 0)
+        return bucket
+
+    async def sync(self) -> None:
+        self._evict_full_buckets()
+        if not self._unsynced:
+            return
+        pending, self._unsynced = self._unsynced, {}
+        # Sorted, so workers syncing the same users lock their rows in the same order.
+        rows = [
+            {"user_id": user_id, "balance": self._tokens_per_hour - tokens}
+            for user_id, tokens in sorted(pending.items(), key=lambda item: str(item[0]))
+        ]
+        stmt = insert(AIQuotaBucket).values(rows)
+        # A new row starts full; capacity - excluded.balance is the debit being written.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AIQuotaBucket.user_id],
+            set_={
+                "balance": self._refilled_balance() - (self._tokens_per_hour - stmt.excluded.balance),
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            async with async_session() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception:
+            for user_id, tokens in pending.items():
+                self._unsynced[user_id] = self._unsynced.get(user_id, 0) + tokens
+            raise
+
+    def _evict_full_buckets(self) -> None:
+        # A full bucket with nothing left to write holds no information the table lacks.
+        for user_id, bucket in list(self._buckets.items()):
+            if user_id not in self._unsynced:
+                bucket.refill()
+                if bucket.balance >= bucket.capacity:
+                    del self._buckets[user_id]
+
+    async def run_periodic_sync(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ai_quota_sync_seconds)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync AI quota buckets")
+
+    def headers(self, bucket: TokenBucket) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self._tokens_per_hour),
+            "X-RateLimit-Remaining": str(max(0, int(bucket.balance))),
+            "X-RateLimit-Reset": str(bucket.seconds_until_full),
+        }
+
+
+class UsageCallback(AsyncCallbackHandler):
+    """Debits user quotas and records ledger usage from the model's reported token counts.
+
+    Reads ``llm_user_id`` and ``llm_route`` from run metadata; calls without a user are ignored.
+    """
+
+    def __init__(self, quotas: QuotaManager, ledger: UsageLedger):
+        self._quotas = quotas
+        self._ledger = ledger
+        self._runs: dict[uuid.UUID, tuple[uuid.UUID, str]] = {}
+
+    async def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: uuid.UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        user_id = (metadata or {}).get("llm_user_id")
+        if user_id is not None:
+            self._runs[run_id] = (user_id, (metadata or {}).get("llm_route", "unknown"))
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        user_id, route = run
+        usage = token_usage(response)
+        self._quotas.debit(user_id, usage["total_tokens"])
+        self._ledger.record(user_id, route, usage)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        self._runs.pop(run_id, None)
+
+
+quotas = QuotaManager(settings.ai_user_tokens_per_hour)
+usage_ledger = UsageLedger()
+usage_callback = UsageCallback(quotas, usage_ledger)
+
+
+async def enforce_ai_quota(
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, str]:
+    """Reject AI requests from users who have spent their token budget.
+
+    Returns the rate-limit headers so streaming endpoints can attach them to their own response.
+    """
+    bucket = await quotas.load(db, user.id)
+    headers = quotas.headers(bucket)
+    if bucket.balance <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="AI usage limit reached, please try again later",
+            headers={**headers, "Retry-After": str(bucket.seconds_until_available)},
+        )
+    response.headers.update(headers)
+    return headers
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from fastapi import Depends
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.config import settings
+from app.database import get_db, replica_session
+from app.models.sync_change import SyncCursor
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.metrics import DB_READ_ROUTES, DB_REPLICA_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received; otherwise time since the last replay.
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReadRouter:
+    """Decides whether a user's read-only request may be served by the replica.
+
+    Users are pinned to the primary for a short window after they commit a write so they read
+    their own changes, and all reads go to the primary while the replica is lagging or unreachable.
+    Pins live in process memory, so they only cover writes made through this worker;
+    ``get_read_db`` catches the others by comparing the user's sync cursor on both servers.
+    """
+
+    def __init__(self, pin_seconds: float, max_lag_seconds: float):
+        self._pin_seconds = pin_seconds
+        self._max_lag_seconds = max_lag_seconds
+        self._pinned_until: dict[uuid.UUID, float] = {}
+        self.lag_seconds: float | None = None
+
+    def pin(self, user_id: uuid.UUID) -> None:
+        now = time.monotonic()
+        if len(self._pinned_until) > 10_000:
+            self._pinned_until = {uid: until for uid, until in self._pinned_until.items() if until > now}
+        self._pinned_until[user_id] = now + self._pin_seconds
+
+    def route(self, user_id: uuid.UUID) -> tuple[str, str]:
+        """Return ``(target, reason)`` for a read by ``user_id``."""
+        if self._pinned_until.get(user_id, 0.0) > time.monotonic():
+            return "primary", "recent_write"
+        if self.lag_seconds is None:
+            return "primary", "replica_unavailable"
+        if self.lag_seconds > self._max_lag_seconds:
+            return "primary", "replica_lagging"
+        return "replica", "ok"
+
+    async def check_lag(self) -> None:
+        try:
+            async with replica_session() as db:
+                lag = (await db.execute(_REPLICA_LAG_SQL)).scalar()
+        except Exception:
+            logger.exception("Read replica lag check failed")
+            self.lag_seconds = None
+            return
+        # NULL means the server is not replaying WAL at all, i.e. it isn't a standby.
+        self.lag_seconds = float(lag) if lag is not None else 0.0
+        DB_REPLICA_LAG_SECONDS.set(self.lag_seconds)
+
+    async def run_lag_monitor(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(settings.db_replica_lag_check_seconds)
+
+
+read_router = ReadRouter(settings.db_read_your_writes_seconds, settings.db_replica_max_lag_seconds)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        read_router.pin(user_id)
+
+
+async def get_read_db(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Session for read-only routes: the replica when it is safe, otherwise the request's primary session."""
+    if replica_session is None:
+        yield db
+        return
+    target, reason = read_router.route(user.id)
+    if target == "primary":
+        DB_READ_ROUTES.labels(target=target, reason=reason).inc()
+        yield db
+        return
+    # Every synced write bumps the user's cursor, so a replica still behind it has not yet
+    # replayed a write this user made, possibly through another worker.
+    primary_cursor = await _sync_cursor(db, user.id)
+    # End the lookup's transaction so its connection goes back to the pool now, not when the
+    # request ends; the fallback below checks one out again only if it is needed.
+    await db.commit()
+    async with replica_session() as session:
+        if await _sync_cursor(session, user.id) < primary_cursor:
+            DB_READ_ROUTES.labels(target="primary", reason="replica_behind_user").inc()
+            yield db
+            return
+        DB_READ_ROUTES.labels(target=target, reason=reason).inc()
+        yield session
+
+
+async def _sync_cursor(db: AsyncSession, user_id: uuid.UUID) -> int:
+    cursor = await db.execute(select(SyncCursor.cursor).where(SyncCursor.user_id == user_id))
+    return cursor.scalar_one_or_none() or 0
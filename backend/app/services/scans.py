@@ -0,0 +1,132 @@
+"""Photo and conversation scans, run as background jobs.
+
+Each handler reads what it needs in a short session and releases it before the model call, so a
+scan holds no database connection while it waits on the model.
+"""
+
+import uuid
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.chat import ChatSession
+from app.models.ingredient import HouseholdIngredient
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.schemas.ingredient import IngredientCreate
+from app.schemas.recipe import RecipeCreate
+from app.services.ai_loader import load_ai
+from app.services.chat_archive import session_messages
+from app.services.jobs import ClaimedJob, JobFailed, job_handler, load_job_blob
+from app.services.llm_scheduler import LLMCapacityError
+
+RECIPE_CONVERSATION_SCAN = "recipe_conversation_scan"
+RECIPE_PHOTO_SCAN = "recipe_photo_scan"
+INGREDIENT_PHOTO_SCAN = "ingredient_photo_scan"
+
+
+@job_handler(RECIPE_CONVERSATION_SCAN)
+async def scan_conversation(job: ClaimedJob) -> dict[str, Any]:
+    async with async_session() as db:
+        user = await db.get(User, job.user_id)
+        session = (
+            await db.execute(
+                select(ChatSession).where(
+                    ChatSession.id == uuid.UUID(job.payload["session_id"]), ChatSession.user_id == job.user_id
+                )
+            )
+        ).scalar_one_or_none()
+        if user is None or session is None:
+            raise JobFailed("Session not found")
+        messages = await session_messages(db, session)
+        user_categories = await _categories(db, Recipe.category, Recipe.user_id, job.user_id)
+
+    transcript = "\n\n".join(
+        f"{msg.role.upper()}: {msg.content.strip()}" for msg in messages if msg.content and msg.content.strip()
+    )
+    if not transcript:
+        return {"recipes": []}
+
+    ai = await load_ai()
+    try:
+        parsed = await ai.extract_recipes_from_transcript(
+            transcript,
+            user_categories=user_categories,
+            user_context=ai._build_user_context(user.display_name, user.dietary_preferences),
+            user_id=job.user_id,
+        )
+    except LLMCapacityError:
+        raise
+    except Exception as exc:
+        raise JobFailed(f"Recipe extraction failed: {exc}") from exc
+    return {"recipes": _valid(RecipeCreate, parsed)}
+
+
+@job_handler(RECIPE_PHOTO_SCAN)
+async def scan_recipe_photo(job: ClaimedJob) -> dict[str, Any]:
+    user, image_bytes, user_categories = await _photo_inputs(job, Recipe.category, Recipe.user_id)
+    ai = await load_ai()
+    try:
+        parsed = await ai.extract_recipes_from_photo(
+            image_bytes=image_bytes,
+            image_mime_type=job.payload["content_type"],
+            user_categories=user_categories,
+            user_context=ai._build_user_context(user.display_name, user.dietary_preferences),
+            user_id=job.user_id,
+        )
+    except LLMCapacityError:
+        raise
+    except Exception as exc:
+        raise JobFailed(f"Recipe extraction from image failed: {exc}") from exc
+    return {"recipes": _valid(RecipeCreate, parsed)}
+
+
+@job_handler(INGREDIENT_PHOTO_SCAN)
+async def scan_ingredient_photo(job: ClaimedJob) -> dict[str, Any]:
+    user, image_bytes, user_categories = await _photo_inputs(
+        job, HouseholdIngredient.category, HouseholdIngredient.user_id
+    )
+    ai = await load_ai()
+    try:
+        parsed = await ai.extract_ingredients_from_photo(
+            image_bytes=image_bytes,
+            image_mime_type=job.payload["content_type"],
+            user_categories=user_categories,
+            user_context=ai._build_user_context(user.display_name, user.dietary_preferences),
+            user_id=job.user_id,
+        )
+    except LLMCapacityError:
+        raise
+    except Exception as exc:
+        raise JobFailed(f"Ingredient extraction from image failed: {exc}") from exc
+    return {"ingredients": _valid(IngredientCreate, parsed)}
+
+
+async def _photo_inputs(job: ClaimedJob, category_column, owner_column) -> tuple[User, bytes, list[str]]:
+    image_bytes = await load_job_blob(job.id)
+    async with async_session() as db:
+        user = await db.get(User, job.user_id)
+        user_categories = await _categories(db, category_column, owner_column, job.user_id)
+    if user is None or not image_bytes:
+        raise JobFailed("Uploaded image is missing")
+    return user, image_bytes, user_categories
+
+
+async def _categories(db: AsyncSession, category_column, owner_column, user_id: uuid.UUID) -> list[str]:
+    rows = await db.execute(
+        select(category_column).where(owner_column == user_id, category_column.is_not(None)).distinct()
+    )
+    return [category.strip() for category in rows.scalars().all() if isinstance(category, str) and category.strip()]
+
+
+def _valid(schema: type[BaseModel], candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    valid = []
+    for candidate in candidates:
+        try:
+            valid.append(schema.model_validate(candidate).model_dump(mode="json"))
+        except Exception:
+            continue
+    return valid
@@ -0,0 +1,43 @@
+from functools import cache
+from typing import Any, Iterable
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class TrustedJSONResponse(Response):
+    """JSON for data read from our own database, encoded by orjson without model validation.
+
+    Routes keep their ``response_model`` for the OpenAPI schema; returning this response skips
+    FastAPI's validate-then-``json.dumps`` path. UTC datetimes keep pydantic's ``Z`` suffix.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+@cache
+def _field_names(model: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(model.model_fields)
+
+
+def as_row(model: type[BaseModel], obj: Any) -> dict[str, Any]:
+    """Project a trusted ORM object onto ``model``'s fields without validating it."""
+    return {name: getattr(obj, name) for name in _field_names(model)}
+
+
+def as_rows(model: type[BaseModel], objects: Iterable[Any]) -> list[dict[str, Any]]:
+    fields = _field_names(model)
+    return [{name: getattr(obj, name) for name in fields} for obj in objects]
+
+
+def trusted_json(content: Any, response: Response | None = None, status_code: int = 200) -> TrustedJSONResponse:
+    """Build the response, carrying over headers dependencies set on the injected ``response``.
+
+    FastAPI drops those headers (e.g. ``ETag``) when a route returns its own ``Response``.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return TrustedJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.database import async_session
+from app.models.shopping_list import ShoppingList
+from app.models.sync_change import SyncChange, SyncCursor
+from app.services.sync import SHOPPING_LIST_ITEMS
+
+logger = logging.getLogger(__name__)
+
+# Raised by the trigger from migration 0008 on every committed change to a list; payload is the user id.
+CHANNEL = "shopping_list_changes"
+
+
+class _UserChannel:
+    def __init__(self) -> None:
+        self.queues: set[asyncio.Queue] = set()
+        # Last sync cursor broadcast to this user's streams; None until the first snapshot.
+        self.cursor: int | None = None
+        self.refreshing = False
+        self.dirty = False
+
+
+class ShoppingListHub:
+    """Per-worker fan-out of shopping-list changes to each user's open event streams.
+
+    One LISTEN connection per worker receives a notification per committed list write, whether
+    it came from the routes or the agent's tools. For a user with open streams on this worker,
+    the item diff is read once from ``sync_changes`` and sent to all of them. Notifications that
+    arrive during a read are coalesced into one follow-up read.
+    """
+
+    def __init__(self, queue_size: int, heartbeat_seconds: float):
+        self._queue_size = queue_size
+        self._heartbeat_seconds = heartbeat_seconds
+        self._channels: dict[uuid.UUID, _UserChannel] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(channel.queues) for channel in self._channels.values())
+
+    async def stream(self, user_id: uuid.UUID) -> AsyncIterator[str]:
+        """SSE stream: the current list, then item diffs as they are committed."""
+        channel = self._channels.setdefault(user_id, _UserChannel())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        channel.queues.add(queue)
+        try:
+            # Registered before reading, so nothing committed after the snapshot is missed.
+            snapshot = await load_snapshot(user_id)
+            if channel.cursor is None:
+                channel.cursor = snapshot["cursor"]
+                if channel.dirty:
+                    self.notify(user_id)
+            yield _sse(snapshot)
+            sent = snapshot["cursor"]
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self._heartbeat_seconds)
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    # Fell too far behind or the worker is stopping; the client reconnects and
+                    # starts from a new snapshot.
+                    return
+                if event["cursor"] <= sent:
+                    continue
+                sent = event["cursor"]
+                yield _sse(event)
+        finally:
+            channel.queues.discard(queue)
+            if not channel.queues and self._channels.get(user_id) is channel:
+                del self._channels[user_id]
+
+    def notify(self, user_id: uuid.UUID) -> None:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            return
+        if channel.refreshing or channel.cursor is None:
+            channel.dirty = True
+            return
+        task = asyncio.create_task(self._refresh(user_id, channel))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, user_id: uuid.UUID, channel: _UserChannel) -> None:
+        channel.refreshing = True
+        try:
+            while True:
+                channel.dirty = False
+                diff = await load_diff(user_id, channel.cursor)
+                if diff is not None:
+                    channel.cursor = diff["cursor"]
+                    self._broadcast(channel, diff)
+                if not channel.dirty or not channel.queues:
+                    break
+        except Exception:
+            logger.exception("Shopping list diff failed for user %s", user_id)
+        finally:
+            channel.refreshing = False
+
+    @classmethod
+    def _broadcast(cls, channel: _UserChannel, event: dict[str, Any]) -> None:
+        for queue in list(channel.queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                cls._close(queue)
+
+    def close_streams(self) -> None:
+        """End every open stream; on shutdown, clients reconnect to another worker."""
+        for channel in self._channels.values():
+            for queue in list(channel.queues):
+                self._close(queue)
+
+    @staticmethod
+    def _close(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            user_id = uuid.UUID(payload)
+        except ValueError:
+            return
+        self.notify(user_id)
+
+    async def run_listener(self) -> None:
+        """Hold the worker's LISTEN connection, reconnecting with backoff when it drops."""
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(listen_dsn())
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                delay = 1.0
+                # Changes committed while disconnected produced no notification here.
+                for user_id in list(self._channels):
+                    self.notify(user_id)
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self._heartbeat_seconds)
+                    except TimeoutError:
+                        await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Shopping list LISTEN connection failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+def listen_dsn() -> str:
+    """asyncpg DSN for LISTEN; PgBouncer in transaction mode can't hold one, hence the override."""
+    url = make_url(settings.database_listen_url or settings.database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def load_snapshot(user_id: uuid.UUID) -> dict[str, Any]:
+    async with async_session() as db:
+        # The cursor is read first: the items are at least as new as it.
+        cursor = (
+            await db.execute(select(SyncCursor.cursor).where(SyncCursor.user_id == user_id))
+        ).scalar_one_or_none() or 0
+        items = (
+            await db.execute(select(ShoppingList.items).where(ShoppingList.user_id == user_id))
+        ).scalar_one_or_none() or []
+    return {"type": "snapshot", "cursor": cursor, "items": items}
+
+
+async def load_diff(user_id: uuid.UUID, since: int) -> dict[str, Any] | None:
+    """Items changed after ``since``; items gone from the list are reported as deleted."""
+    async with async_session() as db:
+        rows = (
+            await db.execute(
+                select(SyncChange.entity_id, SyncChange.deleted, func.max(SyncChange.cursor).over().label("latest"))
+                .where(
+                    SyncChange.user_id == user_id,
+                    SyncChange.collection == SHOPPING_LIST_ITEMS,
+                    SyncChange.cursor > since,
+                )
+            )
+        ).all()
+        if not rows:
+            return None
+        items = (
+            await db.execute(select(ShoppingList.items).where(ShoppingList.user_id == user_id))
+        ).scalar_one_or_none() or []
+
+    by_id = {str(item.get("id")): item for item in items}
+    return {
+        "type": "diff",
+        "cursor": rows[0].latest,
+        "upserted": [by_id[row.entity_id] for row in rows if not row.deleted and row.entity_id in by_id],
+        "deleted": [row.entity_id for row in rows if row.deleted or row.entity_id not in by_id],
+    }
+
+
+def _sse(event: dict[str, Any]) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+shopping_list_hub = ShoppingListHub(
+    settings.shopping_list_events_queue_size, settings.shopping_list_events_heartbeat_seconds
+)
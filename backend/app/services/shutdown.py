@@ -0,0 +1,132 @@
+"""Graceful shutdown for streaming responses.
+
+On SIGTERM (a deploy, or gunicorn replacing a worker) uvicorn stops accepting connections and waits
+for open responses to finish before the worker exits. Two kinds of stream would hold that up:
+
+- Event streams (``/shopping-list/events``, ``/jobs/{id}/events``) never end on their own. They are
+  closed at once, and their clients reconnect to a worker that is not shutting down.
+- Chat turns end, but can outlast the platform's kill timeout. Running turns get
+  ``shutdown_drain_seconds`` to finish; turns still running then are stopped, their staged writes
+  are rolled back and the client is asked to send the message again.
+
+New chat turns and event streams are refused with ``503`` while draining.
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class StreamInterrupted(Exception):
+    """The drain deadline passed before a guarded stream finished."""
+
+
+class ShutdownDrain:
+    def __init__(self, drain_seconds: float):
+        self._drain_seconds = drain_seconds
+        self._streams: set[asyncio.Task] = set()
+        self._callbacks: list[Callable[[], None]] = []
+        self._expired = False
+        self.draining = False
+
+    @property
+    def active_streams(self) -> int:
+        return len(self._streams)
+
+    def on_drain(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once draining starts, e.g. to close long-lived streams."""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def install_signal_handlers(self) -> None:
+        """Start draining on SIGTERM or SIGINT, then pass the signal on to the server's handler.
+
+        Called from the lifespan, after uvicorn has installed its own handlers.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                loop.call_soon_threadsafe(self.begin)
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    def begin(self) -> None:
+        if self.draining:
+            return
+        self.draining = True
+        logger.info(
+            "Shutting down: draining %d chat stream(s) for up to %.0fs", len(self._streams), self._drain_seconds
+        )
+        for callback in self._callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Shutdown callback failed")
+        asyncio.get_running_loop().call_later(self._drain_seconds, self._expire)
+
+    def _expire(self) -> None:
+        self._expired = True
+        for task in list(self._streams):
+            task.cancel()
+
+    def refuse_when_draining(self) -> None:
+        """Dependency for routes that open a stream: send new ones to another worker."""
+        if self.draining:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The server is restarting, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    async def guard(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Relay ``chunks`` until they end or the drain deadline passes.
+
+        The chunks are produced in a task of their own, so the deadline cancels the work behind
+        them (usually a model call) rather than the response relaying them. Raises
+        ``StreamInterrupted`` when the deadline cut the stream short.
+        """
+        if self._expired:
+            raise StreamInterrupted
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            async for chunk in chunks:
+                queue.put_nowait(chunk)
+
+        producer = asyncio.create_task(produce())
+        self._streams.add(producer)
+        producer.add_done_callback(self._streams.discard)
+        producer.add_done_callback(lambda _: queue.put_nowait(_END))
+        try:
+            while (chunk := await queue.get()) is not _END:
+                yield chunk
+            if producer.cancelled():
+                raise StreamInterrupted
+            producer.result()
+        finally:
+            if not producer.done():
+                # The client went away: stop the work behind the stream.
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+
+
+shutdown_drain = ShutdownDrain(settings.shutdown_drain_seconds)
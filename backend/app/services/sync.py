@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import and_, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.chat import ChatSession
+from app.models.ingredient import HouseholdIngredient
+from app.models.recipe import Recipe
+from app.models.shopping_list import ShoppingList
+from app.models.sync_change import SyncChange, SyncCursor
+from app.schemas.chat import ChatSessionOut, ChatSessionUpdate
+from app.schemas.ingredient import IngredientCreate, IngredientOut, IngredientUpdate
+from app.schemas.recipe import RecipeCreate, RecipeOut, RecipeUpdate
+from app.schemas.shopping_list import ShoppingListItem, ShoppingListItemUpdate
+from app.schemas.sync import SyncOperation
+from app.services.serialization import as_row
+
+logger = logging.getLogger(__name__)
+
+SHOPPING_LIST_ITEMS = "shopping_list_items"
+
+# collection -> (model, output schema, create schema, update schema); chat sessions can't be created offline
+ROW_COLLECTIONS: dict[str, tuple[Any, type[BaseModel], type[BaseModel] | None, type[BaseModel]]] = {
+    "recipes": (Recipe, RecipeOut, RecipeCreate, RecipeUpdate),
+    "ingredients": (HouseholdIngredient, IngredientOut, IngredientCreate, IngredientUpdate),
+    "chat_sessions": (ChatSession, ChatSessionOut, None, ChatSessionUpdate),
+}
+
+_PRUNE_TOMBSTONES_SQL = text(
+    """
+    WITH pruned AS (
+        DELETE FROM sync_changes
+        WHERE (user_id, collection, entity_id) IN (
+            SELECT user_id, collection, entity_id FROM sync_changes
+            WHERE deleted AND changed_at < now() - make_interval(days => :days)
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING user_id, cursor
+    ), floors AS (
+        UPDATE sync_cursors AS c SET pruned_through = GREATEST(c.pruned_through, p.through)
+        FROM (SELECT user_id, max(cursor) AS through FROM pruned GROUP BY user_id) AS p
+        WHERE c.user_id = p.user_id
+    )
+    SELECT count(*) FROM pruned
+    """
+)
+
+
+async def read_changes(db: AsyncSession, user_id: uuid.UUID, since: int, limit: int) -> dict[str, Any]:
+    """Changes after cursor ``since``, oldest first, as a ``SyncResponse``-shaped dict.
+
+    A page never splits one cursor, since a single shopping-list write stamps all its items with
+    the same cursor. The cursor state is read after the changes: a prune that removed tombstones
+    the client still needed then always shows up as a reset.
+    """
+    rows = await _change_page(db, user_id, since, limit)
+    state = (
+        await db.execute(select(SyncCursor.pruned_through).where(SyncCursor.user_id == user_id))
+    ).scalar_one_or_none()
+    reset = since > 0 and since < (state or 0)
+    if reset:
+        rows = await _change_page(db, user_id, 0, limit)
+
+    has_more = len(rows) > limit
+    if has_more:
+        boundary = rows[limit].cursor
+        page = [row for row in rows[:limit] if row.cursor < boundary]
+        if not page:
+            page = (await db.execute(_changes_query(user_id).where(SyncChange.cursor == boundary))).all()
+    else:
+        page = rows
+
+    changes = await _with_data(db, user_id, page)
+    cursor = page[-1].cursor if page else (0 if reset else since)
+    return {"cursor": cursor, "has_more": has_more, "reset": reset, "changes": changes}
+
+
+def _changes_query(user_id: uuid.UUID):
+    return (
+        select(SyncChange.collection, SyncChange.entity_id, SyncChange.cursor, SyncChange.deleted)
+        .where(SyncChange.user_id == user_id)
+        .order_by(SyncChange.cursor, SyncChange.collection, SyncChange.entity_id)
+    )
+
+
+async def _change_page(db: AsyncSession, user_id: uuid.UUID, since: int, limit: int) -> list:
+    query = _changes_query(user_id).where(SyncChange.cursor > since).limit(limit + 1)
+    if since == 0:
+        # A client starting from scratch has nothing to delete.
+        query = query.where(SyncChange.deleted.is_(False))
+    return list((await db.execute(query)).all())
+
+
+async def _with_data(db: AsyncSession, user_id: uuid.UUID, page: list) -> list[dict[str, Any]]:
+    wanted: dict[str, list[str]] = defaultdict(list)
+    for row in page:
+        if not row.deleted:
+            wanted[row.collection].append(row.entity_id)
+
+    found: dict[tuple[str, str], dict[str, Any]] = {}
+    for collection, ids in wanted.items():
+        if collection == SHOPPING_LIST_ITEMS:
+            items = (
+                await db.execute(select(ShoppingList.items).where(ShoppingList.user_id == user_id))
+            ).scalar_one_or_none() or []
+            for item in items:
+                found[(collection, str(item.get("id")))] = item
+            continue
+        model, schema, _, _ = ROW_COLLECTIONS[collection]
+        result = await db.execute(
+            select(model).where(model.user_id == user_id, model.id.in_([uuid.UUID(entity_id) for entity_id in ids]))
+        )
+        for obj in result.scalars():
+            found[(collection, str(obj.id))] = as_row(schema, obj)
+
+    changes = []
+    for row in page:
+        # Deleted after the change was read: send a tombstone now, its own change follows.
+        data = None if row.deleted else found.get((row.collection, row.entity_id))
+        changes.append(
+            {
+                "collection": row.collection,
+                "id": row.entity_id,
+                "cursor": row.cursor,
+                "deleted": data is None,
+                "data": data,
+            }
+        )
+    return changes
+
+
+async def apply_operations(
+    db: AsyncSession, user_id: uuid.UUID, operations: list[SyncOperation]
+) -> list[dict[str, Any]]:
+    """Apply queued offline edits in order; the caller commits them together.
+
+    An operation whose ``base_cursor`` is older than the server's latest change to that entity
+    is not applied (``conflict``): the server copy wins and reaches the client on its next sync.
+    Deleting something that is already gone counts as applied, so retries are harmless.
+    """
+    if not operations:
+        return []
+    ids: dict[str, set[str]] = defaultdict(set)
+    for operation in operations:
+        ids[operation.collection].add(str(operation.id))
+
+    cursors = {
+        (collection, entity_id): cursor
+        for collection, entity_id, cursor in (
+            await db.execute(
+                select(SyncChange.collection, SyncChange.entity_id, SyncChange.cursor).where(
+                    SyncChange.user_id == user_id,
+                    or_(*(and_(SyncChange.collection == c, SyncChange.entity_id.in_(e)) for c, e in ids.items())),
+                )
+            )
+        ).all()
+    }
+
+    # Looked up without the user filter so ids owned by someone else are refused, not re-created.
+    rows: dict[tuple[str, str], Any] = {}
+    for collection, entity_ids in ids.items():
+        if collection in ROW_COLLECTIONS:
+            model = ROW_COLLECTIONS[collection][0]
+            result = await db.execute(select(model).where(model.id.in_([uuid.UUID(i) for i in entity_ids])))
+            rows.update({(collection, str(obj.id)): obj for obj in result.scalars()})
+
+    shopping_list = None
+    if SHOPPING_LIST_ITEMS in ids:
+        shopping_list = (
+            await db.execute(select(ShoppingList).where(ShoppingList.user_id == user_id).with_for_update())
+        ).scalar_one_or_none()
+        if shopping_list is None:
+            shopping_list = ShoppingList(user_id=user_id, items=[])
+            db.add(shopping_list)
+    items = list(shopping_list.items) if shopping_list is not None else []
+
+    results = []
+    for operation in operations:
+        key = (operation.collection, str(operation.id))
+        status, detail = "applied", None
+        if operation.base_cursor is not None and cursors.get(key, 0) > operation.base_cursor:
+            status, detail = "conflict", "Changed on the server since base_cursor"
+        else:
+            try:
+                if operation.collection == SHOPPING_LIST_ITEMS:
+                    items = _apply_item_operation(items, operation)
+                else:
+                    await _apply_row_operation(db, user_id, rows, operation)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                status, detail = "rejected", f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            except ValueError as exc:
+                status, detail = "rejected", str(exc)
+        results.append({"collection": operation.collection, "id": operation.id, "status": status, "detail": detail})
+
+    if shopping_list is not None and items != shopping_list.items:
+        shopping_list.items = items
+    return results
+
+
+async def _apply_row_operation(
+    db: AsyncSession, user_id: uuid.UUID, rows: dict[tuple[str, str], Any], operation: SyncOperation
+) -> None:
+    key = (operation.collection, str(operation.id))
+    model, _, create_schema, update_schema = ROW_COLLECTIONS[operation.collection]
+    obj = rows.get(key)
+    if obj is not None and obj.user_id != user_id:
+        raise ValueError("Not found")
+
+    if operation.op == "delete":
+        if obj is not None:
+            await db.delete(obj)
+            del rows[key]
+        return
+
+    if obj is None:
+        if create_schema is None:
+            raise ValueError("Not found")
+        body = create_schema.model_validate(operation.data)
+        obj = model(id=operation.id, user_id=user_id, **body.model_dump())
+        db.add(obj)
+        rows[key] = obj
+        return
+
+    updates = update_schema.model_validate(operation.data).model_dump(exclude_unset=True)
+    for name, value in updates.items():
+        setattr(obj, name, value)
+
+
+def _apply_item_operation(items: list[dict[str, Any]], operation: SyncOperation) -> list[dict[str, Any]]:
+    item_id = str(operation.id)
+    if operation.op == "delete":
+        return [item for item in items if str(item.get("id")) != item_id]
+
+    index = next((i for i, item in enumerate(items) if str(item.get("id")) == item_id), None)
+    if index is None:
+        target = ShoppingListItem(id=operation.id, name="")
+    else:
+        target = ShoppingListItem.model_validate(items[index])
+    # Same clean-up as the shopping-list routes: blank strings are stored as null.
+    updates = ShoppingListItemUpdate.model_validate(operation.data).model_dump(exclude_unset=True)
+    for name, value in updates.items():
+        if isinstance(value, str):
+            value = value.strip() or None
+        setattr(target, name, value)
+    if not target.name or not target.name.strip():
+        raise ValueError("Item name cannot be empty")
+
+    item = target.model_dump(mode="json")
+    if index is None:
+        return [*items, item]
+    return [*items[:index], item, *items[index + 1:]]
+
+
+async def prune_tombstones(db: AsyncSession, older_than_days: int, batch_size: int) -> int:
+    """Drop one batch of old tombstones, raising each affected user's ``pruned_through``."""
+    return (await db.execute(_PRUNE_TOMBSTONES_SQL, {"days": older_than_days, "batch": batch_size})).scalar_one()
+
+
+async def run_periodic_tombstone_prune() -> None:
+    while True:
+        try:
+            async with async_session() as db:
+                while True:
+                    pruned = await prune_tombstones(db, settings.sync_tombstone_days, settings.sync_prune_batch_size)
+                    await db.commit()
+                    if pruned < settings.sync_prune_batch_size:
+                        break
+        except Exception:
+            logger.exception("Sync tombstone pruning failed")
+        await asyncio.sleep(settings.sync_prune_interval_seconds)
@@ -0,0 +1,83 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+BulkHandler = Callable[[list[dict[str, Any]]], Awaitable[list[str]]]
+
+
+@dataclass
+class _Batch:
+    calls: list[tuple[dict[str, Any], asyncio.Future | None]] = field(default_factory=list)
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class ToolBatcher(AsyncCallbackHandler):
+    """Coalesces an agent step's tool calls and keeps them off the shared session concurrently.
+
+    AgentExecutor starts all tool calls of a step at once with ``asyncio.gather``, but the turn's
+    tools share one ``AsyncSession``, which allows one operation at a time. Calls to the same
+    tool are collected into one batch and handed to its bulk handler, so e.g. eight
+    ``add_pantry_item`` calls become one handler invocation and one statement; different tools'
+    batches take turns on the session.
+
+    As a callback, the batcher reads the upcoming step's tool calls from the model's output, so
+    a batch starts as soon as its last call arrives; ``max_wait`` bounds the wait for calls that
+    never reach the tool (e.g. rejected arguments).
+    """
+
+    def __init__(self, max_wait: float):
+        self._max_wait = max_wait
+        self._lock = asyncio.Lock()
+        self._expected: Counter[str] = Counter()
+        self._open: dict[str, _Batch] = {}
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self._expected.clear()
+        for generations in response.generations:
+            for generation in generations:
+                for call in getattr(getattr(generation, "message", None), "tool_calls", None) or []:
+                    self._expected[call["name"]] += 1
+
+    async def run(self, name: str, args: dict[str, Any], bulk: BulkHandler) -> str:
+        """Run one call of tool ``name`` as part of the step's batch and return its result."""
+        batch = self._open.get(name)
+        if batch is not None:
+            future = asyncio.get_running_loop().create_future()
+            batch.calls.append((args, future))
+            if len(batch.calls) >= self._expected[name]:
+                batch.full.set()
+            return await future
+
+        # The first call leads the batch: it waits for the rest and runs the bulk handler.
+        batch = self._open[name] = _Batch(calls=[(args, None)])
+        try:
+            if self._expected[name] > 1:
+                try:
+                    await asyncio.wait_for(batch.full.wait(), self._max_wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            del self._open[name]
+            self._expected[name] = max(0, self._expected[name] - len(batch.calls))
+
+        followers = [future for _, future in batch.calls[1:]]
+        try:
+            async with self._lock:
+                results = await bulk([call_args for call_args, _ in batch.calls])
+        except BaseException as exc:
+            for future in followers:
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            raise
+        for future, result in zip(followers, results[1:]):
+            if not future.done():
+                future.set_result(result)
+        return results[0]
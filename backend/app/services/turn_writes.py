@@ -0,0 +1,58 @@
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+T = TypeVar("T")
+
+
+class TurnWrites:
+    """Unit of work for the writes an agent's tools make during one chat turn.
+
+    Tools stage writes here and nothing reaches the database until the turn completes. ``flush``
+    then replays them in the order they were made: each run of staged objects as one ORM flush
+    (the ORM batches each table's rows into multi-row INSERTs) and each deferred statement as it
+    was built. The chat router commits once, together with the assistant's reply.
+
+    Writing during the turn would fire the sync cursor and collection version triggers, whose
+    per-user rows would then stay locked across every model round trip until the commit. Autoflush
+    is off for the same reason, so a tool that reads what the turn has written combines its
+    query with ``staged``.
+
+    A turn is all-or-nothing. If the flush fails, the model errors or the client disconnects before
+    the turn completes, nothing is committed and the staged writes are dropped.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        db.autoflush = False
+        self._ops: list[list[Any] | Executable] = []
+
+    async def add(self, obj: Any) -> None:
+        if self._ops and isinstance(self._ops[-1], list):
+            self._ops[-1].append(obj)
+        else:
+            self._ops.append([obj])
+
+    def defer(self, statement: Executable) -> None:
+        """Run ``statement`` at flush, after the writes staged before it."""
+        self._ops.append(statement)
+
+    def staged(self, cls: type[T]) -> list[T]:
+        """Objects of ``cls`` added during the turn, in order."""
+        return [obj for op in self._ops if isinstance(op, list) for obj in op if isinstance(obj, cls)]
+
+    async def flush(self) -> None:
+        ops, self._ops = self._ops, []
+        for op in ops:
+            if isinstance(op, list):
+                self.db.add_all(op)
+                await self.db.flush()
+            else:
+                await self.db.execute(op)
+        # Persistent objects the tools changed in place, e.g. the shopping list's items.
+        await self.db.flush()
+
+    async def rollback(self) -> None:
+        self._ops = []
+        await self.db.rollback()
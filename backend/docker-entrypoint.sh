@@ -0,0 +1,8 @@
+#!/bin/sh
+# Migrate before serving: the backend refuses to start against a database behind the Alembic head.
+# Deploys that migrate in a separate release step set RUN_MIGRATIONS=false.
+set -e
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    alembic -c /databases/alembic.ini upgrade head
+fi
+exec "$@"
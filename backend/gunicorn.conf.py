@@ -0,0 +1,39 @@
+"""Gunicorn settings for the production image: uvicorn workers forked from a preloaded app.
+
+WEB_CONCURRENCY sets the worker count. On SIGTERM each worker drains its streams
+(``app/services/shutdown.py``) and is killed if it is still busy after ``graceful_timeout``.
+"""
+
+import glob
+import os
+import tempfile
+
+# Each worker writes its metric values here and /metrics merges them (app/services/metrics.py).
+# Set before the app is imported, which happens below when it is preloaded.
+_metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus-"))
+os.makedirs(_metrics_dir, exist_ok=True)
+for _stale in glob.glob(os.path.join(_metrics_dir, "*.db")):
+    os.remove(_stale)  # left by workers of a previous run
+
+from app.config import settings  # noqa: E402
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = settings.web_concurrency
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = int(settings.shutdown_drain_seconds) + 5
+keepalive = 5
+accesslog = "-"
+
+
+def when_ready(server):
+    # Imported once in the master, the AI stack is shared copy-on-write by every worker.
+    from app.services.ai_loader import preload_ai
+
+    preload_ai()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
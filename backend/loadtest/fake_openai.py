@@ -0,0 +1,178 @@
+"""OpenAI-compatible fake chat completions server for load tests.
+
+Streams tokens and tool calls with configurable latency so the backend can be driven at high
+concurrency without touching the real API. Point the backend at it with
+``OPENAI_BASE_URL=http://localhost:9100/v1``.
+
+    python -m loadtest.fake_openai --port 9100 --ttft-ms 400 --token-ms 15 --tokens 120
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+options = argparse.Namespace(ttft_ms=400, token_ms=15, tokens=120, tool_call_rate=0.3, seed=7)
+
+_WORDS = (
+    "Here is a simple plan for the week with pantry friendly dinners and a short shopping list "
+    "covering produce dairy grains and a few spices you may be missing"
+).split()
+
+_RECIPES_JSON = {
+    "recipes": [
+        {
+            "name": "Load Test Pasta",
+            "description": "Generated by the fake server",
+            "ingredients": [{"name": "pasta", "quantity": "200", "unit": "g"}],
+            "prep_time_minutes": 20,
+            "instructions": "Boil pasta.",
+            "source": "load test",
+            "favourite": False,
+            "category": None,
+        }
+    ]
+}
+_INGREDIENTS_JSON = {
+    "ingredients": [
+        {"name": "milk", "quantity": "1", "unit": "l", "category": "dairy"},
+        {"name": "eggs", "quantity": "12", "unit": "", "category": "dairy"},
+    ]
+}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    model = body.get("model", "fake")
+    rng = random.Random(f"{options.seed}:{len(messages)}:{_text(messages)[-200:]}")
+
+    tool_call = None
+    if body.get("tools") and messages and messages[-1].get("role") != "tool":
+        if rng.random() < options.tool_call_rate:
+            tool_call = {"name": "get_pantry", "arguments": "{}"}
+
+    if tool_call is None:
+        content = _reply_content(messages, rng)
+    else:
+        content = ""
+
+    prompt_tokens = len(_text(messages)) // 4
+    completion_tokens = len(content.split()) if content else 10
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        return StreamingResponse(
+            _stream(model, content, tool_call, usage if include_usage else None),
+            media_type="text/event-stream",
+        )
+
+    await asyncio.sleep((options.ttft_ms + completion_tokens * options.token_ms) / 1000)
+    message: dict[str, Any] = {"role": "assistant", "content": content or None}
+    if tool_call:
+        message["tool_calls"] = [{"id": _call_id(), "type": "function", "function": tool_call}]
+    return JSONResponse(
+        {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": "tool_calls" if tool_call else "stop"}
+            ],
+            "usage": usage,
+        }
+    )
+
+
+async def _stream(model: str, content: str, tool_call: dict[str, str] | None, usage: dict[str, int] | None):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    await asyncio.sleep(options.ttft_ms / 1000)
+    yield chunk({"role": "assistant", "content": ""})
+    if tool_call:
+        yield chunk(
+            {"tool_calls": [{"index": 0, "id": _call_id(), "type": "function", "function": tool_call}]}
+        )
+        yield chunk({}, "tool_calls")
+    else:
+        for word in content.split(" "):
+            await asyncio.sleep(options.token_ms / 1000)
+            yield chunk({"content": f"{word} "})
+        yield chunk({}, "stop")
+    if usage:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": usage,
+        }
+        yield f"data: {json.dumps(payload)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def _reply_content(messages: list[dict[str, Any]], rng: random.Random) -> str:
+    prompt = _text(messages)
+    if "Return JSON only" in prompt:
+        payload = _RECIPES_JSON if '"recipes"' in prompt else _INGREDIENTS_JSON
+        return json.dumps(payload)
+    return " ".join(rng.choice(_WORDS) for _ in range(options.tokens))
+
+
+def _text(messages: list[dict[str, Any]]) -> str:
+    parts: list[str] = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if isinstance(part, dict))
+    return "\n".join(parts)
+
+
+def _call_id() -> str:
+    return f"call_{uuid.uuid4().hex[:24]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=int, default=400, help="delay before the first streamed token")
+    parser.add_argument("--token-ms", type=int, default=15, help="delay between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=120, help="words per chat answer")
+    parser.add_argument("--tool-call-rate", type=float, default=0.3, help="chance a tools request calls get_pantry")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    vars(options).update({key: value for key, value in vars(args).items() if key not in ("host", "port")})
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Seed a Postgres database with a realistic load-test dataset.
+
+Creates ``loadtest-NNN`` users (all sharing one password) with recipes, pantry items, chat
+history and a shopping list, so list endpoints and history loads see production-like row counts.
+Run ``alembic upgrade head`` from ``databases/`` first.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m loadtest.seed --users 200
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert
+
+from app.database import async_session, engine
+from app.models import ChatMessage, ChatSession, HouseholdIngredient, Recipe, ShoppingList, User
+from app.services.auth import hash_password
+
+USERNAME_PREFIX = "loadtest-"
+PASSWORD = "loadtest-password"
+
+_INGREDIENTS = [
+    ("rice", "grains"), ("pasta", "grains"), ("flour", "baking"), ("milk", "dairy"), ("eggs", "dairy"),
+    ("butter", "dairy"), ("cheddar", "dairy"), ("chicken breast", "meat"), ("ground beef", "meat"),
+    ("salmon", "seafood"), ("onion", "produce"), ("garlic", "produce"), ("tomato", "produce"),
+    ("spinach", "produce"), ("carrot", "produce"), ("potato", "produce"), ("olive oil", "pantry"),
+    ("soy sauce", "pantry"), ("black beans", "pantry"), ("cumin", "spices"), ("paprika", "spices"),
+]
+_CATEGORIES = ["dinner", "breakfast", "lunch", "dessert", "snack"]
+
+
+def username(index: int) -> str:
+    return f"{USERNAME_PREFIX}{index:03d}"
+
+
+async def seed(users: int, recipes: int, pantry: int, sessions: int, messages: int, list_items: int) -> None:
+    rng = random.Random(42)
+    password_hash = hash_password(PASSWORD)  # bcrypt is slow; hash once and reuse
+    now = datetime.now(timezone.utc)
+
+    async with async_session() as db:
+        # Foreign keys cascade, so this also clears the previous run's recipes, chats and lists.
+        await db.execute(delete(User).where(User.username.like(f"{USERNAME_PREFIX}%")))
+
+        for index in range(users):
+            user_id = uuid.uuid4()
+            await db.execute(
+                insert(User).values(
+                    id=user_id,
+                    username=username(index),
+                    password_hash=password_hash,
+                    display_name=f"Load Tester {index}",
+                    dietary_preferences={"dietary": [], "notes": ""},
+                )
+            )
+            await db.execute(
+                insert(Recipe),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "name": f"Recipe {index}-{n}",
+                        "description": "Seeded recipe",
+                        "ingredients": [
+                            {"name": name, "quantity": str(rng.randint(1, 500)), "unit": "g"}
+                            for name, _ in rng.sample(_INGREDIENTS, 6)
+                        ],
+                        "prep_time_minutes": rng.randint(10, 90),
+                        "instructions": "Prep. Cook. Serve. " * 10,
+                        "source": "seed",
+                        "favourite": rng.random() < 0.2,
+                        "category": rng.choice(_CATEGORIES),
+                        "created_at": now - timedelta(minutes=n),
+                    }
+                    for n in range(recipes)
+                ],
+            )
+            await db.execute(
+                insert(HouseholdIngredient),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "name": name,
+                        "quantity": str(rng.randint(1, 5)),
+                        "unit": "",
+                        "category": category,
+                    }
+                    for name, category in (rng.choice(_INGREDIENTS) for _ in range(pantry))
+                ],
+            )
+            session_rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "title": f"Meal plan {n}",
+                    "created_at": now - timedelta(days=n),
+                    "updated_at": now - timedelta(days=n),
+                }
+                for n in range(sessions)
+            ]
+            if session_rows:
+                await db.execute(insert(ChatSession), session_rows)
+                await db.execute(
+                    insert(ChatMessage),
+                    [
+                        {
+                            "id": uuid.uuid4(),
+                            "session_id": row["id"],
+                            "role": "user" if m % 2 == 0 else "assistant",
+                            "content": ("What should I cook this week? " if m % 2 == 0 else "Try this plan. " * 40),
+                            "created_at": row["created_at"] + timedelta(seconds=m),
+                        }
+                        for row in session_rows
+                        for m in range(messages)
+                    ],
+                )
+            await db.execute(
+                insert(ShoppingList).values(
+                    id=uuid.uuid4(),
+                    user_id=user_id,
+                    items=[
+                        {
+                            "id": str(uuid.uuid4()),
+                            "name": f"{rng.choice(_INGREDIENTS)[0]} {n}",
+                            "quantity": "1",
+                            "unit": None,
+                            "category": None,
+                            "checked": False,
+                        }
+                        for n in range(list_items)
+                    ],
+                )
+            )
+        await db.commit()
+
+    await engine.dispose()
+    print(f"Seeded {users} users ({username(0)} .. {username(users - 1)}), password '{PASSWORD}'")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--recipes", type=int, default=50, help="recipes per user")
+    parser.add_argument("--pantry", type=int, default=40, help="pantry items per user")
+    parser.add_argument("--sessions", type=int, default=10, help="chat sessions per user")
+    parser.add_argument("--messages", type=int, default=20, help="messages per chat session")
+    parser.add_argument("--list-items", type=int, default=30, help="shopping list items per user")
+    args = parser.parse_args()
+    asyncio.run(seed(args.users, args.recipes, args.pantry, args.sessions, args.messages, args.list_items))
+
+
+if __name__ == "__main__":
+    main()
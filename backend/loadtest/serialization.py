@@ -0,0 +1,117 @@
+"""Serialization benchmark: validated ``response_model`` path vs the trusted orjson path.
+
+Serves the same payloads through two in-process FastAPI apps and reports requests per second
+and body size for a 1,000-item shopping list and a 5,000-recipe listing, with and without gzip.
+No database is needed; rows are plain objects shaped like the ORM models.
+
+    python -m loadtest.serialization --requests 20
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.schemas.recipe import RecipeOut
+from app.schemas.shopping_list import ShoppingListItem, ShoppingListOut
+from app.services.compression import CompressionMiddleware
+from app.services.serialization import as_rows, trusted_json
+
+
+def make_recipes(count: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            name=f"Recipe {index}",
+            description="A weeknight dinner that comes together in one pan.",
+            ingredients=[{"name": f"ingredient {n}", "quantity": "1", "unit": "cup"} for n in range(8)],
+            prep_time_minutes=30,
+            instructions="Chop everything. Cook until done. Season to taste. " * 6,
+            source="AI generated",
+            favourite=index % 5 == 0,
+            category="dinner",
+            created_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def make_shopping_list(count: int) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    items = [
+        ShoppingListItem(name=f"item {index}", quantity="2", unit="pcs", category="produce").model_dump(mode="json")
+        for index in range(count)
+    ]
+    return SimpleNamespace(id=uuid.uuid4(), items=items, created_at=now, updated_at=now)
+
+
+def build_apps(recipes: list[SimpleNamespace], shopping_list: SimpleNamespace) -> dict[str, FastAPI]:
+    validated = FastAPI()
+
+    @validated.get("/recipes", response_model=list[RecipeOut])
+    async def validated_recipes():
+        return recipes
+
+    @validated.get("/shopping-list", response_model=ShoppingListOut)
+    async def validated_shopping_list():
+        # The previous _to_out: every JSONB item through the model.
+        return ShoppingListOut(
+            id=shopping_list.id,
+            items=[ShoppingListItem.model_validate(item) for item in shopping_list.items],
+            created_at=shopping_list.created_at,
+            updated_at=shopping_list.updated_at,
+        )
+
+    trusted = FastAPI()
+
+    @trusted.get("/recipes", response_model=list[RecipeOut])
+    async def trusted_recipes():
+        return trusted_json(as_rows(RecipeOut, recipes))
+
+    @trusted.get("/shopping-list", response_model=ShoppingListOut)
+    async def trusted_shopping_list():
+        return trusted_json(vars(shopping_list))
+
+    trusted_gzip = FastAPI()
+    trusted_gzip.router = trusted.router
+    trusted_gzip.add_middleware(CompressionMiddleware, minimum_size=1024, level=6)
+    return {"validated": validated, "trusted": trusted, "trusted+gzip": trusted_gzip}
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+        response.raise_for_status()
+        size = len(response.content) if "content-encoding" not in response.headers else int(
+            response.headers["content-length"]
+        )
+        started = time.perf_counter()
+        for _ in range(requests):
+            (await client.get(path, headers={"Accept-Encoding": "gzip"})).raise_for_status()
+        return requests / (time.perf_counter() - started), size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    apps = build_apps(make_recipes(args.recipes), make_shopping_list(args.items))
+    print(f"{'payload':<28}{'path':<16}{'req/s':>10}{'bytes':>12}")
+    for path, label in (("/shopping-list", f"{args.items} list items"), ("/recipes", f"{args.recipes} recipes")):
+        for name, app in apps.items():
+            rate, size = await measure(app, path, args.requests)
+            print(f"{label:<28}{name:<16}{rate:>10.1f}{size:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
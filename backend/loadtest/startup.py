@@ -0,0 +1,122 @@
+"""Cold-start benchmark: import time, time until the port answers, and first-request latency.
+
+Each run boots a fresh ``uvicorn app.main:app`` process, polls ``/health`` until it answers and
+then times the first authenticated list read and the first chat turn (time to first token and to
+the end of the stream). Import cost of ``app.main`` and of the deferred AI stack is measured
+separately in fresh interpreters. Needs a migrated database; use ``LLM_PROVIDER=local`` or the
+fake OpenAI server so chat turns stay offline.
+
+    LLM_PROVIDER=local python -m loadtest.startup --runs 5 --username loadtest-000
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from loadtest.seed import PASSWORD
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def time_import(module: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_once(username: str | None, password: str, message: str) -> dict[str, float]:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    timings: dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60.0) as client:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            timings["ready"] = time.perf_counter() - started
+            if username is None:
+                return timings
+
+            token = client.post("/auth/login", json={"username": username, "password": password})
+            token.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {token.json()['access_token']}"
+
+            request_started = time.perf_counter()
+            client.get("/recipes").raise_for_status()
+            timings["first_list_read"] = time.perf_counter() - request_started
+
+            request_started = time.perf_counter()
+            with client.stream("POST", "/chat/send", json={"message": message}) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[6:])
+                    if "token" in data and "first_chat_token" not in timings:
+                        timings["first_chat_token"] = time.perf_counter() - request_started
+                    if "error" in data:
+                        raise RuntimeError(data["error"])
+            timings["first_chat_turn"] = time.perf_counter() - request_started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return timings
+
+
+def report(name: str, values: list[float]) -> None:
+    if values:
+        print(
+            f"{name:<22}{1000 * statistics.median(values):>10.0f}{1000 * min(values):>10.0f}"
+            f"{1000 * max(values):>10.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--username", default=None, help="seeded user for the first-request timings")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--message", default="What can I make with rice?")
+    args = parser.parse_args()
+
+    results: dict[str, list[float]] = {}
+    for _ in range(args.runs):
+        results.setdefault("import app.main", []).append(time_import("app.main"))
+        results.setdefault("import app.services.ai", []).append(time_import("app.services.ai"))
+        for name, value in boot_once(args.username, args.password, args.message).items():
+            results.setdefault(name, []).append(value)
+
+    print(f"\n{args.runs} cold starts")
+    print(f"{'':<22}{'median ms':>10}{'min ms':>10}{'max ms':>10}")
+    for name, values in results.items():
+        report(name, values)
+
+
+if __name__ == "__main__":
+    main()
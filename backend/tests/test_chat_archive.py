@@ -0,0 +1,44 @@
+import unittest
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from app.services.chat_archive import add_months, pack_messages, partition_ddl, unpack_messages
+
+
+class ArchivePayloadTests(unittest.TestCase):
+    def test_round_trips_messages_in_order(self):
+        session_id = uuid.uuid4()
+        messages = [
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                role=role,
+                content=content * 50,
+                created_at=datetime(2026, 1, 2, 3, 4, second, tzinfo=timezone.utc),
+            )
+            for second, (role, content) in enumerate([("user", "What can I cook? "), ("assistant", "Try rice. ")])
+        ]
+
+        payload = pack_messages(messages)
+        rows = unpack_messages(session_id, payload)
+
+        self.assertLess(len(payload), sum(len(m.content) for m in messages))
+        self.assertEqual(
+            [(row["id"], row["role"], row["content"], row["created_at"]) for row in rows],
+            [(m.id, m.role, m.content, m.created_at) for m in messages],
+        )
+        self.assertTrue(all(row["session_id"] == session_id for row in rows))
+
+
+class PartitionTests(unittest.TestCase):
+    def test_monthly_ranges_cross_year_boundaries(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(
+            partition_ddl(date(2026, 12, 1)),
+            "CREATE TABLE IF NOT EXISTS chat_messages_y2026m12 PARTITION OF chat_messages "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.routers import chat
+from app.schemas.chat import ChatSendRequest
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def close(self):
+        self.calls.append("close")
+
+
+class FakeAI:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def db_messages_to_langchain(self, messages):
+        return []
+
+    def _build_user_context(self, display_name, dietary_preferences):
+        return ""
+
+    def stream_agent_response(self, db, user_id, chat_history, user_input, user_context="", kitchen_snapshot=""):
+        return self.stream(db)
+
+
+class ChatStreamCleanupTests(unittest.IsolatedAsyncioTestCase):
+    async def open_stream(self, stream):
+        db = FakeSession()
+        user = SimpleNamespace(id=uuid.uuid4(), display_name="Sam", dietary_preferences=None)
+
+        async def load_ai():
+            return FakeAI(stream)
+
+        async def no_snapshot(user_id):
+            return ""
+
+        with patch.object(chat, "load_ai", load_ai), patch.object(chat, "load_kitchen_snapshot", no_snapshot):
+            response = await chat.send_message(ChatSendRequest(message="hi"), user, db, {})
+        # The user's message is committed before the stream starts.
+        self.assertEqual(db.calls, ["commit"])
+        return db, response.body_iterator
+
+    async def test_completed_turn_commits_then_releases_the_connection(self):
+        async def stream(db):
+            yield 'data: {"token": "Hello"}\n\n'
+            yield 'data: {"done": true}\n\n'
+
+        db, body = await self.open_stream(stream)
+        chunks = [chunk async for chunk in body]
+
+        self.assertIn("session_id", json.loads(chunks[-1][6:]))
+        self.assertEqual(db.calls, ["commit", "commit", "rollback", "close"])
+
+    async def test_client_disconnect_rolls_back_the_turn(self):
+        cancelled = asyncio.Event()
+
+        async def stream(db):
+            yield 'data: {"token": "Hello"}\n\n'
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        db, body = await self.open_stream(stream)
+        await anext(body)
+        await body.aclose()
+
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(db.calls, ["commit", "rollback", "close"])
+
+    async def test_model_error_rolls_back_the_turn(self):
+        async def stream(db):
+            yield 'data: {"token": "Hello"}\n\n'
+            raise RuntimeError("provider failed")
+
+        db, body = await self.open_stream(stream)
+        with self.assertRaises(RuntimeError):
+            async for _ in body:
+                pass
+
+        self.assertEqual(db.calls, ["commit", "rollback", "close"])
+
+
+if __name__ == "__main__":
+    unittest.main()
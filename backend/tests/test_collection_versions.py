@@ -0,0 +1,62 @@
+import unittest
+
+from sqlalchemy import delete, insert, select, update
+
+from app.models.collection_version import CollectionVersion
+from app.models.ingredient import HouseholdIngredient
+from app.models.sync_change import SyncCursor
+from postgres_case import PostgresTestCase
+
+
+class CollectionVersionTriggerTests(PostgresTestCase):
+    async def version(self, user_id) -> int:
+        return await self.db.scalar(
+            select(CollectionVersion.version).where(
+                CollectionVersion.user_id == user_id, CollectionVersion.collection == "ingredients"
+            )
+        ) or 0
+
+    async def add_pantry(self, user_id, *names):
+        # One multi-row INSERT, not an executemany.
+        await self.db.execute(
+            insert(HouseholdIngredient).values([{"user_id": user_id, "name": name} for name in names])
+        )
+
+    async def test_multi_row_statements_bump_once(self):
+        user_id = await self.create_user()
+
+        await self.add_pantry(user_id, "milk", "eggs", "flour")
+        self.assertEqual(await self.version(user_id), 1)
+
+        await self.db.execute(
+            update(HouseholdIngredient).where(HouseholdIngredient.user_id == user_id).values(category="pantry")
+        )
+        self.assertEqual(await self.version(user_id), 2)
+
+        await self.db.execute(delete(HouseholdIngredient).where(HouseholdIngredient.user_id == user_id))
+        self.assertEqual(await self.version(user_id), 3)
+
+        # The row-level sync triggers still stamp every row.
+        cursor = await self.db.scalar(select(SyncCursor.cursor).where(SyncCursor.user_id == user_id))
+        self.assertEqual(cursor, 9)
+
+    async def test_statement_over_two_users_bumps_each(self):
+        first, second = await self.create_user(), await self.create_user()
+        await self.add_pantry(first, "milk", "eggs")
+        await self.add_pantry(second, "milk")
+
+        await self.db.execute(update(HouseholdIngredient).where(HouseholdIngredient.name == "milk").values(unit="l"))
+
+        self.assertEqual((await self.version(first), await self.version(second)), (2, 2))
+
+    async def test_statement_touching_no_rows_leaves_the_version(self):
+        user_id = await self.create_user()
+        await self.add_pantry(user_id, "milk")
+
+        await self.db.execute(delete(HouseholdIngredient).where(HouseholdIngredient.name == "nothing"))
+
+        self.assertEqual(await self.version(user_id), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from app.config import settings
+from app.database import (
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    check_schema_revision,
+    engine_options,
+    expected_schema_revision,
+)
+
+
+class EngineOptionsTests(unittest.TestCase):
+    def test_pool_settings_come_from_config(self):
+        options = engine_options()
+
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+        self.assertEqual(options["pool_size"], settings.db_pool_size)
+        self.assertEqual(options["connect_args"]["prepared_statement_cache_size"], settings.db_statement_cache_size)
+
+    def test_pgbouncer_mode_disables_statement_caches(self):
+        original = settings.db_pgbouncer
+        settings.db_pgbouncer = True
+        try:
+            options = engine_options()
+        finally:
+            settings.db_pgbouncer = original
+
+        self.assertIs(options["poolclass"], InstrumentedNullPool)
+        self.assertEqual(options["connect_args"]["statement_cache_size"], 0)
+        self.assertEqual(options["connect_args"]["prepared_statement_cache_size"], 0)
+        name = options["connect_args"]["prepared_statement_name_func"]
+        self.assertNotEqual(name(), name())
+
+
+class SchemaRevisionTests(unittest.IsolatedAsyncioTestCase):
+    def test_missing_scripts_have_no_head(self):
+        original = settings.alembic_script_location
+        settings.alembic_script_location = "/nonexistent/alembic"
+        try:
+            self.assertIsNone(expected_schema_revision())
+        finally:
+            settings.alembic_script_location = original
+
+    async def test_missing_scripts_fail_startup_outside_debug(self):
+        original = settings.alembic_script_location, settings.debug
+        settings.alembic_script_location, settings.debug = "/nonexistent/alembic", False
+        try:
+            with self.assertRaisesRegex(RuntimeError, "Alembic scripts not found"):
+                await check_schema_revision()
+        finally:
+            settings.alembic_script_location, settings.debug = original
+
+    def test_repo_scripts_have_a_single_head(self):
+        self.assertIsNotNone(expected_schema_revision())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.services.auth import get_current_user
+from app.services.compression import CompressionMiddleware
+from app.services.etags import conditional_get, etag_matches, make_etag
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class FakeSession:
+    def __init__(self):
+        self.version = 3
+        self.info = {}
+
+    async def execute(self, statement):
+        return FakeResult(self.version)
+
+
+class EtagHelperTests(unittest.TestCase):
+    def test_etag_depends_on_version_user_and_normalized_query(self):
+        user_id = uuid.uuid4()
+        etag = make_etag("recipes", user_id, 4, "sort_by=name&order=asc")
+
+        self.assertEqual(etag, make_etag("recipes", user_id, 4, "order=asc&sort_by=name"))
+        self.assertNotEqual(etag, make_etag("recipes", user_id, 5, "order=asc&sort_by=name"))
+        self.assertNotEqual(etag, make_etag("recipes", uuid.uuid4(), 4, "order=asc&sort_by=name"))
+        self.assertTrue(etag.startswith('"recipes.4.'))
+
+    def test_if_none_match_uses_weak_comparison(self):
+        self.assertTrue(etag_matches('"a.1.x", W/"b.2.y"', '"b.2.y"'))
+        self.assertTrue(etag_matches("*", '"b.2.y"'))
+        self.assertFalse(etag_matches('"b.1.y"', '"b.2.y"'))
+        self.assertFalse(etag_matches(None, '"b.2.y"'))
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeSession()
+        self.loads = 0
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=10, level=6)
+
+        @app.get("/items", dependencies=[Depends(conditional_get("items", get_db))])
+        async def list_items():
+            self.loads += 1
+            return [{"name": "rice"}]
+
+        @app.get("/tiny", dependencies=[Depends(conditional_get("tiny", get_db))])
+        async def tiny():
+            return []
+
+        async def fake_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = fake_db
+        user = SimpleNamespace(id=uuid.uuid4())
+        app.dependency_overrides[get_current_user] = lambda: user
+        self.client = TestClient(app)
+
+    def test_matching_etag_returns_304_without_running_the_route(self):
+        first = self.client.get("/items")
+        etag = first.headers["etag"]
+
+        second = self.client.get("/items", headers={"If-None-Match": etag})
+        self.db.version = 4
+        third = self.client.get("/items", headers={"If-None-Match": etag})
+
+        self.assertEqual((first.status_code, second.status_code, third.status_code), (200, 304, 200))
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["etag"], etag)
+        self.assertEqual(first.headers["cache-control"], "private, no-cache")
+        self.assertEqual(self.loads, 2)
+
+    def test_gzipped_responses_carry_a_weak_etag(self):
+        plain = self.client.get("/items", headers={"Accept-Encoding": "identity"})
+        gzipped = self.client.get("/items", headers={"Accept-Encoding": "gzip"})
+        revalidated = self.client.get(
+            "/items", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]}
+        )
+
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(gzipped.headers["content-encoding"], "gzip")
+        self.assertEqual(gzipped.headers["etag"], f"W/{plain.headers['etag']}")
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["etag"], gzipped.headers["etag"])
+
+    def test_bodies_too_small_to_compress_keep_a_strong_etag(self):
+        first = self.client.get("/tiny", headers={"Accept-Encoding": "gzip"})
+        revalidated = self.client.get(
+            "/tiny", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+        )
+
+        self.assertNotIn("content-encoding", first.headers)
+        self.assertFalse(first.headers["etag"].startswith("W/"))
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["etag"], first.headers["etag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import io
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.services import ai
+from app.services.llm_scheduler import LLMCapacityError
+from app.services.metrics import LLM_TILE_FAILURES
+
+from app.services.image_tiles import (
+    merge_ingredient_results,
+    merge_recipe_results,
+    plan_tiles,
+    split_image,
+)
+
+
+class ImageTilesTests(unittest.TestCase):
+    def test_plan_tiles_covers_tall_receipt_with_overlap(self):
+        boxes = plan_tiles(1000, 5000, max_side=1536, overlap=0.15, max_tiles=8)
+
+        self.assertGreater(len(boxes), 1)
+        self.assertEqual(boxes[0][1], 0)
+        self.assertEqual(boxes[-1][3], 5000)
+        for (_, _, _, prev_bottom), (_, top, _, _) in zip(boxes, boxes[1:]):
+            self.assertLess(top, prev_bottom)
+
+    def test_plan_tiles_respects_max_tiles(self):
+        boxes = plan_tiles(800, 20000, max_side=1536, overlap=0.15, max_tiles=6)
+        self.assertLessEqual(len(boxes), 6)
+        self.assertEqual(boxes[-1][3], 20000)
+
+    def test_split_image_leaves_small_photos_untouched(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 300), "white").save(buffer, format="PNG")
+
+        tiles = split_image(buffer.getvalue(), "image/png", 1536, 0.15, 8, 2.0)
+
+        self.assertEqual(tiles, [(buffer.getvalue(), "image/png")])
+
+    def test_split_image_tiles_tall_photo(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (600, 3000), "white").save(buffer, format="JPEG")
+
+        tiles = split_image(buffer.getvalue(), "image/jpeg", 1536, 0.15, 8, 2.0)
+
+        self.assertGreater(len(tiles), 1)
+        self.assertTrue(all(mime == "image/jpeg" for _, mime in tiles))
+
+    def test_merge_ingredients_dedupes_by_normalized_name(self):
+        merged = merge_ingredient_results(
+            [
+                [{"name": "Tomatoes", "quantity": "", "unit": ""}, {"name": "Milk"}],
+                [{"name": "tomato", "quantity": "3", "unit": "each"}, {"name": "Bread"}],
+            ]
+        )
+
+        self.assertEqual([item["name"] for item in merged], ["Tomatoes", "Milk", "Bread"])
+        self.assertEqual(merged[0]["quantity"], "3")
+
+    def test_merge_recipes_combines_split_recipe(self):
+        merged = merge_recipe_results(
+            [
+                [{"name": "Pancakes", "ingredients": [{"name": "flour"}], "instructions": "Mix"}],
+                [{"name": "pancakes", "ingredients": [{"name": "eggs"}], "instructions": "Mix and fry"}],
+            ]
+        )
+
+        self.assertEqual(len(merged), 1)
+        self.assertEqual([i["name"] for i in merged[0]["ingredients"]], ["flour", "eggs"])
+        self.assertEqual(merged[0]["instructions"], "Mix and fry")
+
+    def test_merge_recipes_matches_titles_by_case_and_spacing_only(self):
+        merged = merge_recipe_results(
+            [
+                [{"name": "Tomato  Soup"}, {"name": "Egg Salad"}],
+                [{"name": "tomato soup"}, {"name": "Eggs Salad"}],
+            ]
+        )
+
+        self.assertEqual([recipe["name"] for recipe in merged], ["Tomato  Soup", "Egg Salad", "Eggs Salad"])
+
+    def test_tile_overlap_must_leave_a_stride(self):
+        self.assertEqual(Settings(photo_tile_overlap=0).photo_tile_overlap, 0)
+        for overlap in (1, 1.5, -0.1):
+            with self.assertRaises(ValidationError):
+                Settings(photo_tile_overlap=overlap)
+
+
+class TileFailureTests(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_tiles_are_logged_and_counted(self):
+        async def extract(llm, system_prompt, request_context, tile_bytes, tile_mime, key, config):
+            if tile_bytes == b"bottom":
+                raise TimeoutError("tile timed out")
+            return [{"name": "eggs"}]
+
+        tiles = [(b"top", "image/png"), (b"bottom", "image/png")]
+        failures = LLM_TILE_FAILURES.labels(route="ingredient_photo")
+        before = failures._value.get()
+        with patch.object(ai, "split_image", return_value=tiles), patch.object(ai, "_extract_from_image", extract):
+            with self.assertLogs(ai.logger, "WARNING") as logs:
+                results = await ai._extract_from_image_tiles(
+                    None, "prompt", "", b"photo", "image/png", "ingredients", {"metadata": {"llm_route": "ingredient_photo"}}
+                )
+
+        self.assertEqual(results, [[{"name": "eggs"}]])
+        self.assertEqual(failures._value.get() - before, 1)
+        self.assertIn("Tile 2 of 2 failed", logs.output[0])
+
+    async def test_capacity_errors_fail_the_scan_and_stop_other_tiles(self):
+        cancelled = []
+
+        async def extract(llm, system_prompt, request_context, tile_bytes, tile_mime, key, config):
+            if tile_bytes == b"bottom":
+                raise LLMCapacityError("queue full", status_code=503, retry_after=5)
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(tile_bytes)
+                raise
+            return [{"name": "eggs"}]
+
+        tiles = [(b"top", "image/png"), (b"bottom", "image/png")]
+        with patch.object(ai, "split_image", return_value=tiles), patch.object(ai, "_extract_from_image", extract):
+            with self.assertRaises(LLMCapacityError):
+                await ai._extract_from_image_tiles(
+                    None, "prompt", "", b"photo", "image/png", "ingredients", {"metadata": {"llm_route": "ingredient_photo"}}
+                )
+            await asyncio.sleep(0)
+
+        self.assertEqual(cancelled, [b"top"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.database import get_db
+from app.routers import ingredients
+from app.services import jobs
+from app.services.auth import get_current_user
+from app.services.jobs import ClaimedJob, JobFailed, JobWaiters, JobWorker, claim_statement
+from app.services.llm_scheduler import LLMCapacityError
+from app.services.quotas import enforce_ai_quota
+
+
+def claimed(kind="test_kind", attempts=1):
+    return ClaimedJob(uuid.uuid4(), uuid.uuid4(), kind, {}, attempts)
+
+
+class ClaimStatementTests(unittest.TestCase):
+    def test_skips_rows_locked_by_other_workers(self):
+        sql = str(claim_statement(4, 120, 3).compile(dialect=postgresql.dialect()))
+
+        self.assertIn("FOR UPDATE SKIP LOCKED", sql)
+        self.assertIn("RETURNING", sql)
+
+
+class SubmitJobTests(unittest.TestCase):
+    def test_scan_accepted_response_keeps_the_rate_limit_headers(self):
+        job_id = uuid.uuid4()
+        quota_headers = {"X-RateLimit-Limit": "1000", "X-RateLimit-Remaining": "750"}
+
+        class FakeSession:
+            async def commit(self):
+                pass
+
+        async def fake_db():
+            yield FakeSession()
+
+        async def enqueue_job(db, user_id, kind, payload, **kwargs):
+            return job_id
+
+        async def get_job(db, user_id, queued_id):
+            return {"id": str(queued_id), "status": "queued"}
+
+        app = FastAPI()
+        app.include_router(ingredients.router)
+        app.dependency_overrides[get_db] = fake_db
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=uuid.uuid4())
+        app.dependency_overrides[enforce_ai_quota] = lambda: quota_headers
+
+        with (
+            patch.object(jobs, "enqueue_job", enqueue_job),
+            patch.object(jobs, "get_job", get_job),
+            patch.object(jobs.job_worker, "wake"),
+        ):
+            response = TestClient(app).post(
+                "/ingredients/scan-photo", files={"photo": ("shelf.jpg", b"jpeg", "image/jpeg")}
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers["location"], f"/jobs/{job_id}")
+        self.assertEqual(response.headers["x-ratelimit-limit"], "1000")
+        self.assertEqual(response.headers["x-ratelimit-remaining"], "750")
+
+
+class JobWaitersTests(unittest.IsolatedAsyncioTestCase):
+    async def test_notify_wakes_waiters_before_the_timeout(self):
+        waiters = JobWaiters()
+        job_id = uuid.uuid4()
+        waiting = asyncio.create_task(waiters.wait(job_id, timeout=5))
+        await asyncio.sleep(0)
+
+        waiters.notify(job_id)
+
+        await asyncio.wait_for(waiting, timeout=1)
+        self.assertEqual(waiters._events, {})
+
+
+class JobWorkerExecuteTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.updates = []
+
+        async def record_update(job, **values):
+            self.updates.append(values)
+
+        patcher = patch.object(JobWorker, "_update", staticmethod(record_update))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.worker = JobWorker(concurrency=1, poll_seconds=1, lease_seconds=60, max_attempts=3)
+
+    async def run_handler(self, handler, job=None):
+        with patch.dict(jobs.JOB_HANDLERS, {"test_kind": handler}):
+            await self.worker._execute(job or claimed())
+        return self.updates[-1]
+
+    async def test_success_stores_the_result(self):
+        async def handler(job):
+            return {"recipes": []}
+
+        update = await self.run_handler(handler)
+
+        self.assertEqual(update, {"status": "succeeded", "result": {"recipes": []}})
+
+    async def test_job_failed_is_reported_to_the_user(self):
+        async def handler(job):
+            raise JobFailed("Uploaded image is missing")
+
+        update = await self.run_handler(handler)
+
+        self.assertEqual(update, {"status": "failed", "error": "Uploaded image is missing"})
+
+    async def test_capacity_errors_are_retried_until_attempts_run_out(self):
+        async def handler(job):
+            raise LLMCapacityError("busy", status_code=503, retry_after=5)
+
+        update = await self.run_handler(handler, claimed(attempts=1))
+        self.assertEqual(update["status"], "queued")
+        self.assertIn("run_after", update)
+
+        update = await self.run_handler(handler, claimed(attempts=3))
+        self.assertEqual(update["status"], "failed")
+
+    async def test_unexpected_errors_hide_the_details(self):
+        async def handler(job):
+            raise RuntimeError("connection string leaked")
+
+        with self.assertLogs(jobs.logger, "ERROR"):
+            update = await self.run_handler(handler)
+
+        self.assertEqual(update, {"status": "failed", "error": "The job failed unexpectedly"})
+
+    async def test_shutdown_requeues_without_counting_the_attempt(self):
+        started = asyncio.Event()
+
+        async def handler(job):
+            started.set()
+            await asyncio.Event().wait()
+
+        with patch.dict(jobs.JOB_HANDLERS, {"test_kind": handler}):
+            task = asyncio.create_task(self.worker._execute(claimed(attempts=2)))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertEqual(self.updates, [{"status": "queued", "attempts": 1, "locked_until": None}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services.ai import SYSTEM_PROMPT, agent_prompt
+from app.services.kitchen_snapshot import SNAPSHOT_HEADER, format_snapshot
+
+
+def row(name, quantity=None, unit=None, category=None):
+    return SimpleNamespace(name=name, quantity=quantity, unit=unit, category=category)
+
+
+class FormatSnapshotTests(unittest.TestCase):
+    def test_groups_pantry_by_category_and_lists_unchecked_shopping_items(self):
+        snapshot = format_snapshot(
+            [row("milk", "1", "l", "dairy"), row("onion", "2", None, "produce"), row("salt")],
+            3,
+            [{"name": "eggs", "quantity": "12"}, {"name": "bread", "checked": True}],
+            token_budget=200,
+        )
+
+        self.assertEqual(
+            snapshot.splitlines(),
+            [
+                SNAPSHOT_HEADER,
+                "Pantry (3 items):",
+                "- dairy: milk 1 l",
+                "- produce: onion 2",
+                "- other: salt",
+                "Shopping list (1 to buy): eggs 12",
+            ],
+        )
+
+    def test_stays_within_budget_and_counts_what_was_left_out(self):
+        pantry = [row(f"ingredient number {index}", "1", "kg", "pantry") for index in range(300)]
+        shopping = [{"name": f"item {index}"} for index in range(100)]
+
+        snapshot = format_snapshot(pantry, 1200, shopping, token_budget=150)
+
+        self.assertLessEqual(len(snapshot), 150 * 4 + 100)
+        self.assertRegex(snapshot, r"\(\+\d+ more not shown\)")
+        self.assertIn("(100 to buy)", snapshot)
+        self.assertRegex(snapshot, r"\(\+\d+ more\)$")
+
+    def test_empty_kitchen(self):
+        snapshot = format_snapshot([], 0, [], token_budget=100)
+
+        self.assertEqual(snapshot.splitlines()[1:], ["Pantry: empty.", "Shopping list: nothing to buy."])
+
+
+class AgentPromptTests(unittest.TestCase):
+    def test_snapshot_follows_the_cacheable_history(self):
+        history = [HumanMessage(content="What's for dinner?"), AIMessage(content="Pasta.")]
+
+        messages = agent_prompt("User's name: Sam", f"{SNAPSHOT_HEADER}\nPantry: empty.").format_messages(
+            chat_history=history, input="And tomorrow?", agent_scratchpad=[]
+        )
+
+        self.assertEqual(
+            [message.content for message in messages],
+            [
+                SYSTEM_PROMPT,
+                "User's name: Sam",
+                "What's for dinner?",
+                "Pasta.",
+                f"{SNAPSHOT_HEADER}\nPantry: empty.",
+                "And tomorrow?",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
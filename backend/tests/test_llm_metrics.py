@@ -0,0 +1,53 @@
+import unittest
+
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+from app.services.llm_metrics import track_operation
+from app.services.llm_providers import LocalChatModel
+from app.services.metrics import AI_TOOL_SECONDS
+
+
+class OperationMetricsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_rolls_up_tool_calls_tokens_and_first_token(self):
+        @tool
+        async def get_pantry() -> str:
+            """Get pantry items."""
+            return "- rice"
+
+        model = LocalChatModel(
+            route="chat_agent",
+            replies=[{"tool_calls": [{"name": "get_pantry", "args": {}}]}, {"content": "You have rice."}],
+        )
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "test"),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        executor = AgentExecutor(agent=create_openai_tools_agent(model, [get_pantry], prompt), tools=[get_pantry])
+        tool_histogram = AI_TOOL_SECONDS.labels(tool="get_pantry", status="ok")
+        before = tool_histogram._sum.get()
+
+        async with track_operation("chat_agent") as turn:
+            async for _ in executor.astream_events(
+                {"input": "what do I have?"}, config={"callbacks": [turn]}, version="v2"
+            ):
+                pass
+
+        self.assertEqual(turn.status, "ok")
+        self.assertEqual(turn.tool_calls, 1)
+        self.assertGreater(turn.total_tokens, 0)
+        self.assertIsNotNone(turn.first_token)
+        self.assertGreater(tool_histogram._sum.get(), before)
+
+    async def test_marks_failed_operations(self):
+        with self.assertRaises(ValueError):
+            async with track_operation("transcript_extraction") as operation:
+                raise ValueError("bad json")
+
+        self.assertEqual(operation.status, "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
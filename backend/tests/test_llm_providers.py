@@ -0,0 +1,89 @@
+import unittest
+
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+from app.config import settings
+from app.services.llm_providers import (
+    ROUTE_INGREDIENT_PHOTO,
+    LocalChatModel,
+    estimate_cost,
+    get_chat_model,
+    route_config,
+)
+
+
+class LocalChatModelTests(unittest.IsolatedAsyncioTestCase):
+    async def test_replays_tool_call_then_streams_answer(self):
+        calls: list[str] = []
+
+        @tool
+        async def get_pantry(category: str = "") -> str:
+            """Get pantry items."""
+            calls.append(category)
+            return "- rice"
+
+        model = LocalChatModel(
+            route="chat_agent",
+            replies=[
+                {"tool_calls": [{"name": "get_pantry", "args": {"category": "grains"}}]},
+                {"content": "You have rice."},
+            ],
+        )
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "test"),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        executor = AgentExecutor(agent=create_openai_tools_agent(model, [get_pantry], prompt), tools=[get_pantry])
+
+        tokens: list[str] = []
+        async for event in executor.astream_events({"input": "what do I have?"}, version="v2"):
+            if event["event"] == "on_chat_model_stream" and event["data"]["chunk"].content:
+                tokens.append(event["data"]["chunk"].content)
+
+        self.assertEqual(calls, ["grains"])
+        self.assertEqual("".join(tokens), "You have rice.")
+
+    async def test_reports_usage_and_echoes_without_script(self):
+        model = LocalChatModel(route="chat_agent")
+
+        reply = await model.ainvoke("hello there")
+
+        self.assertEqual(reply.content, "You said: hello there")
+        self.assertGreater(reply.usage_metadata["total_tokens"], 0)
+
+
+
+class RoutingTableTests(unittest.TestCase):
+    def test_extraction_routes_use_small_model_with_large_fallback(self):
+        route = route_config(ROUTE_INGREDIENT_PHOTO)
+        self.assertEqual((route.primary, route.fallback), ("gpt-4o-mini", "gpt-4o"))
+
+        original = settings.openai_api_key
+        settings.openai_api_key = "test-key"
+        try:
+            model = get_chat_model(ROUTE_INGREDIENT_PHOTO)
+        finally:
+            settings.openai_api_key = original
+        self.assertEqual(model.runnable.model_name, "gpt-4o-mini")
+        self.assertEqual(model.fallbacks[0].model_name, "gpt-4o")
+        self.assertEqual(model.runnable.max_retries, 0)
+
+    def test_routes_can_be_overridden_from_settings(self):
+        original = settings.llm_routes
+        settings.llm_routes = {ROUTE_INGREDIENT_PHOTO: {"primary": "gpt-4o", "timeout_seconds": 5}}
+        try:
+            route = route_config(ROUTE_INGREDIENT_PHOTO)
+        finally:
+            settings.llm_routes = original
+        self.assertEqual((route.primary, route.fallback, route.timeout_seconds), ("gpt-4o", None, 5))
+
+    def test_estimate_cost(self):
+        self.assertAlmostEqual(estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000), 0.75)
+        self.assertEqual(estimate_cost("unknown-model", 1000, 1000), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
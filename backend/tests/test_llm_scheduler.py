@@ -0,0 +1,46 @@
+import asyncio
+import unittest
+
+from app.services.llm_scheduler import LLMCapacityError, LLMScheduler, Priority
+
+
+class LLMSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_interactive_calls_are_admitted_before_scans(self):
+        scheduler = LLMScheduler(requests_per_minute=600, tokens_per_minute=100_000, max_queue_depth=10, max_wait_seconds=5)
+        scheduler._requests.available = 0
+        admitted: list[str] = []
+
+        async def call(name: str, priority: Priority):
+            await scheduler.acquire(priority, 10)
+            admitted.append(name)
+
+        scan = asyncio.create_task(call("scan", Priority.SCAN))
+        await asyncio.sleep(0)
+        chat = asyncio.create_task(call("chat", Priority.INTERACTIVE))
+        await asyncio.gather(scan, chat)
+
+        self.assertEqual(admitted, ["chat", "scan"])
+
+    async def test_rejects_when_queue_is_full(self):
+        scheduler = LLMScheduler(requests_per_minute=1, tokens_per_minute=100_000, max_queue_depth=1, max_wait_seconds=5)
+        await scheduler.acquire(Priority.SCAN, 10)
+        waiting = asyncio.create_task(scheduler.acquire(Priority.SCAN, 10))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(LLMCapacityError) as ctx:
+            await scheduler.acquire(Priority.INTERACTIVE, 10)
+        self.assertEqual(ctx.exception.status_code, 503)
+        waiting.cancel()
+
+    async def test_times_out_with_retry_after(self):
+        scheduler = LLMScheduler(requests_per_minute=1, tokens_per_minute=100_000, max_queue_depth=5, max_wait_seconds=0.05)
+        await scheduler.acquire(Priority.SCAN, 10)
+
+        with self.assertRaises(LLMCapacityError) as ctx:
+            await scheduler.acquire(Priority.SCAN, 10)
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
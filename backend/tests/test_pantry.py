@@ -0,0 +1,98 @@
+import unittest
+import uuid
+
+from sqlalchemy import select
+
+from app.models.ingredient import HouseholdIngredient
+from app.services.pantry import find_matching_items, remove_matching_statement
+from postgres_case import PostgresTestCase
+
+
+class FindMatchingItemsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_groups_returned_rows_by_request(self):
+        rice, lower_rice, milk = (HouseholdIngredient(name=name) for name in ("Rice", "rice", "Whole milk"))
+
+        class FakeSession:
+            async def execute(self, statement):
+                return [(rice, 1), (lower_rice, 1), (milk, 3)]
+
+        found = await find_matching_items(FakeSession(), uuid.uuid4(), ["rice", "eggs", "milk"])
+
+        self.assertEqual(found, [[rice, lower_rice], [], [milk]])
+
+    async def test_blank_names_skip_the_query(self):
+        class FakeSession:
+            async def execute(self, statement):
+                raise AssertionError("queried")
+
+        self.assertEqual(await find_matching_items(FakeSession(), uuid.uuid4(), [" ", ""]), [[], []])
+
+
+class RemoveMatchingStatementPostgresTests(PostgresTestCase):
+    async def remove(self, pantry: list[str], names: list[str]) -> tuple[list[list[str]], list[str]]:
+        user_id = await self.create_user()
+        self.db.add_all(HouseholdIngredient(user_id=user_id, name=name) for name in pantry)
+        await self.db.flush()
+        queries = [name.strip().lower() for name in names]
+
+        # The preview and the DELETE agree on what goes.
+        found = await find_matching_items(self.db, user_id, names)
+        removed: list[list[str]] = [[] for _ in names]
+        for name, ordinal in await self.db.execute(remove_matching_statement(user_id, queries)):
+            removed[ordinal - 1].append(name)
+        self.assertEqual([sorted(i.name for i in items) for items in found], [sorted(r) for r in removed])
+
+        return removed, await self.left(user_id)
+
+    async def left(self, user_id: uuid.UUID) -> list[str]:
+        names = await self.db.scalars(
+            select(HouseholdIngredient.name)
+            .where(HouseholdIngredient.user_id == user_id)
+            .order_by(HouseholdIngredient.name)
+        )
+        return list(names)
+
+    async def test_exact_match_beats_a_longer_name(self):
+        removed, left = await self.remove(["rice vinegar", "Rice"], ["rice"])
+
+        self.assertEqual(removed, [["Rice"]])
+        self.assertEqual(left, ["rice vinegar"])
+
+    async def test_every_exact_match_is_removed(self):
+        removed, left = await self.remove(["Rice", "rice", "rice vinegar"], ["RICE "])
+
+        self.assertEqual(sorted(removed[0]), ["Rice", "rice"])
+        self.assertEqual(left, ["rice vinegar"])
+
+    async def test_short_query_finds_a_word_in_a_long_name(self):
+        removed, left = await self.remove(["extra virgin olive oil", "flour"], ["oil"])
+
+        self.assertEqual(removed, [["extra virgin olive oil"]])
+        self.assertEqual(left, ["flour"])
+
+    async def test_query_matched_by_two_names_removes_only_the_closest(self):
+        removed, left = await self.remove(["rice vinegar", "brown rice"], ["rice"])
+
+        self.assertEqual(removed, [["brown rice"]])
+        self.assertEqual(left, ["rice vinegar"])
+
+    async def test_unrelated_names_are_kept(self):
+        removed, left = await self.remove(["milk", "eggs"], ["rice", "eggs"])
+
+        self.assertEqual(removed, [[], ["eggs"]])
+        self.assertEqual(left, ["milk"])
+
+    async def test_preview_skips_excluded_items(self):
+        user_id = await self.create_user()
+        brown = HouseholdIngredient(user_id=user_id, name="brown rice")
+        self.db.add_all([brown, HouseholdIngredient(user_id=user_id, name="rice vinegar")])
+        await self.db.flush()
+
+        found = await find_matching_items(self.db, user_id, ["rice"], [brown.id])
+
+        self.assertEqual([[item.name for item in items] for items in found], [["rice vinegar"]])
+        self.assertEqual(await self.left(user_id), ["brown rice", "rice vinegar"])
+
+
+if __name__ == "__main__":
+    unittest.main()
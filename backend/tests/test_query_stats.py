@@ -0,0 +1,55 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import query_stats
+from app.services.metrics import DB_REPEATED_STATEMENTS
+from app.services.query_stats import QueryStatsMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def items(item_id: int):
+        stats = query_stats.get()
+        stats.record("SELECT * FROM items WHERE user_id = $1", 0.004)
+        for _ in range(item_id):
+            stats.record("DELETE FROM items WHERE id = $1", 0.001)
+        return {"ok": True}
+
+    return app
+
+
+class QueryStatsMiddlewareTests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(_app())
+        self.original_debug = settings.debug
+
+    def tearDown(self):
+        settings.debug = self.original_debug
+
+    def test_debug_mode_returns_query_headers(self):
+        settings.debug = True
+
+        response = self.client.get("/items/2")
+
+        self.assertEqual(response.headers["x-db-query-count"], "3")
+        self.assertEqual(response.headers["x-db-time-ms"], "6.0")
+
+    def test_flags_repeated_statements_by_route_template(self):
+        settings.debug = False
+        counter = DB_REPEATED_STATEMENTS.labels(route="GET /items/{item_id}")
+        before = counter._value.get()
+
+        response = self.client.get(f"/items/{settings.db_repeated_statement_threshold}")
+
+        self.assertNotIn("x-db-query-count", response.headers)
+        self.assertEqual(counter._value.get(), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
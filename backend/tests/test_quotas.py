@@ -0,0 +1,84 @@
+import unittest
+import uuid
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.services.quotas import QuotaManager, UsageCallback, UsageLedger
+
+
+class FakeSession:
+    def __init__(self, value):
+        self._value = value
+
+    async def execute(self, statement):
+        return self
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class QuotaTests(unittest.IsolatedAsyncioTestCase):
+    async def test_usage_callback_debits_bucket_and_records_ledger(self):
+        quotas = QuotaManager(tokens_per_hour=1000)
+        ledger = UsageLedger()
+        callback = UsageCallback(quotas, ledger)
+        user_id = uuid.uuid4()
+        model = GenericFakeChatModel(
+            messages=iter(
+                [AIMessage("ok", usage_metadata={"input_tokens": 900, "output_tokens": 300, "total_tokens": 1200})]
+            )
+        )
+
+        await model.ainvoke(
+            "hello",
+            config={"callbacks": [callback], "metadata": {"llm_user_id": user_id, "llm_route": "chat_agent"}},
+        )
+
+        bucket = quotas.bucket(user_id)
+        self.assertLessEqual(bucket.balance, 0)
+        self.assertGreater(bucket.seconds_until_available, 0)
+        self.assertEqual(quotas.headers(bucket)["X-RateLimit-Remaining"], "0")
+        [(key, totals)] = ledger._pending.items()
+        self.assertEqual((key[0], key[2]), (user_id, "chat_agent"))
+        self.assertEqual(totals["request_count"], 1)
+        self.assertEqual(totals["total_tokens"], 1200)
+
+    async def test_shared_balance_counts_this_workers_unsynced_debits(self):
+        quotas = QuotaManager(tokens_per_hour=1000)
+        user_id = uuid.uuid4()
+        quotas.debit(user_id, 100)
+
+        bucket = await quotas.load(FakeSession(700.0), user_id)
+        self.assertEqual(bucket.balance, 600.0)
+
+        # No shared row yet: only this worker has spent, and its own bucket is complete.
+        bucket = await quotas.load(FakeSession(None), user_id)
+        self.assertAlmostEqual(bucket.balance, 600.0, places=1)
+
+    async def test_sync_evicts_full_buckets_with_nothing_to_write(self):
+        quotas = QuotaManager(tokens_per_hour=1000)
+        idle, spending = uuid.uuid4(), uuid.uuid4()
+        quotas.bucket(idle)
+        quotas.debit(spending, 100)
+        quotas._unsynced.clear()
+
+        await quotas.sync()
+
+        self.assertEqual(list(quotas._buckets), [spending])
+
+    def test_ledger_rolls_up_calls_in_same_period(self):
+        ledger = UsageLedger()
+        user_id = uuid.uuid4()
+        for _ in range(3):
+            ledger.record(user_id, "recipe_photo", {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+
+        [totals] = ledger._pending.values()
+        self.assertEqual(
+            totals,
+            {"request_count": 3, "input_tokens": 30, "cached_input_tokens": 0, "output_tokens": 15, "total_tokens": 45},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
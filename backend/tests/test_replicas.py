@@ -0,0 +1,89 @@
+import unittest
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services import replicas
+from app.services.replicas import ReadRouter, get_read_db
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class FakeSession:
+    def __init__(self, cursor, calls):
+        self.cursor = cursor
+        self.calls = calls
+
+    async def execute(self, statement):
+        self.calls.append("execute")
+        return FakeResult(self.cursor)
+
+    async def commit(self):
+        self.calls.append("commit")
+
+
+class ReadRouterTests(unittest.TestCase):
+    def setUp(self):
+        self.router = ReadRouter(pin_seconds=60, max_lag_seconds=5)
+        self.router.lag_seconds = 0.0
+        self.user_id = uuid.uuid4()
+
+    def test_reads_go_to_replica_when_caught_up(self):
+        self.assertEqual(self.router.route(self.user_id), ("replica", "ok"))
+
+    def test_recent_writer_is_pinned_to_primary(self):
+        self.router.pin(self.user_id)
+
+        self.assertEqual(self.router.route(self.user_id), ("primary", "recent_write"))
+        self.assertEqual(self.router.route(uuid.uuid4()), ("replica", "ok"))
+
+    def test_lagging_or_unknown_replica_falls_back_to_primary(self):
+        self.router.lag_seconds = 30.0
+        self.assertEqual(self.router.route(self.user_id), ("primary", "replica_lagging"))
+
+        self.router.lag_seconds = None
+        self.assertEqual(self.router.route(self.user_id), ("primary", "replica_unavailable"))
+
+
+class GetReadDbTests(unittest.IsolatedAsyncioTestCase):
+    async def read_session(self, primary_cursor, replica_cursor):
+        self.primary_calls = []
+        self.replica_calls = []
+        primary = FakeSession(primary_cursor, self.primary_calls)
+        replica = FakeSession(replica_cursor, self.replica_calls)
+
+        @asynccontextmanager
+        async def replica_session():
+            # The primary's connection is released before the replica is queried.
+            self.assertEqual(self.primary_calls, ["execute", "commit"])
+            yield replica
+
+        router = ReadRouter(pin_seconds=60, max_lag_seconds=5)
+        router.lag_seconds = 0.0
+        with patch.object(replicas, "replica_session", replica_session), patch.object(replicas, "read_router", router):
+            sessions = get_read_db(SimpleNamespace(id=uuid.uuid4()), primary)
+            session = await anext(sessions)
+            await sessions.aclose()
+        return session, primary, replica
+
+    async def test_caught_up_replica_serves_the_read(self):
+        session, _, replica = await self.read_session(primary_cursor=7, replica_cursor=7)
+
+        self.assertIs(session, replica)
+        self.assertEqual(self.primary_calls, ["execute", "commit"])
+
+    async def test_replica_behind_the_user_falls_back_to_primary(self):
+        session, primary, _ = await self.read_session(primary_cursor=8, replica_cursor=7)
+
+        self.assertIs(session, primary)
+
+
+if __name__ == "__main__":
+    unittest.main()
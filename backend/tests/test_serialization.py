@@ -0,0 +1,85 @@
+import json
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.schemas.recipe import RecipeOut
+from app.services.compression import CompressionMiddleware
+from app.services.serialization import as_rows, trusted_json
+
+
+def recipe(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        name=f"Recipe {index}",
+        description=None,
+        ingredients=[{"name": "rice", "quantity": "1", "unit": "cup"}],
+        prep_time_minutes=20,
+        instructions="Cook.",
+        source="AI generated",
+        favourite=index % 2 == 0,
+        category="dinner",
+        created_at=datetime(2026, 10, 19, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        user_id=uuid.uuid4(),
+    )
+
+
+class TrustedJSONTests(unittest.TestCase):
+    def test_matches_the_validated_response_model_output(self):
+        rows = [recipe(index) for index in range(3)]
+
+        fast = json.loads(trusted_json(as_rows(RecipeOut, rows)).body)
+        validated = jsonable_encoder([RecipeOut.model_validate(row) for row in rows])
+
+        self.assertEqual(fast, validated)
+        self.assertNotIn("user_id", fast[0])
+        self.assertEqual(fast[0]["created_at"], "2026-10-19T09:30:15.123456Z")
+
+
+class CompressionMiddlewareTests(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100, level=6)
+
+        @app.get("/large")
+        async def large():
+            return trusted_json(as_rows(RecipeOut, [recipe(index) for index in range(50)]))
+
+        @app.get("/small")
+        async def small():
+            return {"ok": True}
+
+        @app.get("/stream")
+        async def stream():
+            async def events():
+                for index in range(3):
+                    yield f"data: {'x' * 200}{index}\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        self.client = TestClient(app)
+
+    def test_compresses_large_bodies_only(self):
+        large = self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+        small = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(large.headers["content-encoding"], "gzip")
+        self.assertEqual(large.headers["vary"], "Accept-Encoding")
+        self.assertEqual(len(large.json()), 50)
+        self.assertNotIn("content-encoding", small.headers)
+
+    def test_streams_pass_through_uncompressed(self):
+        response = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.text.count("data: "), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import unittest
+import uuid
+from unittest.mock import patch
+
+from app.services import shopping_list_events
+from app.services.shopping_list_events import ShoppingListHub, listen_dsn
+
+
+def parse(chunk):
+    return json.loads(chunk.removeprefix("data: "))
+
+
+class ShoppingListHubTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.diff_calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.cursor = 5
+
+        async def load_snapshot(user_id):
+            return {"type": "snapshot", "cursor": self.cursor, "items": [{"id": "a", "name": "eggs"}]}
+
+        async def load_diff(user_id, since):
+            self.diff_calls.append(since)
+            await self.release.wait()
+            return {"type": "diff", "cursor": self.cursor, "upserted": [], "deleted": ["a"]}
+
+        for name, fake in (("load_snapshot", load_snapshot), ("load_diff", load_diff)):
+            patcher = patch.object(shopping_list_events, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.hub = ShoppingListHub(queue_size=2, heartbeat_seconds=5)
+        self.user_id = uuid.uuid4()
+
+    async def test_one_diff_read_fans_out_to_every_stream(self):
+        first, second = self.hub.stream(self.user_id), self.hub.stream(self.user_id)
+        self.assertEqual(parse(await anext(first))["type"], "snapshot")
+        self.assertEqual(parse(await anext(second))["items"], [{"id": "a", "name": "eggs"}])
+
+        self.cursor = 6
+        self.hub.notify(self.user_id)
+        self.hub.notify(uuid.uuid4())
+
+        self.assertEqual(parse(await anext(first)), {"type": "diff", "cursor": 6, "upserted": [], "deleted": ["a"]})
+        self.assertEqual(parse(await anext(second))["cursor"], 6)
+        self.assertEqual(self.diff_calls, [5])
+        self.assertEqual(self.hub.subscriber_count, 2)
+
+        await first.aclose()
+        await second.aclose()
+        self.assertEqual(self.hub.subscriber_count, 0)
+
+    async def test_notifications_during_a_read_are_coalesced(self):
+        stream = self.hub.stream(self.user_id)
+        await anext(stream)
+        self.release.clear()
+
+        self.cursor = 7
+        self.hub.notify(self.user_id)
+        await asyncio.sleep(0)
+        for _ in range(5):
+            self.hub.notify(self.user_id)
+        self.cursor = 9
+        self.release.set()
+
+        self.assertEqual(parse(await anext(stream))["cursor"], 9)
+        await asyncio.sleep(0)
+        self.assertEqual(self.diff_calls, [5, 9])
+        await stream.aclose()
+
+    async def test_close_streams_ends_every_stream(self):
+        streams = [self.hub.stream(self.user_id), self.hub.stream(uuid.uuid4())]
+        for stream in streams:
+            await anext(stream)
+
+        self.hub.close_streams()
+
+        for stream in streams:
+            with self.assertRaises(StopAsyncIteration):
+                await anext(stream)
+        self.assertEqual(self.hub.subscriber_count, 0)
+
+    async def test_slow_stream_is_closed_once_its_queue_overflows(self):
+        stream = self.hub.stream(self.user_id)
+        await anext(stream)
+        channel = self.hub._channels[self.user_id]
+
+        for cursor in (6, 7, 8):
+            self.hub._broadcast(channel, {"type": "diff", "cursor": cursor})
+
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertNotIn(self.user_id, self.hub._channels)
+
+
+class ListenDsnTests(unittest.TestCase):
+    def test_strips_the_sqlalchemy_driver(self):
+        with patch.object(shopping_list_events.settings, "database_listen_url", ""), patch.object(
+            shopping_list_events.settings, "database_url", "postgresql+asyncpg://app:secret@db:5432/grocery"
+        ):
+            self.assertEqual(listen_dsn(), "postgresql://app:secret@db:5432/grocery")
+
+
+if __name__ == "__main__":
+    unittest.main()
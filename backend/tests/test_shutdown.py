@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from app.services.shutdown import ShutdownDrain, StreamInterrupted
+
+
+async def tokens(count, delay):
+    for index in range(count):
+        await asyncio.sleep(delay)
+        yield f"token {index}"
+
+
+class ShutdownDrainTests(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_that_finish_in_time_are_relayed_whole(self):
+        drain = ShutdownDrain(drain_seconds=1)
+        relayed = []
+
+        stream = drain.guard(tokens(3, 0.01))
+        relayed.append(await anext(stream))
+        drain.begin()
+        async for chunk in stream:
+            relayed.append(chunk)
+
+        self.assertEqual(relayed, ["token 0", "token 1", "token 2"])
+        self.assertEqual(drain.active_streams, 0)
+
+    async def test_deadline_interrupts_running_streams(self):
+        drain = ShutdownDrain(drain_seconds=0.05)
+        relayed = []
+
+        with self.assertRaises(StreamInterrupted):
+            async for chunk in drain.guard(tokens(100, 0.01)):
+                relayed.append(chunk)
+                if len(relayed) == 1:
+                    drain.begin()
+
+        self.assertLess(len(relayed), 100)
+        self.assertEqual(drain.active_streams, 0)
+
+    async def test_producer_errors_reach_the_relay(self):
+        async def failing():
+            yield "token 0"
+            raise ValueError("model failed")
+
+        drain = ShutdownDrain(drain_seconds=1)
+        with self.assertRaises(ValueError):
+            async for _ in drain.guard(failing()):
+                pass
+
+    async def test_draining_refuses_new_streams_and_runs_callbacks(self):
+        drain = ShutdownDrain(drain_seconds=1)
+        closed = []
+        drain.on_drain(lambda: closed.append(True))
+        drain.refuse_when_draining()
+
+        drain.begin()
+
+        self.assertEqual(closed, [True])
+        with self.assertRaises(HTTPException) as raised:
+            drain.refuse_when_draining()
+        self.assertEqual(raised.exception.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
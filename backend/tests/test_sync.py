@@ -0,0 +1,222 @@
+import asyncio
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import delete, insert, select
+
+from app.models.ingredient import HouseholdIngredient
+from app.models.recipe import Recipe
+from app.models.shopping_list import ShoppingList
+from app.models.sync_change import SyncChange
+from app.models.user import User
+from app.schemas.sync import SyncOperation
+from app.services.sync import apply_operations, read_changes
+from postgres_case import PostgresTestCase
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def all(self):
+        return self._value
+
+    def scalars(self):
+        return self._value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class FakeSession:
+    """Answers each ``execute`` with the next scripted result."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.added = []
+        self.deleted = []
+
+    async def execute(self, statement):
+        return FakeResult(self.results.pop(0))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def delete(self, obj):
+        self.deleted.append(obj)
+
+
+def change(cursor, entity_id, collection="shopping_list_items", deleted=False):
+    return SimpleNamespace(collection=collection, entity_id=entity_id, cursor=cursor, deleted=deleted)
+
+
+class ReadChangesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_page_does_not_split_a_cursor(self):
+        rows = [change(4, "a"), change(5, "b"), change(5, "c")]
+        items = [{"id": "a", "name": "eggs"}, {"id": "b", "name": "milk"}, {"id": "c", "name": "rice"}]
+        db = FakeSession(rows, 0, items)
+
+        page = await read_changes(db, uuid.uuid4(), since=3, limit=2)
+
+        self.assertEqual((page["cursor"], page["has_more"], page["reset"]), (4, True, False))
+        self.assertEqual([c["data"] for c in page["changes"]], [{"id": "a", "name": "eggs"}])
+
+    async def test_vanished_rows_become_tombstones(self):
+        db = FakeSession([change(7, "a"), change(8, "b", deleted=True)], 0, [])
+
+        page = await read_changes(db, uuid.uuid4(), since=6, limit=10)
+
+        self.assertEqual(page["cursor"], 8)
+        self.assertEqual([(c["id"], c["deleted"]) for c in page["changes"]], [("a", True), ("b", True)])
+
+    async def test_cursor_behind_pruned_tombstones_resets(self):
+        db = FakeSession([], 40, [change(41, "a")], [{"id": "a", "name": "eggs"}])
+
+        page = await read_changes(db, uuid.uuid4(), since=12, limit=10)
+
+        self.assertTrue(page["reset"])
+        self.assertEqual(page["cursor"], 41)
+
+    async def test_no_changes_keeps_the_cursor(self):
+        page = await read_changes(FakeSession([], None), uuid.uuid4(), since=9, limit=10)
+
+        self.assertEqual((page["cursor"], page["changes"]), (9, []))
+
+
+class ApplyOperationsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_shopping_items_and_conflicts(self):
+        user_id = uuid.uuid4()
+        kept, edited, stale = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        shopping_list = SimpleNamespace(
+            items=[
+                {"id": str(kept), "name": "eggs", "checked": False},
+                {"id": str(edited), "name": "milk", "checked": False},
+                {"id": str(stale), "name": "rice", "checked": False},
+            ]
+        )
+        db = FakeSession([("shopping_list_items", str(stale), 9)], shopping_list)
+        added = uuid.uuid4()
+        operations = [
+            SyncOperation(collection="shopping_list_items", op="upsert", id=edited, data={"checked": True}, base_cursor=3),
+            SyncOperation(collection="shopping_list_items", op="upsert", id=added, data={"name": " bread "}),
+            SyncOperation(collection="shopping_list_items", op="delete", id=stale, base_cursor=3),
+            SyncOperation(collection="shopping_list_items", op="upsert", id=uuid.uuid4(), data={"name": " "}),
+        ]
+
+        results = await apply_operations(db, user_id, operations)
+
+        self.assertEqual([r["status"] for r in results], ["applied", "applied", "conflict", "rejected"])
+        self.assertEqual([item["name"] for item in shopping_list.items], ["eggs", "milk", "rice", "bread"])
+        self.assertTrue(shopping_list.items[1]["checked"])
+        self.assertEqual(shopping_list.items[3]["id"], str(added))
+
+    async def test_recipes_are_created_with_client_ids_and_foreign_ids_refused(self):
+        user_id = uuid.uuid4()
+        new_id, foreign_id = uuid.uuid4(), uuid.uuid4()
+        foreign = SimpleNamespace(id=foreign_id, user_id=uuid.uuid4())
+        db = FakeSession([], [foreign])
+        operations = [
+            SyncOperation(collection="recipes", op="upsert", id=new_id, data={"name": "Soup", "ingredients": []}),
+            SyncOperation(collection="recipes", op="delete", id=foreign_id),
+            SyncOperation(collection="recipes", op="upsert", id=uuid.uuid4(), data={"ingredients": []}),
+        ]
+
+        results = await apply_operations(db, user_id, operations)
+
+        self.assertEqual([r["status"] for r in results], ["applied", "rejected", "rejected"])
+        self.assertEqual(results[2]["detail"], "name: Field required")
+        self.assertEqual(len(db.added), 1)
+        self.assertIsInstance(db.added[0], Recipe)
+        self.assertEqual((db.added[0].id, db.added[0].user_id), (new_id, user_id))
+        self.assertEqual(db.deleted, [])
+
+
+class ShoppingListChangeLogPostgresTests(PostgresTestCase):
+    async def item_changes(self, user_id: uuid.UUID) -> dict[str, tuple[int, bool]]:
+        rows = await self.db.execute(
+            select(SyncChange.entity_id, SyncChange.cursor, SyncChange.deleted).where(
+                SyncChange.user_id == user_id, SyncChange.collection == "shopping_list_items"
+            )
+        )
+        return {entity_id: (cursor, deleted) for entity_id, cursor, deleted in rows}
+
+    async def test_item_inserts_edits_deletes_and_reorders(self):
+        user_id = await self.create_user()
+        eggs, milk, rice = ({"id": str(uuid.uuid4()), "name": name} for name in ("eggs", "milk", "rice"))
+        shopping_list = ShoppingList(user_id=user_id, items=[eggs, milk, rice])
+        self.db.add(shopping_list)
+        await self.db.flush()
+        # One write stamps all of its items with one cursor.
+        self.assertEqual(await self.item_changes(user_id), {item["id"]: (1, False) for item in (eggs, milk, rice)})
+
+        shopping_list.items = [eggs, {**milk, "checked": True}, rice]
+        await self.db.flush()
+        shopping_list.items = [eggs, {**milk, "checked": True}]
+        await self.db.flush()
+        edited_and_deleted = await self.item_changes(user_id)
+        self.assertEqual(
+            edited_and_deleted,
+            {eggs["id"]: (1, False), milk["id"]: (2, False), rice["id"]: (3, True)},
+        )
+
+        shopping_list.items = [{**milk, "checked": True}, eggs]
+        await self.db.flush()
+        # A reorder changes no item, so nothing is recorded for one.
+        self.assertEqual(await self.item_changes(user_id), edited_and_deleted)
+
+        page = await read_changes(self.db, user_id, since=1, limit=10)
+        self.assertEqual(
+            [(change["id"], change["cursor"], change["deleted"]) for change in page["changes"]],
+            [(milk["id"], 2, False), (rice["id"], 3, True)],
+        )
+
+
+class SyncCursorOrderingPostgresTests(PostgresTestCase):
+    """Runs on committed data: the ordering comes from the cursor row lock between transactions."""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.user_id = uuid.uuid4()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                insert(User).values(id=self.user_id, username=f"test-{self.user_id.hex[:12]}", password_hash="x")
+            )
+        self.addAsyncCleanup(self.delete_user)
+
+    async def delete_user(self):
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(User).where(User.id == self.user_id))
+
+    async def test_writers_of_one_user_get_cursors_in_commit_order(self):
+        first = await self.engine.connect()
+        second = await self.engine.connect()
+        self.addAsyncCleanup(first.close)
+        self.addAsyncCleanup(second.close)
+        await first.begin()
+        await second.begin()
+
+        await first.execute(insert(HouseholdIngredient).values(user_id=self.user_id, name="eggs"))
+        blocked = asyncio.create_task(
+            second.execute(insert(HouseholdIngredient).values(user_id=self.user_id, name="milk"))
+        )
+        await asyncio.sleep(0.2)
+        # The second writer waits for the first one's cursor lock instead of taking the next number.
+        self.assertFalse(blocked.done())
+
+        await first.commit()
+        await asyncio.wait_for(blocked, timeout=5)
+        await second.commit()
+
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(
+                select(HouseholdIngredient.name, SyncChange.cursor)
+                .join(SyncChange, SyncChange.entity_id == HouseholdIngredient.id.cast(SyncChange.entity_id.type))
+                .where(HouseholdIngredient.user_id == self.user_id)
+                .order_by(SyncChange.cursor)
+            )
+            self.assertEqual([name for name, _ in rows], ["eggs", "milk"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+from app.services.llm_providers import LocalChatModel
+from app.services.tool_batch import ToolBatcher
+
+
+class ToolBatcherTests(unittest.IsolatedAsyncioTestCase):
+    async def test_parallel_tool_calls_reach_one_bulk_handler(self):
+        batcher = ToolBatcher(max_wait=5.0)
+        batches: list[list[str]] = []
+
+        async def add_items(calls):
+            batches.append([call["name"] for call in calls])
+            await asyncio.sleep(0)
+            return [f"added {call['name']}" for call in calls]
+
+        @tool
+        async def add_pantry_item(name: str) -> str:
+            """Add a pantry item."""
+            return await batcher.run("add_pantry_item", {"name": name}, add_items)
+
+        model = LocalChatModel(
+            route="chat_agent",
+            replies=[
+                {"tool_calls": [{"name": "add_pantry_item", "args": {"name": n}} for n in ("rice", "eggs", "milk")]},
+                {"content": "Done."},
+            ],
+        )
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "test"),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        executor = AgentExecutor(
+            agent=create_openai_tools_agent(model, [add_pantry_item], prompt), tools=[add_pantry_item]
+        )
+
+        result = await executor.ainvoke(
+            {"input": "I bought rice, eggs and milk"},
+            config={"callbacks": [batcher]},
+            return_only_outputs=True,
+        )
+
+        self.assertEqual(batches, [["rice", "eggs", "milk"]])
+        self.assertEqual(result["output"], "Done.")
+
+    async def test_unexpected_calls_run_without_waiting(self):
+        batcher = ToolBatcher(max_wait=5.0)
+        batches: list[int] = []
+
+        async def handler(calls):
+            batches.append(len(calls))
+            return ["ok"] * len(calls)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.run("get_pantry", {}, handler), batcher.run("get_pantry", {}, handler)),
+            timeout=1.0,
+        )
+
+        self.assertEqual(results, ["ok", "ok"])
+        self.assertEqual(batches, [1, 1])
+
+    async def test_handler_errors_reach_every_coalesced_call(self):
+        batcher = ToolBatcher(max_wait=0.01)
+        batcher._expected["save_recipe"] = 2
+
+        async def failing(calls):
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            batcher.run("save_recipe", {}, failing), batcher.run("save_recipe", {}, failing), return_exceptions=True
+        )
+
+        self.assertEqual([str(result) for result in results], ["boom", "boom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
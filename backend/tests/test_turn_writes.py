@@ -0,0 +1,127 @@
+import unittest
+import uuid
+
+from sqlalchemy import select
+
+from app.models.ingredient import HouseholdIngredient
+from app.models.sync_change import SyncCursor
+from app.services.ai import build_tools
+from app.services.tool_batch import ToolBatcher
+from app.services.turn_writes import TurnWrites
+from postgres_case import PostgresTestCase
+
+
+class FakeSession:
+    def __init__(self):
+        self.autoflush = True
+        self.log: list[object] = []
+        self.rolled_back = False
+
+    def add_all(self, objs):
+        self.log.append(("add", list(objs)))
+
+    async def flush(self):
+        self.log.append("flush")
+
+    async def execute(self, statement):
+        self.log.append(("execute", statement))
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+class TurnWritesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_nothing_is_written_until_the_turn_ends(self):
+        db = FakeSession()
+        writes = TurnWrites(db)
+
+        for index in range(100):
+            await writes.add(index)
+
+        self.assertFalse(db.autoflush)
+        self.assertEqual(db.log, [])
+        self.assertFalse(hasattr(db, "commit"))
+
+    async def test_flush_replays_staged_objects_and_statements_in_order(self):
+        db = FakeSession()
+        writes = TurnWrites(db)
+
+        await writes.add("eggs")
+        await writes.add("milk")
+        writes.defer("DELETE rice")
+        await writes.add("flour")
+        await writes.flush()
+
+        self.assertEqual(
+            db.log,
+            [("add", ["eggs", "milk"]), "flush", ("execute", "DELETE rice"), ("add", ["flour"]), "flush", "flush"],
+        )
+
+    async def test_staged_objects_are_listed_by_type(self):
+        writes = TurnWrites(FakeSession())
+        eggs = HouseholdIngredient(name="eggs")
+
+        await writes.add(eggs)
+        await writes.add("not an ingredient")
+
+        self.assertEqual(writes.staged(HouseholdIngredient), [eggs])
+
+    async def test_rollback_discards_the_turn(self):
+        db = FakeSession()
+        writes = TurnWrites(db)
+        await writes.add("eggs")
+
+        await writes.rollback()
+        await writes.flush()
+
+        self.assertTrue(db.rolled_back)
+        self.assertEqual(db.log, ["flush"])
+
+
+class TurnToolsPostgresTests(PostgresTestCase):
+    async def test_tools_write_nothing_before_the_turn_ends(self):
+        user_id = await self.create_user()
+        self.db.add_all([HouseholdIngredient(user_id=user_id, name=name) for name in ("rice", "milk")])
+        await self.db.flush()
+        cursor = await self.cursor(user_id)
+        writes = TurnWrites(self.db)
+        tools = {tool.name: tool for tool in build_tools(self.db, user_id, writes, ToolBatcher(0))}
+
+        await tools["add_pantry_item"].ainvoke({"name": "eggs"})
+        await tools["add_pantry_item"].ainvoke({"name": "flour"})
+        removed_rice = await tools["remove_pantry_item"].ainvoke({"name": "rice"})
+        removed_flour = await tools["remove_pantry_item"].ainvoke({"name": "flour"})
+        missing = await tools["remove_pantry_item"].ainvoke({"name": "rice"})
+        pantry = await tools["get_pantry"].ainvoke({})
+
+        # Later tools see the turn's writes, but the sync triggers have not fired for any of them.
+        self.assertEqual(removed_rice, "Removed 'rice' from pantry.")
+        self.assertEqual(removed_flour, "Removed 'flour' from pantry.")
+        self.assertEqual(missing, "No pantry item matching 'rice' found.")
+        self.assertEqual(self.names(pantry), ["eggs", "milk"])
+        self.assertEqual(await self.pantry(user_id), ["milk", "rice"])
+        self.assertEqual(await self.cursor(user_id), cursor)
+
+        await writes.flush()
+
+        self.assertEqual(await self.pantry(user_id), ["eggs", "milk"])
+        self.assertGreater(await self.cursor(user_id), cursor)
+
+    @staticmethod
+    def names(pantry: str) -> list[str]:
+        return [line[2:].split(":")[0] for line in pantry.splitlines()[1:]]
+
+    async def cursor(self, user_id: uuid.UUID) -> int:
+        return await self.db.scalar(select(SyncCursor.cursor).where(SyncCursor.user_id == user_id))
+
+    async def pantry(self, user_id: uuid.UUID) -> list[str]:
+        names = await self.db.scalars(
+            select(HouseholdIngredient.name)
+            .where(HouseholdIngredient.user_id == user_id)
+            .order_by(HouseholdIngredient.name)
+        )
+        return list(names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import asyncio
+import os
 import sys
 from logging.config import fileConfig
 from pathlib import Path
@@ -10,11 +11,14 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
 
 from app.database import Base
-from app.models import User, Recipe, ChatSession, ChatMessage, HouseholdIngredient, ShoppingList
+from app.models import User, Recipe, ChatSession, ChatMessage, ChatSessionArchive, HouseholdIngredient, ShoppingList, LLMUsage, CollectionVersion, SyncCursor, SyncChange, Job, AIQuotaBucket
 
 config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
+if os.environ.get("DATABASE_URL"):
+    # Match the backend's connection when run inside its container or deploy environment.
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,132 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Tables as previously created by ``Base.metadata.create_all``. Tables that already exist are left
+alone, so databases bootstrapped that way adopt this revision with a plain ``alembic upgrade head``.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _missing(table: str) -> bool:
+    if context.is_offline_mode():
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("username", sa.String(length=50), nullable=False),
+            sa.Column("password_hash", sa.String(length=128), nullable=False),
+            sa.Column("display_name", sa.String(length=100), nullable=True),
+            sa.Column("dietary_preferences", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if _missing("recipes"):
+        op.create_table(
+            "recipes",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("name", sa.String(length=200), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("ingredients", postgresql.JSONB(), nullable=False),
+            sa.Column("prep_time_minutes", sa.Integer(), nullable=True),
+            sa.Column("instructions", sa.Text(), nullable=True),
+            sa.Column("source", sa.String(length=300), nullable=True),
+            sa.Column("favourite", sa.Boolean(), nullable=False, server_default="false"),
+            sa.Column("category", sa.String(length=100), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_recipes_name", "recipes", ["name"])
+
+    if _missing("chat_sessions"):
+        op.create_table(
+            "chat_sessions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("title", sa.String(length=200), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if _missing("chat_messages"):
+        op.create_table(
+            "chat_messages",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "session_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("chat_sessions.id"), nullable=False
+            ),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if _missing("household_ingredients"):
+        op.create_table(
+            "household_ingredients",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("name", sa.String(length=150), nullable=False),
+            sa.Column("quantity", sa.String(length=50), nullable=True),
+            sa.Column("unit", sa.String(length=30), nullable=True),
+            sa.Column("category", sa.String(length=50), nullable=True),
+            sa.Column("added_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_household_ingredients_name", "household_ingredients", ["name"])
+
+    if _missing("shopping_lists"):
+        op.create_table(
+            "shopping_lists",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("items", postgresql.JSONB(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("user_id", name="uq_shopping_lists_user_id"),
+        )
+
+    if _missing("llm_usage"):
+        op.create_table(
+            "llm_usage",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("route", sa.String(length=50), nullable=False),
+            sa.Column("request_count", sa.Integer(), nullable=False),
+            sa.Column("input_tokens", sa.Integer(), nullable=False),
+            sa.Column("cached_input_tokens", sa.Integer(), nullable=False),
+            sa.Column("output_tokens", sa.Integer(), nullable=False),
+            sa.Column("total_tokens", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("user_id", "period_start", "route", name="uq_llm_usage_user_period_route"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("llm_usage")
+    op.drop_table("shopping_lists")
+    op.drop_index("ix_household_ingredients_name", table_name="household_ingredients")
+    op.drop_table("household_ingredients")
+    op.drop_table("chat_messages")
+    op.drop_table("chat_sessions")
+    op.drop_index("ix_recipes_name", table_name="recipes")
+    op.drop_table("recipes")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_table("users")
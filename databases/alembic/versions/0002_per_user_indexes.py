@@ -0,0 +1,38 @@
+"""composite indexes for per-user lists and history loads
+
+Revision ID: 0002_per_user_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19 09:30:00.000000
+
+Built with CREATE INDEX CONCURRENTLY outside the migration transaction, so writes keep flowing
+while they build. If a build fails it leaves an INVALID index behind; drop it and rerun.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_per_user_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns: each matches a list query's filter plus its ORDER BY.
+INDEXES = [
+    ("ix_recipes_user_id_created_at", "recipes", ["user_id", "created_at"]),
+    ("ix_household_ingredients_user_id_name", "household_ingredients", ["user_id", "name"]),
+    ("ix_chat_sessions_user_id_updated_at", "chat_sessions", ["user_id", "updated_at"]),
+    ("ix_chat_messages_session_id_created_at", "chat_messages", ["session_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,49 @@
+"""ON DELETE CASCADE for user- and session-owned rows
+
+Revision ID: 0003_cascade_deletes
+Revises: 0002_per_user_indexes
+Create Date: 2026-10-19 10:30:00.000000
+
+Deleting a session or user becomes a single statement; Postgres removes the dependent rows instead
+of the ORM loading and deleting them one by one. Each foreign key is swapped for a NOT VALID one
+(a brief lock, no scan) and then validated, which scans without blocking writes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_cascade_deletes"
+down_revision: Union[str, None] = "0002_per_user_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# constraint, table, column, referred table
+FOREIGN_KEYS = [
+    ("recipes_user_id_fkey", "recipes", "user_id", "users"),
+    ("chat_sessions_user_id_fkey", "chat_sessions", "user_id", "users"),
+    ("chat_messages_session_id_fkey", "chat_messages", "session_id", "chat_sessions"),
+    ("household_ingredients_user_id_fkey", "household_ingredients", "user_id", "users"),
+    ("shopping_lists_user_id_fkey", "shopping_lists", "user_id", "users"),
+    ("llm_usage_user_id_fkey", "llm_usage", "user_id", "users"),
+]
+
+
+def _replace(ondelete: str | None) -> None:
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, referred, [column], ["id"], ondelete=ondelete, postgresql_not_valid=True
+        )
+    # Validate after the swap commits, so the scans don't run under the ALTER's exclusive lock.
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def upgrade() -> None:
+    _replace("CASCADE")
+
+
+def downgrade() -> None:
+    _replace(None)
@@ -0,0 +1,133 @@
+"""range-partition chat_messages by month and add session archives
+
+Revision ID: 0004_partition_chat_messages
+Revises: 0003_cascade_deletes
+Create Date: 2026-10-19 11:00:00.000000
+
+chat_messages becomes a table partitioned by created_at, with one partition per month. It also has
+a DEFAULT partition that catches rows outside the monthly ranges, such as old history restored from
+an archive. The primary key has to include the partition key, so it becomes (id, created_at).
+Existing rows are copied across, so this revision holds an exclusive lock for as long as that
+copy takes.
+
+The backend creates future partitions itself; see app/services/chat_archive.py. Sessions that go
+idle are moved into chat_session_archives as one compressed row each.
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_partition_chat_messages"
+down_revision: Union[str, None] = "0003_cascade_deletes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(month: date) -> None:
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS chat_messages_y{month:%Y}m{month:%m} PARTITION OF chat_messages "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_unpartitioned")
+    op.execute("ALTER INDEX chat_messages_pkey RENAME TO chat_messages_unpartitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_chat_messages_session_id_created_at "
+        "RENAME TO ix_chat_messages_unpartitioned_session_id_created_at"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE chat_messages (
+            id UUID NOT NULL,
+            session_id UUID NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT chat_messages_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT chat_messages_session_id_fkey FOREIGN KEY (session_id)
+                REFERENCES chat_sessions (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_chat_messages_session_id_created_at ON chat_messages (session_id, created_at)"
+    )
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    first = current
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM chat_messages_unpartitioned")).scalar()
+        if oldest is not None:
+            first = min(first, oldest.date().replace(day=1))
+    month = first
+    while month <= _add_months(current, MONTHS_AHEAD):
+        _create_partition(month)
+        month = _add_months(month, 1)
+
+    op.execute(
+        "INSERT INTO chat_messages (id, session_id, role, content, created_at) "
+        "SELECT id, session_id, role, content, coalesce(created_at, now()) FROM chat_messages_unpartitioned"
+    )
+    op.execute("DROP TABLE chat_messages_unpartitioned")
+
+    op.add_column("chat_sessions", sa.Column("archived_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        "chat_session_archives",
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("chat_sessions.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # Archived sessions would lose their messages; restore them before downgrading.
+    op.drop_table("chat_session_archives")
+    op.drop_column("chat_sessions", "archived_at")
+
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_partitioned")
+    op.execute("ALTER INDEX chat_messages_pkey RENAME TO chat_messages_partitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_chat_messages_session_id_created_at "
+        "RENAME TO ix_chat_messages_partitioned_session_id_created_at"
+    )
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("chat_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        "INSERT INTO chat_messages (id, session_id, role, content, created_at) "
+        "SELECT id, session_id, role, content, created_at FROM chat_messages_partitioned"
+    )
+    op.execute("DROP TABLE chat_messages_partitioned")
+    op.create_index("ix_chat_messages_session_id_created_at", "chat_messages", ["session_id", "created_at"])
@@ -0,0 +1,43 @@
+"""trigram index for fuzzy pantry lookups
+
+Revision ID: 0005_pantry_name_trigram
+Revises: 0004_partition_chat_messages
+Create Date: 2026-10-19 12:00:00.000000
+
+Enables pg_trgm and builds a GIN trigram index on lower(name). The agent's remove_pantry_item
+ranks candidates by similarity and no longer scans with ILIKE '%name%'. The index is built
+concurrently; if the build fails, drop the INVALID index and rerun.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_pantry_name_trigram"
+down_revision: Union[str, None] = "0004_partition_chat_messages"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_household_ingredients_name_trgm",
+            "household_ingredients",
+            [sa.text("lower(name) gin_trgm_ops")],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_household_ingredients_name_trgm",
+            table_name="household_ingredients",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,76 @@
+"""per-user collection versions for conditional GETs
+
+Revision ID: 0006_collection_versions
+Revises: 0005_pantry_name_trigram
+Create Date: 2026-10-19 13:00:00.000000
+
+Row triggers on recipes, household_ingredients, shopping_lists and chat_sessions bump a
+per-user counter in collection_versions. The list endpoints derive their ETags from it, so a
+matching If-None-Match is answered without touching the collection. The triggers catch every
+writer: routers, agent tools, bulk statements and the chat archiver.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_collection_versions"
+down_revision: Union[str, None] = "0005_pantry_name_trigram"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> collection name used by the API
+COLLECTIONS = {
+    "recipes": "recipes",
+    "household_ingredients": "ingredients",
+    "shopping_lists": "shopping_list",
+    "chat_sessions": "chat_sessions",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "collection_versions",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("collection", sa.String(length=32), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        CREATE FUNCTION bump_collection_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            owner_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                owner_id := OLD.user_id;
+                -- Rows going with a deleted user have nobody left to revalidate.
+                IF NOT EXISTS (SELECT 1 FROM users WHERE id = owner_id) THEN
+                    RETURN NULL;
+                END IF;
+            ELSE
+                owner_id := NEW.user_id;
+            END IF;
+            INSERT INTO collection_versions (user_id, collection, version)
+            VALUES (owner_id, TG_ARGV[0], 1)
+            ON CONFLICT (user_id, collection)
+            DO UPDATE SET version = collection_versions.version + 1;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, collection in COLLECTIONS.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_collection_version "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION bump_collection_version('{collection}')"
+        )
+
+
+def downgrade() -> None:
+    for table in COLLECTIONS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_collection_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_collection_version()")
+    op.drop_table("collection_versions")
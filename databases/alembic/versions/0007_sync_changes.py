@@ -0,0 +1,202 @@
+"""sync change log with per-user cursors
+
+Revision ID: 0007_sync_changes
+Revises: 0006_collection_versions
+Create Date: 2026-10-19 15:00:00.000000
+
+sync_changes keeps the latest change per recipe, pantry item, shopping-list item and chat
+session, stamped with a per-user cursor from sync_cursors. Deletes leave a tombstone row. Row
+triggers maintain both tables. The shopping-list trigger diffs the items JSONB, so every item
+gets its own entry.
+
+The cursor row is updated in the writing transaction and stays locked until commit. A user's
+writes therefore become visible in cursor order, and a client that has read up to cursor N
+cannot later miss a change numbered N or below. The triggers are named so they fire before the
+collection_versions ones (triggers run in name order). Every transaction therefore takes the
+user's cursor lock first, and two writers of one user cannot deadlock on the counters.
+
+Existing rows are backfilled with cursors 1..n per user, so a client starting from cursor 0
+receives everything.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_sync_changes"
+down_revision: Union[str, None] = "0006_collection_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> collection name used by the sync API
+ROW_COLLECTIONS = {
+    "recipes": "recipes",
+    "household_ingredients": "ingredients",
+    "chat_sessions": "chat_sessions",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_cursors",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("cursor", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("pruned_through", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "sync_changes",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("collection", sa.String(length=32), primary_key=True),
+        sa.Column("entity_id", sa.String(length=64), primary_key=True),
+        sa.Column("cursor", sa.BigInteger(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False, server_default="false"),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_sync_changes_user_id_cursor", "sync_changes", ["user_id", "cursor"])
+    op.create_index(
+        "ix_sync_changes_tombstones", "sync_changes", ["changed_at"], postgresql_where=sa.text("deleted")
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION next_sync_cursor(owner_id uuid) RETURNS bigint LANGUAGE sql AS $$
+            INSERT INTO sync_cursors (user_id, cursor) VALUES (owner_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET cursor = sync_cursors.cursor + 1
+            RETURNING cursor
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION record_sync_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            owner_id uuid;
+            row_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                owner_id := OLD.user_id;
+                row_id := OLD.id;
+                -- Rows going with a deleted user have nobody left to sync.
+                IF NOT EXISTS (SELECT 1 FROM users WHERE id = owner_id) THEN
+                    RETURN NULL;
+                END IF;
+            ELSE
+                IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+                    RETURN NULL;
+                END IF;
+                owner_id := NEW.user_id;
+                row_id := NEW.id;
+            END IF;
+            INSERT INTO sync_changes (user_id, collection, entity_id, cursor, deleted, changed_at)
+            VALUES (owner_id, TG_ARGV[0], row_id::text, next_sync_cursor(owner_id), TG_OP = 'DELETE', now())
+            ON CONFLICT (user_id, collection, entity_id)
+            DO UPDATE SET cursor = EXCLUDED.cursor, deleted = EXCLUDED.deleted, changed_at = EXCLUDED.changed_at;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION record_shopping_list_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            owner_id uuid;
+            old_items jsonb := '[]';
+            new_items jsonb := '[]';
+            next_cursor bigint;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                owner_id := OLD.user_id;
+                IF NOT EXISTS (SELECT 1 FROM users WHERE id = owner_id) THEN
+                    RETURN NULL;
+                END IF;
+            ELSE
+                owner_id := NEW.user_id;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                old_items := OLD.items;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_items := NEW.items;
+            END IF;
+            IF old_items = new_items THEN
+                RETURN NULL;
+            END IF;
+
+            next_cursor := next_sync_cursor(owner_id);
+            INSERT INTO sync_changes (user_id, collection, entity_id, cursor, deleted, changed_at)
+            SELECT DISTINCT ON (entity_id) owner_id, 'shopping_list_items', entity_id, next_cursor, deleted, now()
+            FROM (
+                -- Items added or edited: not present, byte-for-byte, in the old list.
+                SELECT n.item->>'id' AS entity_id, false AS deleted
+                FROM jsonb_array_elements(new_items) AS n(item)
+                WHERE n.item ? 'id'
+                  AND NOT EXISTS (SELECT 1 FROM jsonb_array_elements(old_items) AS o(item) WHERE o.item = n.item)
+                UNION ALL
+                -- Items removed: their id is gone from the new list.
+                SELECT o.item->>'id', true
+                FROM jsonb_array_elements(old_items) AS o(item)
+                WHERE o.item ? 'id'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM jsonb_array_elements(new_items) AS n(item) WHERE n.item->>'id' = o.item->>'id'
+                  )
+            ) changed
+            WHERE length(entity_id) <= 64
+            ORDER BY entity_id, deleted
+            ON CONFLICT (user_id, collection, entity_id)
+            DO UPDATE SET cursor = EXCLUDED.cursor, deleted = EXCLUDED.deleted, changed_at = EXCLUDED.changed_at;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, collection in ROW_COLLECTIONS.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_change_log "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION record_sync_change('{collection}')"
+        )
+    op.execute(
+        "CREATE TRIGGER trg_shopping_lists_change_log "
+        "AFTER INSERT OR UPDATE OR DELETE ON shopping_lists "
+        "FOR EACH ROW EXECUTE FUNCTION record_shopping_list_sync()"
+    )
+
+    op.execute(
+        """
+        INSERT INTO sync_changes (user_id, collection, entity_id, cursor)
+        SELECT user_id, collection, entity_id,
+               row_number() OVER (PARTITION BY user_id ORDER BY collection, entity_id)
+        FROM (
+            SELECT user_id, 'recipes' AS collection, id::text AS entity_id FROM recipes
+            UNION ALL
+            SELECT user_id, 'ingredients', id::text FROM household_ingredients
+            UNION ALL
+            SELECT user_id, 'chat_sessions', id::text FROM chat_sessions
+            UNION
+            SELECT user_id, 'shopping_list_items', item->>'id'
+            FROM shopping_lists, jsonb_array_elements(items) AS item
+            WHERE item ? 'id' AND length(item->>'id') <= 64
+        ) existing
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO sync_cursors (user_id, cursor)
+        SELECT user_id, max(cursor) FROM sync_changes GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    for table in [*ROW_COLLECTIONS, "shopping_lists"]:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_change_log ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS record_shopping_list_sync()")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_change()")
+    op.execute("DROP FUNCTION IF EXISTS next_sync_cursor(uuid)")
+    op.drop_index("ix_sync_changes_tombstones", table_name="sync_changes")
+    op.drop_index("ix_sync_changes_user_id_cursor", table_name="sync_changes")
+    op.drop_table("sync_changes")
+    op.drop_table("sync_cursors")
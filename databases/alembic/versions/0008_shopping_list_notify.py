@@ -0,0 +1,47 @@
+"""notify listeners when a shopping list changes
+
+Revision ID: 0008_shopping_list_notify
+Revises: 0007_sync_changes
+Create Date: 2026-10-19 17:00:00.000000
+
+Each committed change to a list's items raises NOTIFY shopping_list_changes with the owner's id.
+Every backend worker LISTENs and pushes the item diff (from sync_changes) to that user's open
+/shopping-list/events streams. Postgres delivers notifications at commit, only once per payload
+within a transaction, and never for rolled-back writes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_shopping_list_notify"
+down_revision: Union[str, None] = "0007_sync_changes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE FUNCTION notify_shopping_list_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('shopping_list_changes', OLD.user_id::text);
+            ELSIF TG_OP = 'INSERT' OR OLD.items IS DISTINCT FROM NEW.items THEN
+                PERFORM pg_notify('shopping_list_changes', NEW.user_id::text);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER trg_shopping_lists_notify "
+        "AFTER INSERT OR UPDATE OR DELETE ON shopping_lists "
+        "FOR EACH ROW EXECUTE FUNCTION notify_shopping_list_change()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_shopping_lists_notify ON shopping_lists")
+    op.execute("DROP FUNCTION IF EXISTS notify_shopping_list_change()")
@@ -0,0 +1,60 @@
+"""durable background jobs
+
+Revision ID: 0009_jobs
+Revises: 0008_shopping_list_notify
+Create Date: 2026-10-19 19:00:00.000000
+
+Photo and conversation scans are queued in ``jobs`` and run by in-process workers that claim
+rows with FOR UPDATE SKIP LOCKED. Running jobs carry a lease (``locked_until``), so a job whose
+worker died is picked up again after a restart.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_jobs"
+down_revision: Union[str, None] = "0008_shopping_list_notify"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(length=40), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("payload", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("input_blob", sa.LargeBinary(), nullable=True),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("idempotency_key", sa.String(length=100), nullable=True),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_jobs_user_id_created_at", "jobs", ["user_id", "created_at"])
+    op.create_index(
+        "ix_jobs_claimable", "jobs", ["run_after"], postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+    op.create_index(
+        "uq_jobs_user_id_idempotency_key",
+        "jobs",
+        ["user_id", "idempotency_key"],
+        unique=True,
+        postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_jobs_user_id_idempotency_key", table_name="jobs")
+    op.drop_index("ix_jobs_claimable", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_created_at", table_name="jobs")
+    op.drop_table("jobs")
@@ -0,0 +1,39 @@
+"""shared AI quota buckets
+
+Revision ID: 0010_ai_quota_buckets
+Revises: 0009_jobs
+Create Date: 2026-10-19 20:00:00.000000
+
+Per-user AI token buckets move out of process memory so that every worker process admits
+against the same balance. Workers batch their debits and write them with an upsert that applies
+the refill since ``updated_at``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_ai_quota_buckets"
+down_revision: Union[str, None] = "0009_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_quota_buckets",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ai_quota_buckets")
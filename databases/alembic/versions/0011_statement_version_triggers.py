@@ -0,0 +1,119 @@
+"""statement-level collection version triggers
+
+Revision ID: 0011_statement_version_triggers
+Revises: 0010_ai_quota_buckets
+Create Date: 2026-10-19 21:00:00.000000
+
+The collection_versions triggers from 0006 fired once per row, so a statement touching n rows
+bumped a user's counter n times and updated their row n times. They are replaced with
+statement triggers that read the transition tables and bump each affected user once per
+statement, in user id order. Transition tables allow one event per trigger, so each table gets an
+insert, an update and a delete trigger.
+
+Statement triggers fire after the row triggers of the same statement, so the sync cursor lock
+(0007) is still taken first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_statement_version_triggers"
+down_revision: Union[str, None] = "0010_ai_quota_buckets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> collection name used by the API
+COLLECTIONS = {
+    "recipes": "recipes",
+    "household_ingredients": "ingredients",
+    "shopping_lists": "shopping_list",
+    "chat_sessions": "chat_sessions",
+}
+
+# event -> transition tables the trigger needs
+TRANSITION_TABLES = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    for table in COLLECTIONS:
+        op.execute(f"DROP TRIGGER trg_{table}_collection_version ON {table}")
+    op.execute("DROP FUNCTION bump_collection_version()")
+    op.execute(
+        """
+        CREATE FUNCTION bump_collection_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO collection_versions (user_id, collection, version)
+                SELECT DISTINCT user_id, TG_ARGV[0], 1 FROM new_rows ORDER BY user_id
+                ON CONFLICT (user_id, collection)
+                DO UPDATE SET version = collection_versions.version + 1;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO collection_versions (user_id, collection, version)
+                SELECT user_id, TG_ARGV[0], 1
+                FROM (SELECT user_id FROM old_rows UNION SELECT user_id FROM new_rows) changed
+                ORDER BY user_id
+                ON CONFLICT (user_id, collection)
+                DO UPDATE SET version = collection_versions.version + 1;
+            ELSE
+                -- Rows going with a deleted user have nobody left to revalidate.
+                INSERT INTO collection_versions (user_id, collection, version)
+                SELECT DISTINCT user_id, TG_ARGV[0], 1
+                FROM old_rows
+                WHERE EXISTS (SELECT 1 FROM users WHERE users.id = old_rows.user_id)
+                ORDER BY user_id
+                ON CONFLICT (user_id, collection)
+                DO UPDATE SET version = collection_versions.version + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, collection in COLLECTIONS.items():
+        for event, transition_tables in TRANSITION_TABLES.items():
+            op.execute(
+                f"CREATE TRIGGER trg_{table}_collection_version_{event.lower()} "
+                f"AFTER {event} ON {table} REFERENCING {transition_tables} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_versions('{collection}')"
+            )
+
+
+def downgrade() -> None:
+    for table in COLLECTIONS:
+        for event in TRANSITION_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_collection_version_{event.lower()} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_collection_versions()")
+    op.execute(
+        """
+        CREATE FUNCTION bump_collection_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            owner_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                owner_id := OLD.user_id;
+                IF NOT EXISTS (SELECT 1 FROM users WHERE id = owner_id) THEN
+                    RETURN NULL;
+                END IF;
+            ELSE
+                owner_id := NEW.user_id;
+            END IF;
+            INSERT INTO collection_versions (user_id, collection, version)
+            VALUES (owner_id, TG_ARGV[0], 1)
+            ON CONFLICT (user_id, collection)
+            DO UPDATE SET version = collection_versions.version + 1;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, collection in COLLECTIONS.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_collection_version "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION bump_collection_version('{collection}')"
+        )
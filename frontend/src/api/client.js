@@ -16,8 +16,8 @@ export async function api(path, options = {}) {
     headers["Content-Type"] = "application/json";
   }
   const res = await fetch(`${API_URL}${path}`, {
-    headers,
     ...options,
+    headers,
   });
   if (res.status === 401) {
     localStorage.removeItem("token");
@@ -47,4 +47,39 @@ export async function apiStream(path, body) {
   return res.body;
 }
 
+export async function apiEventStream(path, signal) {
+  const res = await fetch(`${API_URL}${path}`, { headers: getHeaders(), signal });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || `Request failed: ${res.status}`);
+  }
+  return res.body;
+}
+
+const TERMINAL_JOB_STATUSES = ["succeeded", "failed"];
+const JOB_POLL_INITIAL_MS = 500;
+const JOB_POLL_MAX_MS = 5000;
+const JOB_TIMEOUT_MS = 3 * 60 * 1000;
+
+// Submits work that runs as a background job and resolves with the job's result once it finishes.
+// Polls less often the longer the job runs, and gives up after JOB_TIMEOUT_MS.
+export async function apiJob(path, options = {}) {
+  const headers = { "Idempotency-Key": crypto.randomUUID(), ...(options.headers || {}) };
+  const deadline = Date.now() + JOB_TIMEOUT_MS;
+  let delay = JOB_POLL_INITIAL_MS;
+  let job = await api(path, { ...options, headers });
+  while (!TERMINAL_JOB_STATUSES.includes(job.status)) {
+    if (Date.now() + delay > deadline) {
+      throw new Error("The scan is taking too long. Please try again later.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, JOB_POLL_MAX_MS);
+    job = await api(`/jobs/${job.id}`);
+  }
+  if (job.status === "failed") {
+    throw new Error(job.error || "The scan failed");
+  }
+  return job.result;
+}
+
 export { API_URL };
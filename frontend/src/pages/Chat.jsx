@@ -110,6 +110,14 @@ export default function Chat() {
                 )
               );
             }
+            if (data.error) {
+              // Nothing from the reply was kept (e.g. the server restarted mid-turn).
+              setMessages((prev) =>
+                prev.map((m) =>
+                  m.id === streamingMsgId ? { ...m, content: `Error: ${data.error}` } : m
+                )
+              );
+            }
             if (data.session_id && !activeSessionId) {
               setActiveSessionId(data.session_id);
               loadSessions();
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from "react";
-import { api } from "../api/client";
+import { api, apiJob } from "../api/client";
 
 export default function Pantry() {
   const [items, setItems] = useState([]);
@@ -87,7 +87,7 @@ export default function Pantry() {
     try {
       const form = new FormData();
       form.append("photo", photoFile);
-      const data = await api("/ingredients/scan-photo", {
+      const data = await apiJob("/ingredients/scan-photo", {
         method: "POST",
         body: form,
       });
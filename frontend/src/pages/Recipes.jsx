@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useRef, useState } from "react";
-import { api } from "../api/client";
+import { api, apiJob } from "../api/client";
 
 const DEFAULT_CATEGORY_OPTIONS = ["Breakfast", "Lunch", "Dinner", "Snack", "Dessert"];
 const CUSTOM_CATEGORY_VALUE = "__custom__";
@@ -240,7 +240,7 @@ export default function Recipes() {
     setScanLoading(true);
     setScanError("");
     try {
-      const data = await api("/recipes/scan-conversation", {
+      const data = await apiJob("/recipes/scan-conversation", {
         method: "POST",
         body: JSON.stringify({ session_id: selectedSessionId }),
       });
@@ -270,7 +270,7 @@ export default function Recipes() {
     try {
       const form = new FormData();
       form.append("photo", photoFile);
-      const data = await api("/recipes/scan-photo", {
+      const data = await apiJob("/recipes/scan-photo", {
         method: "POST",
         body: form,
       });
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../api/client";
-import { buildManualItemPayload, sortUncheckedFirst } from "../utils/shoppingList";
+import { api, apiEventStream } from "../api/client";
+import { applyShoppingListEvent, buildManualItemPayload, sortUncheckedFirst } from "../utils/shoppingList";
 
 export default function ShoppingList() {
   const [items, setItems] = useState([]);
@@ -15,11 +15,58 @@ export default function ShoppingList() {
   const [message, setMessage] = useState("");
 
   useEffect(() => {
-    loadShoppingList();
+    const controller = new AbortController();
+    followShoppingList(controller.signal);
+    return () => controller.abort();
   }, []);
 
   const orderedItems = useMemo(() => sortUncheckedFirst(items), [items]);
 
+  // Live updates from other devices and the chat agent: a snapshot, then item diffs.
+  async function followShoppingList(signal) {
+    let retryMs = 1000;
+    let received = false;
+    while (!signal.aborted) {
+      try {
+        const stream = await apiEventStream("/shopping-list/events", signal);
+        const reader = stream.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+
+          buffer += decoder.decode(value, { stream: true });
+          const lines = buffer.split("\n");
+          buffer = lines.pop() || "";
+
+          for (const line of lines) {
+            if (!line.startsWith("data: ")) continue;
+            try {
+              const event = JSON.parse(line.slice(6));
+              setItems((prev) => applyShoppingListEvent(prev, event));
+              setLoading(false);
+              received = true;
+              retryMs = 1000;
+            } catch {
+              /* skip malformed lines */
+            }
+          }
+        }
+      } catch {
+        if (signal.aborted) return;
+        if (!received) {
+          // Show the list even if the live stream is unavailable.
+          await loadShoppingList();
+          received = true;
+        }
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs));
+      retryMs = Math.min(retryMs * 2, 30000);
+    }
+  }
+
   async function loadShoppingList() {
     try {
       const data = await api("/shopping-list");
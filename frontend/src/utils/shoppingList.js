@@ -10,3 +10,19 @@ export function buildManualItemPayload({ name, quantity, unit, category }) {
 export function sortUncheckedFirst(items) {
   return [...items].sort((a, b) => Number(a.checked) - Number(b.checked));
 }
+
+export function applyShoppingListEvent(items, event) {
+  if (event.type === "snapshot") return event.items || [];
+  if (event.type !== "diff") return items;
+
+  const removed = new Set(event.deleted || []);
+  const upserted = new Map((event.upserted || []).map((item) => [item.id, item]));
+  const next = items
+    .filter((item) => !removed.has(item.id))
+    .map((item) => upserted.get(item.id) || item);
+  const known = new Set(next.map((item) => item.id));
+  for (const item of upserted.values()) {
+    if (!known.has(item.id)) next.push(item);
+  }
+  return next;
+}
@@ -1,7 +1,11 @@
 import test from "node:test";
 import assert from "node:assert/strict";
 
-import { buildManualItemPayload, sortUncheckedFirst } from "../src/utils/shoppingList.js";
+import {
+  applyShoppingListEvent,
+  buildManualItemPayload,
+  sortUncheckedFirst,
+} from "../src/utils/shoppingList.js";
 
 test("buildManualItemPayload trims and nulls empty optional fields", () => {
   const payload = buildManualItemPayload({
@@ -26,3 +30,24 @@ test("sortUncheckedFirst keeps unchecked before checked", () => {
 
   assert.deepEqual(ordered.map((item) => item.id), ["b", "a", "c"]);
 });
+
+test("applyShoppingListEvent replaces on snapshot and merges diffs in place", () => {
+  const items = applyShoppingListEvent([{ id: "x" }], {
+    type: "snapshot",
+    items: [
+      { id: "a", name: "eggs", checked: false },
+      { id: "b", name: "milk", checked: false },
+    ],
+  });
+
+  const next = applyShoppingListEvent(items, {
+    type: "diff",
+    upserted: [
+      { id: "b", name: "milk", checked: true },
+      { id: "c", name: "rice", checked: false },
+    ],
+    deleted: ["a"],
+  });
+
+  assert.deepEqual(next.map((item) => [item.id, item.checked]), [["b", true], ["c", false]]);
+});